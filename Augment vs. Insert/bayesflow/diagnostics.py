@@ -1,16 +1,48 @@
-import matplotlib.pyplot as plt
-import matplotlib.gridspec as gridspec
 import numpy as np
-import seaborn as sns
-from scipy.stats import binom, norm
-import scipy.stats as stats
-from scipy.integrate import quad, solve_ivp, dblquad
-from sklearn.metrics import r2_score, confusion_matrix, mean_squared_error
+
+from bayesflow.lazy import lazy_import
+from bayesflow.rendering import deferrable
+
+plt = lazy_import('matplotlib.pyplot')
+gridspec = lazy_import('matplotlib.gridspec')
+sns = lazy_import('seaborn')
+binom = lazy_import('scipy.stats', 'binom')
+norm = lazy_import('scipy.stats', 'norm')
+quad = lazy_import('scipy.integrate', 'quad')
+dblquad = lazy_import('scipy.integrate', 'dblquad')
+r2_score = lazy_import('sklearn.metrics', 'r2_score')
+confusion_matrix = lazy_import('sklearn.metrics', 'confusion_matrix')
+mean_squared_error = lazy_import('sklearn.metrics', 'mean_squared_error')
 #from matplotlib.ticker import FormatStrFormatter
 
-from bayesflow.computational_utilities import expected_calibration_error
+expected_calibration_error = lazy_import('bayesflow.computational_utilities', 'expected_calibration_error')
+sbc_ranks = lazy_import('bayesflow.sbc', 'sbc_ranks')
+posterior_plot_grids = lazy_import('bayesflow.posterior_grid', 'posterior_plot_grids')
+kde_scatter = lazy_import('bayesflow.density', 'kde_scatter')
+conversion_reaction = lazy_import('bayesflow.simulators', 'conversion_reaction')
+predictive_trajectories = lazy_import('bayesflow.predictive', 'predictive_trajectories')
+predictive_bands = lazy_import('bayesflow.predictive', 'predictive_bands')
+thin_traces = lazy_import('bayesflow.predictive', 'thin_traces')
+plot_trajectories = lazy_import('bayesflow.predictive', 'plot_trajectories')
+plot_predictive_bands = lazy_import('bayesflow.predictive', 'plot_predictive_bands')
+
+# Dense time grid of the posterior predictive trajectories
+_PREDICTIVE_GRID = np.linspace(0, 10, 201)
+
+
+def _tabulate(contour=(3, 201), marginals=(5, 151, 8)):
+    """ Returns a ``deferrable`` hook evaluating the posterior callable on the plot grids in the calling process,
+    so that deferred plot specs hold the arrays instead of the (often unpicklable) callable. """
+
+    def evaluate(arguments):
+        if not arguments.get('show_level_set', True):
+            return {'posterior_xy': None}
+        return {'posterior_xy': posterior_plot_grids(arguments['param_samples'], arguments['posterior_xy'], contour,
+                                                     marginals, arguments['vectorized'])}
+    return evaluate
 
 
+@deferrable
 def plot_sbc(theta_samples, theta_test, param_names, bins=25, figsize=(8, 4), interval=0.99, show=True, filename=None, font_size=12):
     """ Plots the simulation-based posterior checking histograms as advocated by Talts et al. (2018). """
 
@@ -27,8 +59,8 @@ def plot_sbc(theta_samples, theta_test, param_names, bins=25, figsize=(8, 4), in
     if n_row > 1:
         axarr = axarr.flat
 
-    # Compute ranks (using broadcasting)    
-    ranks = np.sum(theta_samples < theta_test[:, np.newaxis, :], axis=1)
+    # Compute ranks (chunked over test sets)
+    ranks = sbc_ranks(theta_samples, theta_test)
     
     # Compute interval
     endpoints = binom.interval(interval, N, 1 / (bins))
@@ -60,36 +92,21 @@ def plot_sbc(theta_samples, theta_test, param_names, bins=25, figsize=(8, 4), in
     return f
      
         
-def plot_posterior(param_samples, posterior_xy, filename=None, font_size=12):
-    mean_sample = np.mean(param_samples, axis=0)
-    cov_sample = np.cov(param_samples.transpose())
-    mean_x = mean_sample[0]
-    mean_y = mean_sample[1]
-    std_x = np.sqrt(cov_sample[0, 0])
-    std_y = np.sqrt(cov_sample[1, 1])
+@deferrable(evaluate=_tabulate())
+def plot_posterior(param_samples, posterior_xy, filename=None, font_size=12, vectorized=False):
+    grids = posterior_plot_grids(param_samples, posterior_xy, vectorized=vectorized)
 
     fig = plt.figure(figsize=(15, 5))
     plt.rcParams['font.size'] = font_size
     
     plt.subplot(1, 3, 1)
     # Level sets of analytic posterior distribution
-    grid = 201
-    A = np.linspace(mean_x - 3 * std_x, mean_x + 3 * std_x, grid)
-    B = np.linspace(mean_y - 3 * std_y, mean_y + 3 * std_y, grid)
-    true_posterior = np.zeros((grid, grid))
-    for iy in range(0, grid):
-        for ix in range(0, grid):
-            true_posterior[iy][ix] = posterior_xy(A[ix], B[iy])
+    A, B, true_posterior = grids['contour']
     true_posterior = plt.contour(A, B, true_posterior, colors='blue')
     h1, _ = true_posterior.legend_elements()
     # plt.clabel(true_posterior, fontsize=4, inline=1)
     # Kernel density estimator of BayesFlow samples
-    a = param_samples[:, 0]
-    b = param_samples[:, 1]
-    ab = np.vstack([a, b])
-    z = stats.gaussian_kde(ab)(ab)
-    ida = z.argsort()  # Sort the points by density, so that the densest points are plotted last
-    a, b, z = a[ida], b[ida], z[ida]
+    a, b, z = kde_scatter(param_samples[:, 0], param_samples[:, 1])  # Sorted, densest points last
     approximate_posterior = plt.scatter(a, b, c=z, s=30)
     h2, _ = approximate_posterior.legend_elements()
     plt.legend([h2[0], h1[0]], ['BayesFlow', 'True posterior'], fontsize=11.5)
@@ -97,28 +114,15 @@ def plot_posterior(param_samples, posterior_xy, filename=None, font_size=12):
     plt.ylabel('Parameter $k_2$', fontsize=14)
 
     # Check marginal densities
-    grid = 151
-    A = np.linspace(mean_x - 5 * std_x, mean_x + 5 * std_x, grid)
-    B = np.linspace(mean_y - 5 * std_y, mean_y + 5 * std_y, grid)
-    bounds = np.array([mean_x - 8 * std_x, mean_x + 8 * std_x, mean_y - 8 * std_y, mean_y + 8 * std_y])
+    A, B, marginal_x, marginal_y = grids['marginals']
     plt.subplot(1, 3, 2)
     plt.hist(param_samples[:, 0], bins='auto', density=1, color='orange', label='BayesFlow')
-    marginal_x = np.zeros(grid)
-    for i in range(grid):
-        x = A[i]
-        integrand_y = lambda y: posterior_xy(x, y)
-        marginal_x[i] = quad(integrand_y, bounds[2], bounds[3])[0]
     plt.plot(A, marginal_x, color='b', label='True posterior')
     plt.ylabel('Marginal density', fontsize=14)
     plt.xlabel('Parameter $k_1$', fontsize=14)
     plt.legend(fontsize=11.5)
     plt.subplot(1, 3, 3)
     plt.hist(param_samples[:, 1], bins='auto', density=1, color='orange', label='BayesFlow')
-    marginal_y = np.zeros(grid)
-    for j in range(grid):
-        y = B[j]
-        integrand_x = lambda x: posterior_xy(x, y)
-        marginal_y[j] = quad(integrand_x, bounds[0], bounds[1])[0]
     plt.plot(B, marginal_y, color='b', label='True posterior')
     plt.ylabel('Marginal density', fontsize=14)
     plt.xlabel('Parameter $k_2$', fontsize=14)
@@ -131,26 +135,36 @@ def plot_posterior(param_samples, posterior_xy, filename=None, font_size=12):
         fig.savefig("figures/{}_posterior.png".format(filename), dpi=600, bbox_inches='tight')
     
     
-def plot_predictive_2D(ax, param_prior, result, param_samples, A, B, true_posterior, method, n_sim=301, linewidth=0.6):
-    def conversion_reaction(t, x, theta):
-        theta = 10**theta
-        return np.array([-theta[0]*x[0]+theta[1]*x[1], theta[0]*x[0]-theta[1]*x[1]])
-    x0 = [1,0]      
+def _plot_predictive_simulations(ax, param_samples, n_sim, linewidth, alpha, style='traces', n_traces=None):
+    """ Plots posterior predictive simulations of the conversion reaction model on a dense time grid.
+
+    All ``n_sim`` draws are solved in one vectorized call. ``style='traces'`` draws them as a single line
+    collection (thinned to ``n_traces`` if given), ``style='bands'`` draws their median with 50% and 90% bands
+    and ``n_traces`` optional traces.
+    """
+
+    traj = predictive_trajectories(conversion_reaction, param_samples, _PREDICTIVE_GRID, n_draws=n_sim)
+    # Legend handle of the simulations
+    ax.plot(_PREDICTIVE_GRID[:1], traj[0, :1], color='grey', label='Simulation', linewidth=0.9)
+    if style == 'bands':
+        plot_predictive_bands(ax, _PREDICTIVE_GRID, predictive_bands(traj))
+        if n_traces:
+            plot_trajectories(ax, _PREDICTIVE_GRID, thin_traces(traj, n_traces), linewidth=linewidth, alpha=alpha)
+    else:
+        traces = traj[1:] if n_traces is None else thin_traces(traj, n_traces)
+        plot_trajectories(ax, _PREDICTIVE_GRID, traces, linewidth=linewidth, alpha=alpha)
+
+
+def plot_predictive_2D(ax, param_prior, result, param_samples, A, B, true_posterior, method, n_sim=301, linewidth=0.6,
+                       style='traces', n_traces=None):
     n_obs = 3
     time_points = np.linspace(0, 10, n_obs)
     
     # Posterior predictive check
-    for k in range(n_sim):
-        rhs = lambda t,x: conversion_reaction(t, x, param_samples[k])
-        sol = solve_ivp(rhs, t_span = (0,10), y0 = x0, atol = 1e-9, rtol = 1e-6)
-        if k == 0: 
-            ax[0].plot(sol.t[0], sol.y[1][0], color='grey', label='Simulation', linewidth=0.9)
-        else: 
-            ax[0].plot(sol.t, sol.y[1], color='grey', linewidth=linewidth, alpha=0.32) #0.3
+    _plot_predictive_simulations(ax[0], param_samples, n_sim, linewidth, 0.32, style, n_traces)
     ax[0].plot(np.linspace(0, 10, 21), 0.5*np.ones(21), '--', color='c', linewidth=1)
-    rhs = lambda t,x: conversion_reaction(t, x, param_prior[0])
-    sol = solve_ivp(rhs, t_span = (0,10), y0 = x0, atol = 1e-9, rtol = 1e-6)
-    ax[0].plot(sol.t, sol.y[1], color='black', label='True trajectory') 
+    ax[0].plot(_PREDICTIVE_GRID, conversion_reaction(param_prior[0], _PREDICTIVE_GRID)[0], color='black',
+               label='True trajectory')
     present_indices = result[1]
     missing_indices = np.setdiff1d(range(n_obs), present_indices)
     ax[0].plot(time_points[present_indices], result[0][present_indices], 'o', color='blue', label='Available data')
@@ -170,12 +184,7 @@ def plot_predictive_2D(ax, param_prior, result, param_samples, A, B, true_poster
     #plt.clabel(true_posterior, fontsize=9, inline=1)
     h1, _ = true_posterior.legend_elements()
     # Kernel density estimator of BayesFlow samples
-    a = param_samples[:, 0]
-    b = param_samples[:, 1]
-    ab = np.vstack([a, b])
-    z = stats.gaussian_kde(ab)(ab)
-    ida = z.argsort()  # Sort the points by density, so that the densest points are plotted last
-    a, b, z = a[ida], b[ida], z[ida]
+    a, b, z = kde_scatter(param_samples[:, 0], param_samples[:, 1])  # Sorted, densest points last
     approximate_posterior = ax[1].scatter(a, b, c=z, s=30)
     h2, _ = approximate_posterior.legend_elements()
     ax[1].legend([h2[0], h1[0]], ['BayesFlow', 'True posterior'], fontsize=13)
@@ -231,12 +240,7 @@ def plot_posterior(ax, col, result, param_samples, method, levels):
     h1, _ = true_posterior.legend_elements()
     
     # Kernel density estimator of BayesFlow samples
-    a = param_samples[:, 0]
-    b = param_samples[:, 1]
-    ab = np.vstack([a, b])
-    z = stats.gaussian_kde(ab)(ab)
-    ida = z.argsort()  # Sort the points by density, so that the densest points are plotted last
-    a, b, z = a[ida], b[ida], z[ida]
+    a, b, z = kde_scatter(param_samples[:, 0], param_samples[:, 1])  # Sorted, densest points last
     approximate_posterior = ax.scatter(a, b, c=z, s=25)
     h2, _ = approximate_posterior.legend_elements()
     if col == 1:
@@ -327,12 +331,7 @@ def plot_posterior(ax, j, result, param_samples, method, levels):
     h1, _ = true_posterior.legend_elements()
     
     # Kernel density estimator of BayesFlow samples
-    a = param_samples[:, 0]
-    b = param_samples[:, 1]
-    ab = np.vstack([a, b])
-    z = stats.gaussian_kde(ab)(ab)
-    ida = z.argsort()  # Sort the points by density, so that the densest points are plotted last
-    a, b, z = a[ida], b[ida], z[ida]
+    a, b, z = kde_scatter(param_samples[:, 0], param_samples[:, 1])  # Sorted, densest points last
     approximate_posterior = ax[0,j].scatter(a, b, c=z, s=25)
     h2, _ = approximate_posterior.legend_elements()
     if j == 2:
@@ -342,26 +341,15 @@ def plot_posterior(ax, j, result, param_samples, method, levels):
     ax[0,j].set_title(method, fontsize=14, loc='center', pad=8.5) 
     
 
-def predictive_check(ax, j, param_prior, result, param_samples, n_sim=301):
-    def conversion_reaction(t, x, theta):
-        theta = 10**theta
-        return np.array([-theta[0]*x[0]+theta[1]*x[1], theta[0]*x[0]-theta[1]*x[1]])
-    x0 = [1,0]      
+def predictive_check(ax, j, param_prior, result, param_samples, n_sim=301, style='traces', n_traces=None):
     n_obs = 3
     time_points = np.linspace(0, 10, n_obs)
     
     # Posterior predictive check
-    for k in range(n_sim):
-        rhs = lambda t,x: conversion_reaction(t, x, param_samples[k])
-        sol = solve_ivp(rhs, t_span = (0,10), y0 = x0, atol = 1e-9, rtol = 1e-6)
-        if k == 0: 
-            ax[1,j].plot(sol.t[0], sol.y[1][0], color='grey', label='Simulation', linewidth=0.9)
-        else: 
-            ax[1,j].plot(sol.t, sol.y[1], color='grey', linewidth=0.6, alpha=0.3) 
+    _plot_predictive_simulations(ax[1,j], param_samples, n_sim, 0.6, 0.3, style, n_traces)
     ax[1,j].plot(np.linspace(0, 10, 21), 0.5*np.ones(21), '--', color='c', linewidth=1)
-    rhs = lambda t,x: conversion_reaction(t, x, param_prior[0])
-    sol = solve_ivp(rhs, t_span = (0,10), y0 = x0, atol = 1e-9, rtol = 1e-6)
-    ax[1,j].plot(sol.t, sol.y[1], color='black', label='True trajectory') 
+    ax[1,j].plot(_PREDICTIVE_GRID, conversion_reaction(param_prior[0], _PREDICTIVE_GRID)[0], color='black',
+                 label='True trajectory')
     present_indices = result[1]
     missing_indices = np.setdiff1d(range(n_obs), present_indices)
     ax[1,j].plot(time_points[present_indices], result[0][present_indices], 'o', color='blue', label='Available data')
@@ -1,16 +1,35 @@
-import matplotlib.pyplot as plt
-import matplotlib.gridspec as gridspec
 import numpy as np
-import seaborn as sns
-from scipy.stats import binom
-import scipy.stats as stats
-from scipy.integrate import quad
-from sklearn.metrics import r2_score, confusion_matrix, mean_squared_error
+
+from bayesflow.lazy import lazy_import
+from bayesflow.rendering import deferrable
+
+plt = lazy_import('matplotlib.pyplot')
+gridspec = lazy_import('matplotlib.gridspec')
+sns = lazy_import('seaborn')
+binom = lazy_import('scipy.stats', 'binom')
+confusion_matrix = lazy_import('sklearn.metrics', 'confusion_matrix')
 #from matplotlib.ticker import FormatStrFormatter
 
-from bayesflow.computational_utilities import expected_calibration_error
+expected_calibration_error = lazy_import('bayesflow.computational_utilities', 'expected_calibration_error')
+sbc_ranks = lazy_import('bayesflow.sbc', 'sbc_ranks')
+posterior_plot_grids = lazy_import('bayesflow.posterior_grid', 'posterior_plot_grids')
+kde_scatter = lazy_import('bayesflow.density', 'kde_scatter')
+recovery_metrics = lazy_import('bayesflow.recovery', 'recovery_metrics')
+
 
+def _tabulate(contour=(3, 201), marginals=(5, 151, 8)):
+    """ Returns a ``deferrable`` hook evaluating the posterior callable on the plot grids in the calling process,
+    so that deferred plot specs hold the arrays instead of the (often unpicklable) callable. """
 
+    def evaluate(arguments):
+        if not arguments.get('show_level_set', True):
+            return {'posterior_xy': None}
+        return {'posterior_xy': posterior_plot_grids(arguments['param_samples'], arguments['posterior_xy'], contour,
+                                                     marginals, arguments['vectorized'])}
+    return evaluate
+
+
+@deferrable
 def true_vs_estimated(theta_true, theta_est, param_names, figsize=(8, 4), show=True, filename=None, font_size=12):
     """ Plots a scatter plot with abline of the estimated posterior means vs true values. """
 
@@ -26,6 +45,9 @@ def true_vs_estimated(theta_true, theta_est, param_names, figsize=(8, 4), show=T
     if n_row > 1:
         axarr = axarr.flat
         
+    # Compute NRMSE and R2 of all parameters at once
+    metrics = recovery_metrics(theta_true, theta_est)
+
     # --- Plot true vs estimated posterior means on a single row --- #
     for j in range(len(param_names)):
         
@@ -39,18 +61,15 @@ def true_vs_estimated(theta_true, theta_est, param_names, figsize=(8, 4), show=T
         axarr[j].set_ylim((lower_lim, upper_lim))
         axarr[j].plot(axarr[j].get_xlim(), axarr[j].get_xlim(), '--', color='black')
         
-        # Compute NRMSE
-        rmse = np.sqrt(np.mean( (theta_est[:, j] - theta_true[:, j])**2 ))
-        nrmse = rmse / (theta_true[:, j].max() - theta_true[:, j].min())
-        axarr[j].text(0.1, 0.9, 'NRMSE={:.3f}'.format(nrmse),
+        # Add NRMSE
+        axarr[j].text(0.1, 0.9, 'NRMSE={:.3f}'.format(metrics['nrmse'][j]),
                      horizontalalignment='left',
                      verticalalignment='center',
                      transform=axarr[j].transAxes,
                      size=12)
         
-        # Compute R2
-        r2 = r2_score(theta_true[:, j], theta_est[:, j])
-        axarr[j].text(0.1, 0.8, '$R^2$={:.3f}'.format(r2),
+        # Add R2
+        axarr[j].text(0.1, 0.8, '$R^2$={:.3f}'.format(metrics['r2'][j]),
                      horizontalalignment='left',
                      verticalalignment='center',
                      transform=axarr[j].transAxes, 
@@ -74,6 +93,7 @@ def true_vs_estimated(theta_true, theta_est, param_names, figsize=(8, 4), show=T
     return f
 
 
+@deferrable
 def plot_sbc(theta_samples, theta_test, param_names, bins=25, figsize=(8, 4), interval=0.99, show=True, filename=None, font_size=12):
     """ Plots the simulation-based posterior checking histograms as advocated by Talts et al. (2018). """
 
@@ -90,8 +110,8 @@ def plot_sbc(theta_samples, theta_test, param_names, bins=25, figsize=(8, 4), in
     if n_row > 1:
         axarr = axarr.flat
 
-    # Compute ranks (using broadcasting)    
-    ranks = np.sum(theta_samples < theta_test[:, np.newaxis, :], axis=1)
+    # Compute ranks (chunked over test sets)
+    ranks = sbc_ranks(theta_samples, theta_test)
     
     # Compute interval
     endpoints = binom.interval(interval, N, 1 / (bins))
@@ -123,37 +143,22 @@ def plot_sbc(theta_samples, theta_test, param_names, bins=25, figsize=(8, 4), in
     return f
       
         
-def plot_posterior(param_samples, posterior_xy, filename=None, font_size=12):
-    mean_sample = np.mean(param_samples, axis=0)
-    cov_sample = np.cov(param_samples.transpose())
-    mean_x = mean_sample[0]
-    mean_y = mean_sample[1]
-    std_x = np.sqrt(cov_sample[0, 0])
-    std_y = np.sqrt(cov_sample[1, 1])
+@deferrable(evaluate=_tabulate())
+def plot_posterior(param_samples, posterior_xy, filename=None, font_size=12, vectorized=False):
+    grids = posterior_plot_grids(param_samples, posterior_xy, vectorized=vectorized)
 
     fig = plt.figure(figsize=(15, 5))
     plt.rcParams['font.size'] = font_size
     
     plt.subplot(1, 3, 1)
     # Level sets of analytic posterior distribution
-    grid = 201
-    A = np.linspace(mean_x - 3 * std_x, mean_x + 3 * std_x, grid)
-    B = np.linspace(mean_y - 3 * std_y, mean_y + 3 * std_y, grid)
-    true_posterior = np.zeros((grid, grid))
-    for iy in range(0, grid):
-        for ix in range(0, grid):
-            true_posterior[iy][ix] = posterior_xy(A[ix], B[iy])
+    A, B, true_posterior = grids['contour']
     #levels = np.array([40, 90, 150, 210, 275, 330])
     true_posterior = plt.contour(A, B, true_posterior, colors='blue')
     h1, _ = true_posterior.legend_elements()
     plt.clabel(true_posterior, fontsize=9, inline=1)
     # Kernel density estimator of BayesFlow samples
-    a = param_samples[:, 0]
-    b = param_samples[:, 1]
-    ab = np.vstack([a, b])
-    z = stats.gaussian_kde(ab)(ab)
-    ida = z.argsort()  # Sort the points by density, so that the densest points are plotted last
-    a, b, z = a[ida], b[ida], z[ida]
+    a, b, z = kde_scatter(param_samples[:, 0], param_samples[:, 1])  # Sorted, densest points last
     approximate_posterior = plt.scatter(a, b, c=z, s=30)
     h2, _ = approximate_posterior.legend_elements()
     plt.legend([h2[0], h1[0]], ['BayesFlow', 'True posterior'], fontsize=11)
@@ -161,28 +166,15 @@ def plot_posterior(param_samples, posterior_xy, filename=None, font_size=12):
     plt.ylabel('Parameter $c$', fontsize=14)
 
     # Check marginal densities
-    grid = 151
-    A = np.linspace(mean_x - 5 * std_x, mean_x + 5 * std_x, grid)
-    B = np.linspace(mean_y - 5 * std_y, mean_y + 5 * std_y, grid)
-    bounds = np.array([mean_x - 8 * std_x, mean_x + 8 * std_x, mean_y - 8 * std_y, mean_y + 8 * std_y])
+    A, B, marginal_x, marginal_y = grids['marginals']
     plt.subplot(1, 3, 2)
     plt.hist(param_samples[:, 0], bins='auto', density=1, color='orange', label='BayesFlow')
-    marginal_x = np.zeros(grid)
-    for i in range(grid):
-        x = A[i]
-        integrand_y = lambda y: posterior_xy(x, y)
-        marginal_x[i] = quad(integrand_y, bounds[2], bounds[3])[0]
     plt.plot(A, marginal_x, color='b', label='True posterior')
     plt.ylabel('Marginal density', fontsize=14)
     plt.xlabel('Parameter $b$', fontsize=14)
     plt.legend(fontsize=11)
     plt.subplot(1, 3, 3)
     plt.hist(param_samples[:, 1], bins='auto', density=1, color='orange', label='BayesFlow')
-    marginal_y = np.zeros(grid)
-    for j in range(grid):
-        y = B[j]
-        integrand_x = lambda x: posterior_xy(x, y)
-        marginal_y[j] = quad(integrand_x, bounds[0], bounds[1])[0]
     plt.plot(B, marginal_y, color='b', label='True posterior')
     plt.ylabel('Marginal density', fontsize=14)
     plt.xlabel('Parameter $c$', fontsize=14)
@@ -202,12 +194,7 @@ def plot_posterior_comparison(param_samples, A, B, C, D, true_posterior, margina
     h1, _ = true_posterior.legend_elements()
     
     # Kernel density estimator of BayesFlow samples
-    a = param_samples[:, 0]
-    b = param_samples[:, 1]
-    ab = np.vstack([a, b])
-    z = stats.gaussian_kde(ab)(ab)
-    ida = z.argsort()  # Sort the points by density, so that the densest points are plotted last
-    a, b, z = a[ida], b[ida], z[ida]
+    a, b, z = kde_scatter(param_samples[:, 0], param_samples[:, 1])  # Sorted, densest points last
     approximate_posterior = plt.scatter(a, b, c=z, s=30)
     h2, _ = approximate_posterior.legend_elements()
     plt.title(method, fontsize=20, loc='left', pad=8)
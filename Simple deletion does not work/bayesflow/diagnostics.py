@@ -1,16 +1,34 @@
-import matplotlib.pyplot as plt
-import matplotlib.gridspec as gridspec
 import numpy as np
-import seaborn as sns
-from scipy.stats import binom, norm
-import scipy.stats as stats
-from scipy.integrate import quad, solve_ivp, dblquad
-from sklearn.metrics import r2_score, confusion_matrix, mean_squared_error
+
+from bayesflow.lazy import lazy_import
+from bayesflow.rendering import deferrable
+
+plt = lazy_import('matplotlib.pyplot')
+gridspec = lazy_import('matplotlib.gridspec')
+sns = lazy_import('seaborn')
+binom = lazy_import('scipy.stats', 'binom')
+norm = lazy_import('scipy.stats', 'norm')
+stats = lazy_import('scipy.stats')
+quad = lazy_import('scipy.integrate', 'quad')
+dblquad = lazy_import('scipy.integrate', 'dblquad')
+confusion_matrix = lazy_import('sklearn.metrics', 'confusion_matrix')
 #from matplotlib.ticker import FormatStrFormatter
 
-from bayesflow.computational_utilities import expected_calibration_error
+expected_calibration_error = lazy_import('bayesflow.computational_utilities', 'expected_calibration_error')
+sbc_ranks = lazy_import('bayesflow.sbc', 'sbc_ranks')
+recovery_metrics = lazy_import('bayesflow.recovery', 'recovery_metrics')
+conversion_reaction = lazy_import('bayesflow.simulators', 'conversion_reaction')
+predictive_trajectories = lazy_import('bayesflow.predictive', 'predictive_trajectories')
+predictive_bands = lazy_import('bayesflow.predictive', 'predictive_bands')
+thin_traces = lazy_import('bayesflow.predictive', 'thin_traces')
+plot_trajectories = lazy_import('bayesflow.predictive', 'plot_trajectories')
+plot_predictive_bands = lazy_import('bayesflow.predictive', 'plot_predictive_bands')
+
+# Dense time grid of the posterior predictive trajectories
+_PREDICTIVE_GRID = np.linspace(0, 10, 201)
 
 
+@deferrable
 def true_vs_estimated(theta_true, theta_est, param_names, dpi=300, figsize=(20, 4), show=True, filename=None, font_size=12):
     """ Plots a scatter plot with abline of the estimated posterior means vs true values.
 
@@ -45,6 +63,9 @@ def true_vs_estimated(theta_true, theta_est, param_names, dpi=300, figsize=(20,
     if n_row > 1:
         axarr = axarr.flat
         
+    # Compute NRMSE and R2 of all parameters at once
+    metrics = recovery_metrics(theta_true, theta_est)
+
     # --- Plot true vs estimated posterior means on a single row --- #
     for j in range(len(param_names)):
         
@@ -58,18 +79,15 @@ def true_vs_estimated(theta_true, theta_est, param_names, dpi=300, figsize=(20,
         axarr[j].set_ylim((lower_lim, upper_lim))
         axarr[j].plot(axarr[j].get_xlim(), axarr[j].get_xlim(), '--', color='black')
         
-        # Compute NRMSE
-        rmse = np.sqrt(np.mean( (theta_est[:, j] - theta_true[:, j])**2 ))
-        nrmse = rmse / (theta_true[:, j].max() - theta_true[:, j].min())
-        axarr[j].text(0.1, 0.9, 'NRMSE={:.3f}'.format(nrmse),
+        # Add NRMSE
+        axarr[j].text(0.1, 0.9, 'NRMSE={:.3f}'.format(metrics['nrmse'][j]),
                      horizontalalignment='left',
                      verticalalignment='center',
                      transform=axarr[j].transAxes,
                      size=10)
         
-        # Compute R2
-        r2 = r2_score(theta_true[:, j], theta_est[:, j])
-        axarr[j].text(0.1, 0.8, '$R^2$={:.3f}'.format(r2),
+        # Add R2
+        axarr[j].text(0.1, 0.8, '$R^2$={:.3f}'.format(metrics['r2'][j]),
                      horizontalalignment='left',
                      verticalalignment='center',
                      transform=axarr[j].transAxes, 
@@ -93,6 +111,7 @@ def true_vs_estimated(theta_true, theta_est, param_names, dpi=300, figsize=(20,
     return f
 
 
+@deferrable
 def plot_sbc(theta_samples, theta_test, param_names, bins=25, figsize=(24, 12), interval=0.99, show=True, filename=None, font_size=12):
     """ Plots the simulation-based posterior checking histograms as advocated by Talts et al. (2018).
 
@@ -130,8 +149,8 @@ def plot_sbc(theta_samples, theta_test, param_names, bins=25, figsize=(24, 12),
     if n_row > 1:
         axarr = axarr.flat
 
-    # Compute ranks (using broadcasting)    
-    ranks = np.sum(theta_samples < theta_test[:, np.newaxis, :], axis=1)
+    # Compute ranks (chunked over test sets)
+    ranks = sbc_ranks(theta_samples, theta_test)
     
     # Compute interval
     endpoints = binom.interval(interval, N, 1 / (bins))
@@ -164,7 +183,7 @@ def plot_sbc(theta_samples, theta_test, param_names, bins=25, figsize=(24, 12),
 
 
 def plot_confusion_matrix(m_true, m_pred, model_names, normalize=False, 
-                          cmap=plt.cm.Blues, figsize=(14, 8), annotate=True, show=True):
+                          cmap=None, figsize=(14, 8), annotate=True, show=True):
     """A function to print and plots the confusion matrix. Normalization can be applied by setting `normalize=True`.
 
     Parameters
@@ -177,8 +196,8 @@ def plot_confusion_matrix(m_true, m_pred, model_names, normalize=False,
         List of model names for plotting
     normalize: bool, default: False
         Controls whether normalization shall be applied
-    cmap: matplotlib.pyplot.cm.*, default: plt.cm.Blues
-        Colormap
+    cmap: matplotlib.pyplot.cm.*, default: None
+        Colormap, None uses plt.cm.Blues
     figsize: tuple(int, int), default: (14, 8)
         Figure size
     annotate: bool, default: True
@@ -188,6 +207,9 @@ def plot_confusion_matrix(m_true, m_pred, model_names, normalize=False,
 
     """
 
+    if cmap is None:
+        cmap = plt.cm.Blues
+
     # Take argmax of true and pred
     m_true = np.argmax(m_true, axis=1).astype(np.int32)
     m_pred = np.argmax(m_pred, axis=1).astype(np.int32)
@@ -358,25 +380,34 @@ def plot_marginal(ax, result, param_samples):
     
     
 
-def predictive_check(ax, param_prior, result, param_samples, n_sim=301):
-    def conversion_reaction(t, x, theta):
-        theta = 10**theta
-        return np.array([-theta[0]*x[0]+theta[1]*x[1], theta[0]*x[0]-theta[1]*x[1]])
-    x0 = [1,0]      
+def _plot_predictive_simulations(ax, param_samples, n_sim, linewidth, alpha, style='traces', n_traces=None):
+    """ Plots posterior predictive simulations of the conversion reaction model on a dense time grid.
+
+    All ``n_sim`` draws are solved in one vectorized call. ``style='traces'`` draws them as a single line
+    collection (thinned to ``n_traces`` if given), ``style='bands'`` draws their median with 50% and 90% bands
+    and ``n_traces`` optional traces.
+    """
+
+    traj = predictive_trajectories(conversion_reaction, param_samples, _PREDICTIVE_GRID, n_draws=n_sim)
+    # Legend handle of the simulations
+    ax.plot(_PREDICTIVE_GRID[:1], traj[0, :1], color='grey', label='Simulation', linewidth=0.9)
+    if style == 'bands':
+        plot_predictive_bands(ax, _PREDICTIVE_GRID, predictive_bands(traj))
+        if n_traces:
+            plot_trajectories(ax, _PREDICTIVE_GRID, thin_traces(traj, n_traces), linewidth=linewidth, alpha=alpha)
+    else:
+        traces = traj[1:] if n_traces is None else thin_traces(traj, n_traces)
+        plot_trajectories(ax, _PREDICTIVE_GRID, traces, linewidth=linewidth, alpha=alpha)
+
+
+def predictive_check(ax, param_prior, result, param_samples, n_sim=301, style='traces', n_traces=None):
     n_obs = 11
     time_points = np.linspace(0, 10, n_obs)
     
     # Posterior predictive check
-    for k in range(n_sim):
-        rhs = lambda t,x: conversion_reaction(t, x, param_samples[k])
-        sol = solve_ivp(rhs, t_span = (0,10), y0 = x0, atol = 1e-9, rtol = 1e-6)
-        if k == 0: 
-            ax[2].plot(sol.t[0], sol.y[1][0], color='grey', label='Simulation', linewidth=0.9)
-        else: 
-            ax[2].plot(sol.t, sol.y[1], color='grey', linewidth=0.6, alpha=0.3) 
-    rhs = lambda t,x: conversion_reaction(t, x, param_prior[0])
-    sol = solve_ivp(rhs, t_span = (0,10), y0 = x0, atol = 1e-9, rtol = 1e-6)
-    ax[2].plot(sol.t, sol.y[1], color='black', label='True trajectory') 
+    _plot_predictive_simulations(ax[2], param_samples, n_sim, 0.6, 0.3, style, n_traces)
+    ax[2].plot(_PREDICTIVE_GRID, conversion_reaction(param_prior[0], _PREDICTIVE_GRID)[0], color='black',
+               label='True trajectory')
     present_indices = result[1]
     missing_indices = np.setdiff1d(range(n_obs), present_indices)
     ax[2].plot(time_points[present_indices], result[0][present_indices], 'o', color='blue', label='Available data')
@@ -1,7 +1,10 @@
 import numpy as np
 import tensorflow as tf
 from functools import partial
-from sklearn.metrics import r2_score
+
+from bayesflow.lazy import lazy_import
+
+r2_score = lazy_import('sklearn.metrics', 'r2_score')
 
 
 def gaussian_kernel_matrix(x, y, sigmas):
@@ -0,0 +1,16 @@
+import os
+import pkgutil
+
+# The experiment folder only holds its own modules (diagnostics, error metrics). All other modules are resolved from
+# the core package at the repository root or, if the folder is used on its own, from the installed package
+_CORE = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'bayesflow')
+if os.path.isfile(os.path.join(_CORE, '__init__.py')):
+    __path__.append(_CORE)
+else:
+    __path__ = pkgutil.extend_path(__path__, __name__)
+
+from bayesflow.lazy import lazy_submodules  # noqa: E402
+
+# Submodules are imported on first attribute access, so that e.g. ``import bayesflow`` in a headless training job
+# does not load the plotting stack of ``bayesflow.diagnostics``
+_SUBMODULES, __getattr__, __dir__ = lazy_submodules(__name__, __path__, globals())
@@ -1,16 +1,28 @@
-import matplotlib.pyplot as plt
-import matplotlib.gridspec as gridspec
 import numpy as np
-import seaborn as sns
-from scipy.stats import binom, norm
-import scipy.stats as stats
-from scipy.integrate import quad, solve_ivp, dblquad
-from sklearn.metrics import r2_score, confusion_matrix, mean_squared_error
+
+from bayesflow.lazy import lazy_import
+from bayesflow.rendering import deferrable
+
+plt = lazy_import('matplotlib.pyplot')
+gridspec = lazy_import('matplotlib.gridspec')
+sns = lazy_import('seaborn')
+binom = lazy_import('scipy.stats', 'binom')
+norm = lazy_import('scipy.stats', 'norm')
+quad = lazy_import('scipy.integrate', 'quad')
+solve_ivp = lazy_import('scipy.integrate', 'solve_ivp')
+dblquad = lazy_import('scipy.integrate', 'dblquad')
+confusion_matrix = lazy_import('sklearn.metrics', 'confusion_matrix')
 #from matplotlib.ticker import FormatStrFormatter
 
-from bayesflow.computational_utilities import expected_calibration_error
+expected_calibration_error = lazy_import('bayesflow.computational_utilities', 'expected_calibration_error')
+sbc_ranks = lazy_import('bayesflow.sbc', 'sbc_ranks')
+kde_scatter = lazy_import('bayesflow.density', 'kde_scatter')
+recovery_metrics = lazy_import('bayesflow.recovery', 'recovery_metrics')
+batch_histograms = lazy_import('bayesflow.density', 'batch_histograms')
+batch_kde_1d = lazy_import('bayesflow.density', 'batch_kde_1d')
 
 
+@deferrable
 def true_vs_estimated(theta_true, theta_est, param_names, dpi=300, figsize=(20, 4), show=True, filename=None, font_size=12):
     """ Plots a scatter plot with abline of the estimated posterior means vs true values.
 
@@ -45,6 +57,9 @@ def true_vs_estimated(theta_true, theta_est, param_names, dpi=300, figsize=(20,
     if n_row > 1:
         axarr = axarr.flat
         
+    # Compute NRMSE and R2 of all parameters at once
+    metrics = recovery_metrics(theta_true, theta_est)
+
     # --- Plot true vs estimated posterior means on a single row --- #
     for j in range(len(param_names)):
         
@@ -58,18 +73,15 @@ def true_vs_estimated(theta_true, theta_est, param_names, dpi=300, figsize=(20,
         axarr[j].set_ylim((lower_lim, upper_lim))
         axarr[j].plot(axarr[j].get_xlim(), axarr[j].get_xlim(), '--', color='black')
         
-        # Compute NRMSE
-        rmse = np.sqrt(np.mean( (theta_est[:, j] - theta_true[:, j])**2 ))
-        nrmse = rmse / (theta_true[:, j].max() - theta_true[:, j].min())
-        axarr[j].text(0.1, 0.9, 'NRMSE={:.3f}'.format(nrmse),
+        # Add NRMSE
+        axarr[j].text(0.1, 0.9, 'NRMSE={:.3f}'.format(metrics['nrmse'][j]),
                      horizontalalignment='left',
                      verticalalignment='center',
                      transform=axarr[j].transAxes,
                      size=10)
         
-        # Compute R2
-        r2 = r2_score(theta_true[:, j], theta_est[:, j])
-        axarr[j].text(0.1, 0.8, '$R^2$={:.3f}'.format(r2),
+        # Add R2
+        axarr[j].text(0.1, 0.8, '$R^2$={:.3f}'.format(metrics['r2'][j]),
                      horizontalalignment='left',
                      verticalalignment='center',
                      transform=axarr[j].transAxes, 
@@ -93,6 +105,7 @@ def true_vs_estimated(theta_true, theta_est, param_names, dpi=300, figsize=(20,
     return f
 
 
+@deferrable
 def plot_sbc(theta_samples, theta_test, param_names, bins=25, figsize=(24, 12), interval=0.99, show=True, filename=None, font_size=12):
     """ Plots the simulation-based posterior checking histograms as advocated by Talts et al. (2018).
 
@@ -130,8 +143,8 @@ def plot_sbc(theta_samples, theta_test, param_names, bins=25, figsize=(24, 12),
     if n_row > 1:
         axarr = axarr.flat
 
-    # Compute ranks (using broadcasting)    
-    ranks = np.sum(theta_samples < theta_test[:, np.newaxis, :], axis=1)
+    # Compute ranks (chunked over test sets)
+    ranks = sbc_ranks(theta_samples, theta_test)
     
     # Compute interval
     endpoints = binom.interval(interval, N, 1 / (bins))
@@ -164,7 +177,7 @@ def plot_sbc(theta_samples, theta_test, param_names, bins=25, figsize=(24, 12),
 
 
 def plot_confusion_matrix(m_true, m_pred, model_names, normalize=False, 
-                          cmap=plt.cm.Blues, figsize=(14, 8), annotate=True, show=True):
+                          cmap=None, figsize=(14, 8), annotate=True, show=True):
     """A function to print and plots the confusion matrix. Normalization can be applied by setting `normalize=True`.
 
     Parameters
@@ -177,8 +190,8 @@ def plot_confusion_matrix(m_true, m_pred, model_names, normalize=False,
         List of model names for plotting
     normalize: bool, default: False
         Controls whether normalization shall be applied
-    cmap: matplotlib.pyplot.cm.*, default: plt.cm.Blues
-        Colormap
+    cmap: matplotlib.pyplot.cm.*, default: None
+        Colormap, None uses plt.cm.Blues
     figsize: tuple(int, int), default: (14, 8)
         Figure size
     annotate: bool, default: True
@@ -188,6 +201,9 @@ def plot_confusion_matrix(m_true, m_pred, model_names, normalize=False,
 
     """
 
+    if cmap is None:
+        cmap = plt.cm.Blues
+
     # Take argmax of true and pred
     m_true = np.argmax(m_true, axis=1).astype(np.int32)
     m_pred = np.argmax(m_pred, axis=1).astype(np.int32)
@@ -314,6 +330,12 @@ def plot_true_est_posterior(model, n_samples, param_names, n_test=None, data_gen
 
     theta_samples = model.sample(X_test, n_samples)
     theta_samples_means = theta_samples.mean(axis=1)
+
+    # Histograms and KDE curves of all cells at once, KDE scaled to counts as in sns.histplot
+    cell_samples = np.swapaxes(theta_samples, 1, 2)
+    edges, counts = batch_histograms(cell_samples, bins=15)
+    grid, density = batch_kde_1d(cell_samples)
+    density = density * cell_samples.shape[-1] * (edges[..., 1:2] - edges[..., 0:1])
     
     # For each row 
     for i in range(n_test):
@@ -321,8 +343,9 @@ def plot_true_est_posterior(model, n_samples, param_names, n_test=None, data_gen
         for j in range(len(param_names)):
                         
             # Plot approximate posterior
-            sns.histplot(theta_samples[i, :, j], kde=True, ax=axarr[i, j], bins=15,
-                            label='Estimated posterior', color='#5c92e8')
+            axarr[i, j].stairs(counts[i, j], edges[i, j], fill=True, color='#5c92e8', alpha=0.5,
+                               label='Estimated posterior')
+            axarr[i, j].plot(grid[i, j], density[i, j], color='#5c92e8')
             
             # Plot lines for approximate mean, analytic mean and true data-generating value
             axarr[i, j].axvline(theta_samples_means[i, j], color='#5c92e8', label='Estimated mean')
@@ -363,12 +386,7 @@ def plot_posterior_comparison(param_samples, A, B, C, D, true_posterior, margina
     h1, _ = true_posterior.legend_elements()
     
     # Kernel density estimator of BayesFlow samples
-    a = param_samples[:, 0]
-    b = param_samples[:, 1]
-    ab = np.vstack([a, b])
-    z = stats.gaussian_kde(ab)(ab)
-    ida = z.argsort()  # Sort the points by density, so that the densest points are plotted last
-    a, b, z = a[ida], b[ida], z[ida]   
+    a, b, z = kde_scatter(param_samples[:, 0], param_samples[:, 1])  # Sorted, densest points last
     #plt.xticks([0.197, 0.198, 0.199, 0.200, 0.201])
     #plt.xticks([-0.48, -0.46, -0.44, -0.42, -0.40, -0.38, -0.36])
     #plt.yticks([-1.0, -0.8, -0.6, -0.4, -0.2])
@@ -448,12 +466,7 @@ def plot_posterior(ax, i, j, result, param_samples, method, levels=None):
     h1, _ = true_posterior.legend_elements()
     
     # Kernel density estimator of BayesFlow samples
-    a = param_samples[:, 0]
-    b = param_samples[:, 1]
-    ab = np.vstack([a, b])
-    z = stats.gaussian_kde(ab)(ab)
-    ida = z.argsort()  # Sort the points by density, so that the densest points are plotted last
-    a, b, z = a[ida], b[ida], z[ida]
+    a, b, z = kde_scatter(param_samples[:, 0], param_samples[:, 1])  # Sorted, densest points last
     approximate_posterior = ax[i,3*j].scatter(a, b, c=z, s=25)
     h2, _ = approximate_posterior.legend_elements()
     #if j == 1:
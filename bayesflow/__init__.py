@@ -0,0 +1,5 @@
+from bayesflow.lazy import lazy_submodules
+
+# Submodules are imported on first attribute access, so that e.g. ``import bayesflow`` in a headless training job
+# does not load the plotting stack of ``bayesflow.diagnostics``
+_SUBMODULES, __getattr__, __dir__ = lazy_submodules(__name__, __path__, globals())
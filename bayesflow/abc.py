@@ -0,0 +1,195 @@
+import os
+import time
+from multiprocessing import Pool
+
+import numpy as np
+from scipy.special import logsumexp
+
+
+def euclidean_distance(x, observed):
+    """ Batched L2 distance between simulated data sets of shape (n_sim, ...) and the observed data set. """
+
+    diff = np.reshape(x - observed[np.newaxis], (x.shape[0], -1))
+    return np.sqrt(np.sum(diff ** 2, axis=1))
+
+
+class _ChunkSimulator:
+    """ Picklable task simulating a chunk of parameters with its own seed. """
+
+    def __init__(self, simulate):
+        self.simulate = simulate
+
+    def __call__(self, args):
+        theta, seed = args
+        return self.simulate(theta, np.random.default_rng(seed))
+
+
+class ABCSMC:
+    """ Batched ABC-SMC (population Monte Carlo ABC) with vectorized proposals, prior evaluations and simulations.
+
+    Each generation proposes whole batches of particles, simulates them at once (optionally split over worker
+    processes) and accepts all particles within the current tolerance, until the population is full. Tolerances
+    follow the median of the previous population's distances, the perturbation kernel is a Gaussian with twice
+    the weighted population covariance (Beaumont et al., 2009).
+
+    Examples
+    --------
+    Stochastic SIR model with partially missing observations
+
+    >>> class SIRSimulator:
+    ...     def __init__(self, present_indices):
+    ...         self.present_indices = present_indices
+    ...     def __call__(self, theta, rng):
+    ...         return sir_tau_leaping(theta, rng=rng)[:, self.present_indices]
+    >>> abc = ABCSMC(SIRSimulator(present_indices), sir_prior_sample, sir_prior_log_pdf, population_size=2000,
+    ...              n_processes=None, seed=42)
+    >>> result = abc.run(data_set, min_acceptance_rate=2e-3)
+    >>> result['times']   # wall-clock seconds per generation
+    """
+
+    def __init__(self, simulate, prior_sample, prior_log_pdf, distance=euclidean_distance, population_size=2000,
+                 batch_size=None, n_processes=1, seed=None):
+        """ Creates a batched ABC-SMC sampler.
+
+        Parameters
+        ----------
+        simulate        : callable
+            Batched simulator with signature ``x = simulate(theta, rng)``, where ``theta`` has shape (n_sim, n_params),
+            e.g., :func:`bayesflow.simulators.sir_tau_leaping` restricted to the observed time points.
+            Must be picklable (e.g., a module-level function) if ``n_processes != 1``
+        prior_sample    : callable
+            Batched prior sampler with signature ``theta = prior_sample(n_sim, rng)``
+        prior_log_pdf   : callable
+            Batched prior log-density, mapping (n_sim, n_params) to (n_sim, )
+        distance        : callable, default: euclidean_distance
+            Batched distance with signature ``d = distance(x, observed)`` returning shape (n_sim, )
+        population_size : int, default: 2000
+            Number of accepted particles per generation
+        batch_size      : int or None, default: None
+            Number of particles proposed and simulated at once. ``None`` uses the population size
+        n_processes     : int or None, default: 1
+            Number of worker processes for the simulations. ``None`` uses all cores
+        seed            : int or None, default: None
+            Seed of the sampler
+        """
+
+        self.simulate = simulate
+        self.prior_sample = prior_sample
+        self.prior_log_pdf = prior_log_pdf
+        self.distance = distance
+        self.population_size = population_size
+        self.batch_size = population_size if batch_size is None else batch_size
+        self.n_processes = n_processes
+        self.seed_sequence = np.random.SeedSequence(seed)
+        self.rng = np.random.default_rng(self.seed_sequence.spawn(1)[0])
+
+    def _simulate(self, theta, pool):
+        """ Simulates a batch of parameters, split into one chunk per worker process if a pool is given. """
+
+        if pool is None:
+            return self.simulate(theta, self.rng)
+        n_chunks = self.n_processes or os.cpu_count()
+        chunks = np.array_split(theta, n_chunks)
+        seeds = self.seed_sequence.spawn(n_chunks)
+        x = pool.map(_ChunkSimulator(self.simulate), [(c, s) for c, s in zip(chunks, seeds) if c.shape[0] > 0])
+        return np.concatenate(x, axis=0)
+
+    def _propose(self, n, particles, weights, cov):
+        """ Draws n proposals from the perturbed previous population and discards those outside the prior support. """
+
+        idx = self.rng.choice(particles.shape[0], size=n, p=weights)
+        theta = particles[idx] + self.rng.multivariate_normal(np.zeros(particles.shape[1]), cov, size=n)
+        return theta[np.isfinite(self.prior_log_pdf(theta))]
+
+    def _log_weights(self, theta, particles, weights, cov):
+        """ Computes the importance log-weights prior / mixture-proposal density of the accepted particles. """
+
+        prec = np.linalg.inv(cov)
+        diff = theta[:, np.newaxis, :] - particles[np.newaxis, :, :]
+        log_kernel = -0.5 * np.einsum('ijk,kl,ijl->ij', diff, prec, diff)
+        log_proposal = logsumexp(log_kernel, axis=1, b=weights[np.newaxis, :])
+        return self.prior_log_pdf(theta) - log_proposal
+
+    def run(self, observed, max_generations=20, min_acceptance_rate=2e-3, min_epsilon=0., p_bar=None):
+        """ Runs ABC-SMC for an observed data set.
+
+        Parameters
+        ----------
+        observed            : np.ndarray
+            The observed data set, with the shape of a single simulated data set
+        max_generations     : int, default: 20
+            Maximum number of generations
+        min_acceptance_rate : float, default: 2e-3
+            Stops once the acceptance rate of a generation falls below this value
+        min_epsilon         : float, default: 0.
+            Stops once the tolerance falls below this value
+        p_bar               : progressbar or None
+            Updated once per generation
+
+        Returns
+        -------
+        result : dict
+            Dictionary with keys ``'samples'`` and ``'weights'`` of the final population and the per-generation
+            lists ``'epsilons'``, ``'acceptance_rates'``, ``'n_simulations'`` and ``'times'`` (wall-clock seconds)
+        """
+
+        observed = np.asarray(observed)
+        history = {'epsilons': [], 'acceptance_rates': [], 'n_simulations': [], 'times': []}
+
+        pool = Pool(self.n_processes) if self.n_processes != 1 else None
+        try:
+            particles, weights, distances, cov = None, None, None, None
+            for t in range(max_generations):
+                tic = time.perf_counter()
+                epsilon = np.inf if t == 0 else np.median(distances)
+
+                # Propose, simulate and accept batches until the population is full
+                accepted_theta, accepted_d = [], []
+                n_accepted, n_sim = 0, 0
+                while n_accepted < self.population_size:
+                    if t == 0:
+                        theta = self.prior_sample(self.batch_size, self.rng)
+                    else:
+                        theta = self._propose(self.batch_size, particles, weights, cov)
+                    if theta.shape[0] == 0:
+                        continue
+                    d = self.distance(self._simulate(theta, pool), observed)
+                    n_sim += theta.shape[0]
+                    accept = d <= epsilon
+                    accepted_theta.append(theta[accept])
+                    accepted_d.append(d[accept])
+                    n_accepted += int(np.sum(accept))
+
+                theta = np.concatenate(accepted_theta, axis=0)[:self.population_size]
+                d = np.concatenate(accepted_d, axis=0)[:self.population_size]
+
+                # Importance weights w.r.t. the previous population
+                if t == 0:
+                    weights = np.full(theta.shape[0], 1. / theta.shape[0])
+                else:
+                    log_w = self._log_weights(theta, particles, weights, cov)
+                    weights = np.exp(log_w - logsumexp(log_w))
+                particles, distances = theta, d
+                cov = 2 * np.atleast_2d(np.cov(particles, rowvar=False, aweights=weights))
+
+                acceptance_rate = self.population_size / n_sim
+                history['epsilons'].append(epsilon)
+                history['acceptance_rates'].append(acceptance_rate)
+                history['n_simulations'].append(n_sim)
+                history['times'].append(time.perf_counter() - tic)
+
+                if p_bar is not None:
+                    p_bar.set_postfix_str("Generation {0},Eps: {1:.3f},Acceptance: {2:.4f},Time: {3:.1f}s"
+                                          .format(t, epsilon, acceptance_rate, history['times'][-1]))
+                    p_bar.update(1)
+
+                if acceptance_rate < min_acceptance_rate or epsilon <= min_epsilon:
+                    break
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+        result = {'samples': particles, 'weights': weights}
+        result.update(history)
+        return result
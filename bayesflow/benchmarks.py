@@ -0,0 +1,217 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+# Heavy stacks that headless training jobs should not load
+HEAVY_MODULES = ('matplotlib', 'seaborn', 'sklearn', 'scipy.integrate', 'scipy.stats', 'pandas', 'tqdm.notebook',
+                 'ipywidgets')
+
+_IMPORT_SNIPPET = """
+import json, sys, time
+tic = time.perf_counter()
+{statement}
+toc = time.perf_counter()
+heavy = [m for m in {heavy!r} if m in sys.modules]
+print(json.dumps([toc - tic, heavy]))
+"""
+
+
+def import_time(statement, n_repeats=5, cwd=None):
+    """ Measures the cold-start time of an import statement, each repetition in a fresh interpreter.
+
+    Parameters
+    ----------
+    statement : str
+        The import statement, e.g., ``'from bayesflow.trainers import ParameterEstimationTrainer'``
+    n_repeats : int, default: 5
+        Number of fresh interpreters
+    cwd       : str or None, default: None
+        Working directory of the interpreters, e.g., an experiment folder with its own diagnostics. ``None`` uses
+        the current working directory
+
+    Returns
+    -------
+    result : dict
+        Dictionary with keys ``'times'`` (seconds per repetition), ``'median'`` and
+        ``'heavy_modules'`` (entries of ``HEAVY_MODULES`` loaded by the statement)
+    """
+
+    package_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [package_root, os.environ.get('PYTHONPATH')])),
+               TF_CPP_MIN_LOG_LEVEL='3')
+    code = _IMPORT_SNIPPET.format(statement=statement, heavy=HEAVY_MODULES)
+
+    times, heavy = [], []
+    for _ in range(n_repeats):
+        out = subprocess.run([sys.executable, '-c', code], cwd=cwd or os.getcwd(), env=env, check=True,
+                             stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, universal_newlines=True).stdout
+        t, heavy = json.loads(out.strip().splitlines()[-1])
+        times.append(t)
+    return {'times': times, 'median': float(np.median(times)), 'heavy_modules': heavy}
+
+
+def import_time_report(statements=None, n_repeats=5, cwd=None):
+    """ Prints the cold-start import times of the typical entry points of training and evaluation jobs.
+
+    Parameters
+    ----------
+    statements : list of str or None, default: None
+        Import statements to benchmark. ``None`` benchmarks the package, the training stack and the diagnostics
+    n_repeats  : int, default: 5
+        Number of fresh interpreters per statement
+    cwd        : str or None, default: None
+        Working directory of the interpreters, e.g., an experiment folder with its own diagnostics
+
+    Returns
+    -------
+    results : dict
+        Maps each statement to the result of :func:`import_time`
+    """
+
+    if statements is None:
+        statements = [
+            'import bayesflow',
+            'from bayesflow.trainers import ParameterEstimationTrainer',
+            'from bayesflow.networks import InvertibleNetwork',
+            'from bayesflow.diagnostics import *',
+            'import bayesflow.diagnostics as diag; diag.plt.figure',
+        ]
+    results = {}
+    for statement in statements:
+        res = import_time(statement, n_repeats, cwd)
+        results[statement] = res
+        print('{0:.3f}s  {1}  (heavy: {2})'.format(res['median'], statement, ', '.join(res['heavy_modules']) or '-'))
+    return results
+
+
+def host_overhead(batch_shape=(128, 41, 2), param_dim=5, dtype=np.float32, n_repeats=200):
+    """ Measures the per-step host overhead of handing a simulated batch to TensorFlow.
+
+    Compares the former conversion path (``np.array`` in the generative model, ``astype`` in the trainer and the
+    conversion to a tensor, i.e., three copies) with the copy-free path (:func:`bayesflow.helpers.as_float32`
+    in both places and the conversion to a tensor).
+
+    Parameters
+    ----------
+    batch_shape : tuple, default: (128, 41, 2)
+        Shape of the simulated data batch, e.g., batch size 128 with 41 time points and 2 channels
+    param_dim   : int, default: 5
+        Number of parameters
+    dtype       : np.dtype, default: np.float32
+        Output dtype of the simulator
+    n_repeats   : int, default: 200
+        Number of timed steps per path
+
+    Returns
+    -------
+    result : dict
+        Dictionary with keys ``'copying'`` and ``'copy_free'`` (median microseconds per step) and ``'speedup'``
+    """
+
+    import tensorflow as tf
+    from bayesflow.helpers import as_float32
+
+    rng = np.random.default_rng(42)
+    sim_data = rng.normal(size=batch_shape).astype(dtype)
+    params = rng.normal(size=(batch_shape[0], param_dim)).astype(dtype)
+
+    def copying():
+        p, x = np.array(params, dtype=np.float32), np.array(sim_data, dtype=np.float32)
+        p, x = p.astype(np.float32), x.astype(np.float32)
+        return tf.convert_to_tensor(p), tf.convert_to_tensor(x)
+
+    def copy_free():
+        p, x = as_float32(params), as_float32(sim_data)
+        p, x = as_float32(p), as_float32(x)
+        return tf.convert_to_tensor(p), tf.convert_to_tensor(x)
+
+    result = {}
+    for name, step in (('copying', copying), ('copy_free', copy_free)):
+        step()
+        times = []
+        for _ in range(n_repeats):
+            tic = time.perf_counter()
+            step()
+            times.append(time.perf_counter() - tic)
+        result[name] = 1e6 * float(np.median(times))
+    result['speedup'] = result['copying'] / result['copy_free']
+    print('Host overhead per step for a {} {} batch: {:.1f} us copying, {:.1f} us copy-free ({:.1f}x)'.format(
+        batch_shape, np.dtype(dtype).name, result['copying'], result['copy_free'], result['speedup']))
+    return result
+
+
+def execution_modes(network, params, sim_data, loss=None, modes=None, n_repeats=50):
+    """ Measures the time of a gradient step (forward and backward pass) of an amortizer in several execution modes.
+
+    Parameters
+    ----------
+    network   : bayesflow.amortizers.SingleModelAmortizer
+        The amortizer, its compute dtype is restored afterwards
+    params    : np.ndarray of shape (batch_size, n_params)
+        A batch of parameters
+    sim_data  : np.ndarray of shape (batch_size, n_obs, data_dim)
+        A batch of simulated data
+    loss      : callable or None, default: None
+        The loss, ``None`` uses :func:`bayesflow.losses.kl_latent_space_gaussian`
+    modes     : dict or None, default: None
+        Maps mode names to ``(jit_compile, compute_dtype)``, ``None`` compares eager float32, XLA float32 and XLA
+        bfloat16
+    n_repeats : int, default: 50
+        Number of timed steps per mode, after one warm-up step that traces and compiles
+
+    Returns
+    -------
+    result : dict
+        Maps mode names to dictionaries with keys ``'median'`` (milliseconds per step), ``'loss'`` and ``'speedup'``
+        relative to the first mode
+    """
+
+    import tensorflow as tf
+    from bayesflow.execution import compile_gradient_step, get_compute_dtype, set_compute_dtype
+    from bayesflow.losses import kl_latent_space_gaussian
+
+    if loss is None:
+        loss = kl_latent_space_gaussian
+    if modes is None:
+        modes = {'eager_float32': (False, None), 'xla_float32': (True, None), 'xla_bfloat16': (True, 'bfloat16')}
+    args = (tf.convert_to_tensor(params, dtype=tf.float32), tf.convert_to_tensor(sim_data, dtype=tf.float32))
+
+    def eager_step(*step_args):
+        with tf.GradientTape() as tape:
+            loss_value = loss(network, *step_args)
+        return loss_value, tape.gradient(loss_value, network.trainable_variables)
+
+    # Build the variables eagerly before tracing
+    loss(network, *args)
+    previous = get_compute_dtype(network)
+    result = {}
+    try:
+        for name, (jit_compile, compute_dtype) in modes.items():
+            set_compute_dtype(network, compute_dtype)
+            step = compile_gradient_step(loss, network) if jit_compile else eager_step
+            loss_value, _ = step(*args)
+            times = []
+            for _ in range(n_repeats):
+                tic = time.perf_counter()
+                _, gradients = step(*args)
+                tf.linalg.global_norm(gradients).numpy()
+                times.append(time.perf_counter() - tic)
+            result[name] = {'median': 1e3 * float(np.median(times)), 'loss': float(loss_value)}
+    finally:
+        set_compute_dtype(network, previous)
+
+    baseline = next(iter(result.values()))['median']
+    for name, res in result.items():
+        res['speedup'] = baseline / res['median']
+        print('{:>16}: {:8.2f} ms per step ({:.2f}x), loss {:.4f}'.format(name, res['median'], res['speedup'],
+                                                                          res['loss']))
+    return result
+
+
+if __name__ == '__main__':
+    import_time_report()
+    host_overhead()
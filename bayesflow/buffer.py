@@ -96,3 +96,28 @@ class MemoryReplayBuffer:
 
         # Increment index
         self._idx += 1
+
+    def get_state(self):
+        """ Returns the buffer contents and position, e.g., to store them with a training checkpoint.
+
+        The stored batches are not copied, since the buffer only ever replaces them.
+        """
+
+        return {
+            'capacity': self.capacity,
+            'params': list(self._buffer['params']),
+            'sim_data': list(self._buffer['sim_data']),
+            'idx': self._idx,
+            'size_in_batches': self.size_in_batches,
+            'is_full': self._is_full
+        }
+
+    def set_state(self, state):
+        """ Restores the buffer contents and position from the output of :meth:`get_state`.
+        """
+
+        self.capacity = state['capacity']
+        self._buffer = {'params': list(state['params']), 'sim_data': list(state['sim_data'])}
+        self._idx = state['idx']
+        self.size_in_batches = state['size_in_batches']
+        self._is_full = state['is_full']
@@ -0,0 +1,233 @@
+import os
+import pickle
+import queue
+import random
+import threading
+import time
+
+import numpy as np
+import tensorflow as tf
+
+
+def capture_rng_state():
+    """ Returns the state of the global NumPy and ``random`` RNG streams used by priors, simulators and buffers. """
+
+    return {'numpy': np.random.get_state(), 'random': random.getstate()}
+
+
+def restore_rng_state(rng_state):
+    """ Restores the global RNG streams from the output of :func:`capture_rng_state`. """
+
+    np.random.set_state(rng_state['numpy'])
+    random.setstate(rng_state['random'])
+
+
+def save_training_state(prefix, state):
+    """ Stores the Python-side training state next to the checkpoint with the given prefix.
+
+    The state is pickled to a temporary file and renamed to ``<prefix>.state``, so a crash never leaves a
+    partial state file behind.
+
+    Parameters
+    ----------
+    prefix : str
+        The prefix of the checkpoint, e.g., ``'checkpoints/ckpt-25'``
+    state  : dict
+        Picklable training state, e.g., epoch and iteration counters, loss history, RNG and buffer state
+    """
+
+    path = prefix + '.state'
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def load_training_state(prefix):
+    """ Loads the training state stored with :func:`save_training_state`.
+
+    Parameters
+    ----------
+    prefix : str or None
+        The prefix of the checkpoint
+
+    Returns
+    -------
+    state : dict or None
+        The training state, ``None`` if the checkpoint has no state file (e.g., it predates resumable training)
+    """
+
+    if prefix is None or not os.path.exists(prefix + '.state'):
+        return None
+    with open(prefix + '.state', 'rb') as f:
+        return pickle.load(f)
+
+
+class CheckpointWriter:
+    """ Writes training checkpoints every N steps without stalling the training loop.
+
+    The training thread only snapshots the variables to host memory (asynchronous checkpointing of TensorFlow)
+    and returns. A background thread waits for the write to complete, then publishes the checkpoint by atomically
+    replacing the ``checkpoint`` state file and removes checkpoints beyond ``max_to_keep``. Readers using
+    ``tf.train.latest_checkpoint`` (e.g., evaluation jobs polling the folder) therefore never see a partially
+    written checkpoint. On TensorFlow versions without asynchronous checkpointing, the write itself runs on the
+    training thread and only publishing and pruning run in the background.
+
+    Checkpoints are named ``ckpt-<step>`` after the optimizer step, so the step count, the optimizer slots and any
+    trackable learning-rate schedule restored from a checkpoint continue where training stopped. The Python-side
+    training state, if given, is written to ``ckpt-<step>.state`` before the checkpoint is published.
+
+    Attributes
+    ----------
+    n_saves       : int
+        Number of checkpoints written
+    blocking_time : float
+        Total wall-clock seconds the training thread spent in :meth:`save`. Divide by the number of saves and the
+        step time to obtain the checkpoint overhead per step
+    """
+
+    def __init__(self, checkpoint, directory, max_to_keep=5, save_every=None, async_write=True):
+        """ Creates a checkpoint writer.
+
+        Parameters
+        ----------
+        checkpoint  : tf.train.Checkpoint
+            The checkpoint tracking the network, the optimizer and further training state
+        directory   : str
+            The checkpoint folder
+        max_to_keep : int or None, default: 5
+            Number of checkpoints to keep, ``None`` keeps all
+        save_every  : int or None, default: None
+            Additionally saves every ``save_every`` optimizer steps. ``None`` saves at the end of each epoch only
+        async_write : bool, default: True
+            Whether to write in the background (requires TensorFlow >= 2.9, synchronous otherwise)
+        """
+
+        self.checkpoint = checkpoint
+        self.directory = directory
+        self.max_to_keep = max_to_keep
+        self.save_every = save_every
+        self.n_saves = 0
+        self.blocking_time = 0.
+        self._last_step = None
+
+        tf.io.gfile.makedirs(directory)
+        state = tf.train.get_checkpoint_state(directory)
+        self._kept = list(state.all_model_checkpoint_paths) if state is not None else []
+
+        self._options = None
+        if async_write:
+            try:
+                self._options = tf.train.CheckpointOptions(experimental_enable_async_checkpoint=True)
+            except TypeError:
+                print("Asynchronous checkpointing requires TensorFlow >= 2.9. Writing checkpoints synchronously.")
+
+        self._queue = queue.Queue()
+        self._error = None
+        self._thread = threading.Thread(target=self._publish_loop, daemon=True)
+        self._thread.start()
+
+    def step(self, step, end_of_epoch=False, state=None):
+        """ Saves a checkpoint if one is due at this step.
+
+        Parameters
+        ----------
+        step         : int
+            The current optimizer step
+        end_of_epoch : bool, default: False
+            Whether the step ends an epoch. Checkpoints are always due at epoch ends, in addition to every
+            ``save_every`` steps
+        state        : callable or None, default: None
+            Returns the training state to store with the checkpoint, only called if a checkpoint is due
+
+        Returns
+        -------
+        prefix : str or None
+            The prefix of the saved checkpoint or ``None`` if no checkpoint was due
+        """
+
+        due = end_of_epoch or (self.save_every is not None and step % self.save_every == 0)
+        if due and step != self._last_step:
+            return self.save(step, state)
+        return None
+
+    def save(self, step, state=None):
+        """ Snapshots the training state and schedules writing and publishing it.
+
+        Parameters
+        ----------
+        step  : int
+            The current optimizer step, used as checkpoint number
+        state : callable or None, default: None
+            Returns the training state to store with the checkpoint, see :func:`save_training_state`
+
+        Returns
+        -------
+        prefix : str
+            The prefix of the checkpoint files
+        """
+
+        self._raise_error()
+        tic = time.perf_counter()
+        prefix = os.path.join(self.directory, 'ckpt-{}'.format(step))
+        if self._options is not None:
+            self.checkpoint.write(prefix, options=self._options)
+        else:
+            self.checkpoint.write(prefix)
+        self._queue.put((prefix, state() if state is not None else None))
+        self.blocking_time += time.perf_counter() - tic
+        self.n_saves += 1
+        self._last_step = step
+        return prefix
+
+    def flush(self):
+        """ Blocks until all scheduled checkpoints are written and published. """
+
+        self._queue.join()
+        self._raise_error()
+
+    def close(self):
+        """ Flushes pending checkpoints and stops the background thread. """
+
+        self.flush()
+        self._queue.put(None)
+        self._thread.join()
+
+    def _publish_loop(self):
+        """ Background thread waiting for each write to complete before publishing it. """
+
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                prefix, state = item
+                if state is not None:
+                    save_training_state(prefix, state)
+                if self._options is not None:
+                    self.checkpoint.sync()
+                self._publish(prefix)
+            except Exception as err:
+                self._error = err
+            finally:
+                self._queue.task_done()
+
+    def _publish(self, prefix):
+        """ Atomically points the state file to a complete checkpoint, then prunes old checkpoints. """
+
+        kept = [p for p in self._kept if p != prefix] + [prefix]
+        removed = []
+        if self.max_to_keep is not None and len(kept) > self.max_to_keep:
+            removed, kept = kept[:-self.max_to_keep], kept[-self.max_to_keep:]
+        tf.compat.v1.train.update_checkpoint_state(self.directory, prefix, all_model_checkpoint_paths=kept)
+        self._kept = kept
+
+        # Delete only after the state file no longer references the files
+        for old in removed:
+            for fname in tf.io.gfile.glob(old + '.*'):
+                tf.io.gfile.remove(fname)
+
+    def _raise_error(self):
+        if self._error is not None:
+            err, self._error = self._error, None
+            raise err
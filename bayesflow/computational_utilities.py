@@ -1,7 +1,10 @@
 import tensorflow as tf
 import numpy as np
-from sklearn.calibration import calibration_curve
+
 from bayesflow.default_settings import MMD_BANDWIDTH_LIST
+from bayesflow.lazy import lazy_import
+
+calibration_curve = lazy_import('sklearn.calibration', 'calibration_curve')
 
 
 def gaussian_kernel_matrix(x, y, sigmas=None):
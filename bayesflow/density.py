@@ -0,0 +1,258 @@
+import numpy as np
+
+
+def _bandwidth_factor(n, bw_method):
+    """ Bandwidth factor of a 2D Gaussian KDE with the rules of ``scipy.stats.gaussian_kde``. """
+
+    if bw_method == 'scott' or bw_method is None:
+        return n ** (-1. / 6)
+    if bw_method == 'silverman':
+        return (n * (2 + 2) / 4.) ** (-1. / 6)
+    return float(bw_method)
+
+
+def _linear_bin(values, low, delta, grid_size):
+    """ Returns the lower grid index and the fractional offset of each value for linear binning. """
+
+    pos = (values - low) / delta
+    idx = np.clip(np.floor(pos).astype(np.int64), 0, grid_size - 2)
+    frac = np.clip(pos - idx, 0., 1.)
+    return idx, frac
+
+
+def _fft_convolve_same(grid, kernel):
+    """ Convolves a 2D grid with an odd-sized kernel via FFT, cropped to the shape of the grid. """
+
+    shape = (grid.shape[0] + kernel.shape[0] - 1, grid.shape[1] + kernel.shape[1] - 1)
+    full = np.fft.irfft2(np.fft.rfft2(grid, shape) * np.fft.rfft2(kernel, shape), shape)
+    i0, j0 = kernel.shape[0] // 2, kernel.shape[1] // 2
+    return full[i0:i0 + grid.shape[0], j0:j0 + grid.shape[1]]
+
+
+def _binned_kde(x, y, grid_size, bw_method, cut):
+    """ Linearly binned 2D Gaussian KDE, returning the grid, the density and the bin positions of the samples. """
+
+    n = x.shape[0]
+    if n < 3:
+        return None
+    cov = np.cov(np.vstack([x, y])) * _bandwidth_factor(n, bw_method) ** 2
+    det = np.linalg.det(cov)
+    if not np.isfinite(det) or det <= 0.:
+        return None
+
+    # Grid covering the samples plus ``cut`` kernel standard deviations
+    std = np.sqrt(np.diag(cov))
+    low = np.array([x.min(), y.min()]) - cut * std
+    delta = (np.array([x.max(), y.max()]) + cut * std - low) / (grid_size - 1)
+    ix, fx = _linear_bin(x, low[0], delta[0], grid_size)
+    iy, fy = _linear_bin(y, low[1], delta[1], grid_size)
+
+    # Linear binning distributes each sample over the 4 surrounding grid points
+    counts = np.zeros(grid_size * grid_size)
+    for dx, wx in ((0, 1. - fx), (1, fx)):
+        for dy, wy in ((0, 1. - fy), (1, fy)):
+            counts += np.bincount((ix + dx) * grid_size + iy + dy, weights=wx * wy, minlength=grid_size * grid_size)
+    counts = counts.reshape(grid_size, grid_size)
+
+    # Full-covariance Gaussian kernel on the grid offsets, truncated at ``cut`` standard deviations
+    half = np.minimum(np.ceil(cut * std / delta).astype(np.int64), grid_size - 1)
+    ox = np.arange(-half[0], half[0] + 1) * delta[0]
+    oy = np.arange(-half[1], half[1] + 1) * delta[1]
+    ox, oy = np.meshgrid(ox, oy, indexing='ij')
+    inv = np.linalg.inv(cov)
+    maha = inv[0, 0] * ox ** 2 + 2. * inv[0, 1] * ox * oy + inv[1, 1] * oy ** 2
+    kernel = np.exp(-0.5 * maha) / (2. * np.pi * np.sqrt(det))
+
+    # Clip the FFT round-off in empty regions
+    density = np.maximum(_fft_convolve_same(counts, kernel) / n, 0.)
+    x_grid = low[0] + delta[0] * np.arange(grid_size)
+    y_grid = low[1] + delta[1] * np.arange(grid_size)
+    return x_grid, y_grid, density, (ix, fx, iy, fy)
+
+
+def binned_kde_2d(x, y, grid_size=128, bw_method='scott', cut=3.):
+    """ Evaluates a 2D Gaussian KDE on a regular grid by linear binning and FFT convolution.
+
+    The bandwidth rules match ``scipy.stats.gaussian_kde`` (kernel covariance proportional to the sample covariance),
+    but the cost is linear in the number of samples plus ``O(grid_size^2 log(grid_size))`` for the convolution,
+    instead of quadratic in the number of samples.
+
+    Parameters
+    ----------
+    x         : np.ndarray of shape (n_samples, )
+        The first coordinate of the samples
+    y         : np.ndarray of shape (n_samples, )
+        The second coordinate of the samples
+    grid_size : int, default: 128
+        Number of grid points per dimension
+    bw_method : str or float, default: 'scott'
+        ``'scott'``, ``'silverman'`` or a scalar bandwidth factor
+    cut       : float, default: 3.
+        Number of kernel standard deviations the grid extends beyond the samples
+
+    Returns
+    -------
+    x_grid  : np.ndarray of shape (grid_size, )
+    y_grid  : np.ndarray of shape (grid_size, )
+    density : np.ndarray of shape (grid_size, grid_size)
+        The density at ``(x_grid[i], y_grid[j])``, ``None`` if the samples are degenerate (e.g., all equal)
+    """
+
+    x = np.asarray(x, dtype=np.float64).ravel()
+    y = np.asarray(y, dtype=np.float64).ravel()
+    res = _binned_kde(x, y, grid_size, bw_method, cut)
+    if res is None:
+        return None, None, None
+    return res[:3]
+
+
+def kde_scatter(x, y, grid_size=128, max_points=20000, bw_method='scott', cut=3., rng=None):
+    """ Colours samples by their estimated density for a scatter plot, with the densest points last.
+
+    Replaces ``z = stats.gaussian_kde(ab)(ab)`` followed by sorting. The density is evaluated on a grid with
+    :func:`binned_kde_2d` and interpolated bilinearly at the samples, reusing the bin positions, so the cost is linear
+    in the number of samples. With the default grid, the colours are visually indistinguishable from the exact KDE.
+
+    Parameters
+    ----------
+    x          : np.ndarray of shape (n_samples, )
+        The first coordinate of the samples
+    y          : np.ndarray of shape (n_samples, )
+        The second coordinate of the samples
+    grid_size  : int, default: 128
+        Number of grid points per dimension
+    max_points : int or None, default: 20000
+        Above this number of samples, a random subset is returned for plotting (the density still uses all samples).
+        ``None`` returns all samples
+    bw_method  : str or float, default: 'scott'
+        ``'scott'``, ``'silverman'`` or a scalar bandwidth factor
+    cut        : float, default: 3.
+        Number of kernel standard deviations the grid extends beyond the samples
+    rng        : np.random.Generator or None, default: None
+        The random number generator of the subsampling, ``None`` creates a fresh one
+
+    Returns
+    -------
+    x : np.ndarray of shape (n_points, )
+    y : np.ndarray of shape (n_points, )
+    z : np.ndarray of shape (n_points, )
+        The samples and their densities, sorted by increasing density
+    """
+
+    x = np.asarray(x, dtype=np.float64).ravel()
+    y = np.asarray(y, dtype=np.float64).ravel()
+    res = _binned_kde(x, y, grid_size, bw_method, cut)
+    if res is None:
+        z = np.ones_like(x)
+    else:
+        density, (ix, fx, iy, fy) = res[2], res[3]
+        z = ((1. - fx) * (1. - fy) * density[ix, iy] + fx * (1. - fy) * density[ix + 1, iy] +
+             (1. - fx) * fy * density[ix, iy + 1] + fx * fy * density[ix + 1, iy + 1])
+
+    if max_points is not None and x.shape[0] > max_points:
+        if rng is None:
+            rng = np.random.default_rng()
+        keep = rng.choice(x.shape[0], max_points, replace=False)
+        x, y, z = x[keep], y[keep], z[keep]
+
+    order = np.argsort(z, kind='stable')
+    return x[order], y[order], z[order]
+
+
+def batch_histograms(samples, bins=15):
+    """ Computes the histograms of many sample sets at once, each over the range of its own samples.
+
+    Parameters
+    ----------
+    samples : np.ndarray of shape (..., n_samples)
+        The sample sets, e.g., posterior samples of shape (n_test, n_params, n_samples)
+    bins    : int, default: 15
+        Number of bins per histogram
+
+    Returns
+    -------
+    edges  : np.ndarray of shape (..., bins + 1)
+        The bin edges of each histogram
+    counts : np.ndarray of shape (..., bins)
+        The bin counts of each histogram
+    """
+
+    samples = np.asarray(samples, dtype=np.float64)
+    batch_shape, n_samples = samples.shape[:-1], samples.shape[-1]
+    flat = samples.reshape(-1, n_samples)
+    low = flat.min(axis=1, keepdims=True)
+    high = flat.max(axis=1, keepdims=True)
+
+    # Widen empty ranges as np.histogram does
+    width = np.where(high > low, high - low, 1.)
+    low = np.where(high > low, low, low - 0.5)
+    idx = np.clip(np.floor((flat - low) / width * bins).astype(np.int64), 0, bins - 1)
+
+    # One bincount over all histograms, offset by the index of each sample set
+    offsets = np.arange(flat.shape[0])[:, np.newaxis] * bins
+    counts = np.bincount((idx + offsets).ravel(), minlength=flat.shape[0] * bins).reshape(-1, bins)
+    edges = low + width * np.linspace(0., 1., bins + 1)
+    return edges.reshape(batch_shape + (bins + 1, )), counts.reshape(batch_shape + (bins, ))
+
+
+def batch_kde_1d(samples, grid_size=200, bw_method='scott', cut=0., chunk_size=256):
+    """ Evaluates the 1D Gaussian KDEs of many sample sets at once on a grid over each sample range.
+
+    The samples are linearly binned onto the grid and smoothed with a Gaussian kernel matrix, so the cost is linear in
+    the number of samples. The defaults match the KDE curves of ``seaborn.histplot(kde=True)``.
+
+    Parameters
+    ----------
+    samples    : np.ndarray of shape (..., n_samples)
+        The sample sets, e.g., posterior samples of shape (n_test, n_params, n_samples)
+    grid_size  : int, default: 200
+        Number of grid points per KDE
+    bw_method  : str or float, default: 'scott'
+        ``'scott'``, ``'silverman'`` or a scalar bandwidth factor
+    cut        : float, default: 0.
+        Number of bandwidths the grid extends beyond the sample range
+    chunk_size : int, default: 256
+        Number of sample sets smoothed at once, bounding the kernel matrices to ``chunk_size * grid_size^2`` entries
+
+    Returns
+    -------
+    grid    : np.ndarray of shape (..., grid_size)
+    density : np.ndarray of shape (..., grid_size)
+    """
+
+    samples = np.asarray(samples, dtype=np.float64)
+    batch_shape, n_samples = samples.shape[:-1], samples.shape[-1]
+    flat = samples.reshape(-1, n_samples)
+
+    if bw_method == 'scott' or bw_method is None:
+        factor = n_samples ** (-1. / 5)
+    elif bw_method == 'silverman':
+        factor = (n_samples * 3 / 4.) ** (-1. / 5)
+    else:
+        factor = float(bw_method)
+    bw = np.maximum(np.std(flat, axis=1, ddof=1) * factor, np.finfo(np.float64).tiny)
+
+    low = flat.min(axis=1) - cut * bw
+    high = flat.max(axis=1) + cut * bw
+    delta = np.where(high > low, (high - low) / (grid_size - 1), 1.)
+    idx, frac = _linear_bin(flat, low[:, np.newaxis], delta[:, np.newaxis], grid_size)
+
+    # Linear binning of all sample sets with one bincount per neighbouring grid point
+    n_sets = flat.shape[0]
+    pos = idx + np.arange(n_sets)[:, np.newaxis] * grid_size
+    counts = (np.bincount(pos.ravel(), weights=(1. - frac).ravel(), minlength=n_sets * grid_size) +
+              np.bincount((pos + 1).ravel(), weights=frac.ravel(), minlength=n_sets * grid_size))
+    counts = counts.reshape(n_sets, grid_size)
+
+    # The kernel matrix of a uniform grid only depends on the grid offsets in units of the bandwidth
+    steps = np.arange(grid_size)
+    steps = (steps[:, np.newaxis] - steps[np.newaxis, :]).astype(np.float64)
+    density = np.empty_like(counts)
+    for start in range(0, counts.shape[0], chunk_size):
+        stop = start + chunk_size
+        scaled = steps[np.newaxis] * (delta[start:stop] / bw[start:stop])[:, np.newaxis, np.newaxis]
+        density[start:stop] = np.einsum('cg,cgh->ch', counts[start:stop], np.exp(-0.5 * scaled ** 2))
+    density /= (n_samples * np.sqrt(2. * np.pi) * bw)[:, np.newaxis]
+
+    grid = low[:, np.newaxis] + delta[:, np.newaxis] * np.arange(grid_size)
+    return grid.reshape(batch_shape + (grid_size, )), density.reshape(batch_shape + (grid_size, ))
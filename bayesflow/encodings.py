@@ -0,0 +1,177 @@
+import numpy as np
+
+from bayesflow.exceptions import SimulationError
+
+
+def _with_channel(values):
+    """ Adds a trailing data dimension to values of shape (n_sim, n_obs). """
+
+    values = np.asarray(values, dtype=np.float32)
+    return values[..., np.newaxis] if values.ndim == 2 else values
+
+
+def augment01(values, mask, time_points=None, missing_value=-1., out=None):
+    """ Encodes missing data by a filler value and an appended binary indicator (1 = present, 0 = missing).
+
+    Parameters
+    ----------
+    values        : np.ndarray of shape (n_sim, n_obs) or (n_sim, n_obs, data_dim)
+        The raw simulated values
+    mask          : np.ndarray of shape (n_sim, n_obs)
+        Presence indicator, True/1 for observed and False/0 for missing values
+    time_points   : np.ndarray of shape (n_obs, ) or None
+        Unused, for a uniform encoding interface
+    missing_value : float, default: -1.
+        The value inserted for missing observations
+    out           : np.ndarray(np.float32) of shape (n_sim, n_obs, data_dim + 1) or None, default: None
+        Preallocated output buffer, e.g., reused across iterations. ``None`` allocates a new array
+
+    Returns
+    -------
+    sim_data : np.ndarray of shape (n_sim, n_obs, data_dim + 1)
+    """
+
+    values = _with_channel(values)
+    mask = np.asarray(mask, dtype=bool)
+    shape = values.shape[:-1] + (values.shape[-1] + 1,)
+    if out is None:
+        out = np.empty(shape, dtype=np.float32)
+    elif out.shape != shape or out.dtype != np.float32:
+        raise SimulationError("Output buffer of shape {} and dtype {} does not match the encoding of shape {}!"
+                              .format(out.shape, out.dtype, shape))
+    np.copyto(out[..., :-1], values)
+    np.copyto(out[..., :-1], np.float32(missing_value), where=~mask[..., np.newaxis])
+    out[..., -1] = mask
+    return out
+
+
+def insert_value(values, mask, time_points=None, missing_value=-1., inplace=False):
+    """ Encodes missing data by inserting a filler value only.
+
+    Parameters
+    ----------
+    values        : np.ndarray of shape (n_sim, n_obs) or (n_sim, n_obs, data_dim)
+        The raw simulated values
+    mask          : np.ndarray of shape (n_sim, n_obs)
+        Presence indicator, True/1 for observed and False/0 for missing values
+    time_points   : np.ndarray of shape (n_obs, ) or None
+        Unused, for a uniform encoding interface
+    missing_value : float, default: -1.
+        The value inserted for missing observations
+    inplace       : bool, default: False
+        Whether to overwrite the missing entries of ``values`` directly if it is a float32 array. The raw values
+        are lost, so do not use it on a cached raw simulation that is encoded again
+
+    Returns
+    -------
+    sim_data : np.ndarray of shape (n_sim, n_obs, data_dim)
+    """
+
+    values = _with_channel(values)
+    mask = np.asarray(mask, dtype=bool)
+    if not inplace:
+        values = values.copy()
+    values[~mask] = missing_value
+    return values
+
+
+def delete_missing(values, mask, time_points=None):
+    """ Encodes missing data by dropping it, without labelling the present observations.
+
+    All data sets of a batch must have the same number of present observations (see :func:`time_labels`).
+
+    Parameters
+    ----------
+    values      : np.ndarray of shape (n_sim, n_obs) or (n_sim, n_obs, data_dim)
+        The raw simulated values
+    mask        : np.ndarray of shape (n_sim, n_obs)
+        Presence indicator, True/1 for observed and False/0 for missing values
+    time_points : np.ndarray of shape (n_obs, ) or None
+        Unused, for a uniform encoding interface
+
+    Returns
+    -------
+    sim_data : np.ndarray of shape (n_sim, n_present, data_dim)
+
+    Raises
+    ------
+    SimulationError
+        If the number of present observations differs between data sets
+    """
+
+    values = _with_channel(values)
+    mask = np.asarray(mask, dtype=bool)
+    n_present = np.sum(mask, axis=1)
+    if np.any(n_present != n_present[0]):
+        raise SimulationError("Deletion encoding requires the same number of present observations per batch!")
+
+    # A fully observed batch is passed through without a copy
+    if n_present[0] == mask.shape[1]:
+        return values
+    return values[mask].reshape(mask.shape[0], n_present[0], -1)
+
+
+def time_labels(values, mask, time_points):
+    """ Encodes missing data by dropping it and labelling each present observation with its time point.
+
+    All data sets of a batch must have the same number of present observations, since the encoded batch is a dense
+    array (simulators for this encoding draw one number of missing values per batch).
+
+    Parameters
+    ----------
+    values      : np.ndarray of shape (n_sim, n_obs) or (n_sim, n_obs, data_dim)
+        The raw simulated values
+    mask        : np.ndarray of shape (n_sim, n_obs)
+        Presence indicator, True/1 for observed and False/0 for missing values
+    time_points : np.ndarray of shape (n_obs, )
+        The time points of all (present and missing) observations
+
+    Returns
+    -------
+    sim_data : np.ndarray of shape (n_sim, n_present, data_dim + 1)
+
+    Raises
+    ------
+    SimulationError
+        If the number of present observations differs between data sets
+    """
+
+    values = _with_channel(values)
+    mask = np.asarray(mask, dtype=bool)
+    n_present = np.sum(mask, axis=1)
+    if np.any(n_present != n_present[0]):
+        raise SimulationError("Time label encoding requires the same number of present observations per batch!")
+
+    # Row-major boolean indexing keeps the temporal order within each data set
+    n_sim, n_obs = mask.shape
+    present_values = values[mask].reshape(n_sim, n_present[0], -1)
+    present_times = np.broadcast_to(np.asarray(time_points, dtype=np.float32), (n_sim, n_obs))[mask]
+    sim_data = np.empty((n_sim, n_present[0], values.shape[-1] + 1), dtype=np.float32)
+    sim_data[..., :-1] = present_values
+    sim_data[..., -1] = present_times.reshape(n_sim, n_present[0])
+    return sim_data
+
+
+class EncodingPipeline:
+    """ Chains transforms of the raw simulation ``(values, mask, time_points)`` followed by a final encoding.
+
+    All stages but the last map ``(values, mask, time_points)`` to a new triple, e.g., adding noise or
+    dropping time points. The last stage is an encoding such as :func:`augment01` and returns the network input.
+
+    Examples
+    --------
+    >>> def log_values(values, mask, time_points):
+    ...     return np.log1p(values), mask, time_points
+    >>> encoding = EncodingPipeline(log_values, functools.partial(augment01, missing_value=-5.))
+    >>> sim_data = encoding(values, mask, time_points)
+    """
+
+    def __init__(self, *stages):
+        if len(stages) == 0:
+            raise SimulationError("EncodingPipeline requires at least one stage!")
+        self.stages = stages
+
+    def __call__(self, values, mask, time_points=None):
+        for stage in self.stages[:-1]:
+            values, mask, time_points = stage(values, mask, time_points)
+        return self.stages[-1](values, mask, time_points)
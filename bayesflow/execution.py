@@ -0,0 +1,138 @@
+import numpy as np
+import tensorflow as tf
+
+from bayesflow.exceptions import ConfigurationError
+from bayesflow.networks import CouplingNet
+
+# Compute dtypes of the dense stacks, weights, the soft clamp, log_det_J and the loss stay in float32
+COMPUTE_DTYPES = (None, 'float32', 'bfloat16', 'float16')
+
+
+def set_compute_dtype(network, compute_dtype=None):
+    """ Sets the compute dtype of all coupling nets of a network, e.g., of a ``SingleModelAmortizer``.
+
+    The dense stacks of the coupling nets then cast their inputs and float32 weights to the compute dtype and their
+    outputs back to float32. The ``atan`` soft clamp, the ``log_det_J`` accumulation, ActNorm, the summary network
+    and the loss stay in float32. Can be switched at any time in eager mode, e.g., to compare samples of a trained
+    network. Functions traced before the switch (e.g., compiled training steps or a ``tf.function`` sampler) keep
+    the dtype they were traced with and must be compiled again, e.g., by :meth:`BaseTrainer.set_execution_mode`.
+
+    Parameters
+    ----------
+    network       : tf.keras.Model
+        The network
+    compute_dtype : str or None, default: None
+        ``'bfloat16'``, ``'float16'`` or ``None`` (and ``'float32'``) for float32 compute
+
+    Returns
+    -------
+    n_nets : int
+        Number of coupling nets set
+    """
+
+    if compute_dtype not in COMPUTE_DTYPES:
+        raise ConfigurationError("compute_dtype must be one of {}!".format(COMPUTE_DTYPES))
+    if compute_dtype == 'float32':
+        compute_dtype = None
+    nets = [m for m in network.submodules if isinstance(m, CouplingNet)]
+    for net in nets:
+        net._dense_compute_dtype = compute_dtype
+    return len(nets)
+
+
+def get_compute_dtype(network):
+    """ Returns the compute dtype of the coupling nets of a network, ``None`` for float32. """
+
+    for module in network.submodules:
+        if isinstance(module, CouplingNet):
+            return module._dense_compute_dtype
+    return None
+
+
+def compile_gradient_step(loss, network, jit_compile=True):
+    """ Compiles the forward and backward pass of a network into one (XLA) graph.
+
+    The graph is retraced for each new input shape, e.g., each number of observations, so variable ``n_obs``
+    pays one compilation per distinct value.
+
+    Parameters
+    ----------
+    loss        : callable
+        The loss with signature ``loss(network, *args)``
+    network     : tf.keras.Model
+        The network, built before the first call (e.g., by one eager loss evaluation)
+    jit_compile : bool, default: True
+        Whether to compile the graph with XLA, ``False`` compiles a plain ``tf.function``
+
+    Returns
+    -------
+    step : callable
+        Returns the loss and the gradients of the trainable variables with signature ``step(*args)``
+    """
+
+    def gradient_step(*args):
+        with tf.GradientTape() as tape:
+            loss_value = loss(network, *args)
+        return loss_value, tape.gradient(loss_value, network.trainable_variables)
+
+    return tf.function(gradient_step, jit_compile=jit_compile)
+
+
+def calibration_check(amortizer, generative_model, n_test, n_samples, n_obs, compute_dtype='bfloat16', bins=25,
+                      seed=0, **kwargs):
+    """ Checks that reduced-precision compute leaves the posterior calibration of a trained amortizer unchanged.
+
+    One fixed set of test sets is sampled in float32 and in ``compute_dtype`` with identical latent draws, so the
+    sample differences are due to precision only. Reports the SBC uniformity statistics of both and the shift of
+    the posterior means in units of the float32 posterior standard deviation.
+
+    Parameters
+    ----------
+    amortizer        : bayesflow.amortizers.SingleModelAmortizer
+        The trained amortizer
+    generative_model : bayesflow.models.GenerativeModel
+        A generative model returning ``(params, sim_data)``
+    n_test           : int
+        Number of test sets
+    n_samples        : int
+        Number of posterior samples per test set
+    n_obs            : int
+        Number of observations per test set
+    compute_dtype    : str, default: 'bfloat16'
+        The reduced compute dtype to check
+    bins             : int, default: 25
+        Number of histogram bins of the chi-square statistic
+    seed             : int, default: 0
+        Seed of the test sets and the latent draws
+    **kwargs : dict
+        Passed to the generative model
+
+    Returns
+    -------
+    result : dict
+        Dictionary with keys ``'float32'`` and ``compute_dtype``, each holding the statistics of
+        :func:`bayesflow.sbc.sbc_uniformity` and the ``'ranks'``, and ``'max_mean_shift'`` and
+        ``'mean_rank_shift'`` (mean absolute rank change relative to ``n_samples``)
+    """
+
+    from bayesflow.sbc import sbc_ranks, sbc_uniformity
+
+    theta_test, x = generative_model(n_test, n_obs, rng=np.random.Generator(np.random.Philox(seed)), **kwargs)
+    previous = get_compute_dtype(amortizer)
+    result, samples = {}, {}
+    try:
+        for name, dtype in (('float32', None), (compute_dtype, compute_dtype)):
+            set_compute_dtype(amortizer, dtype)
+            tf.random.set_seed(seed)
+            samples[name] = np.reshape(amortizer.sample(x, n_samples), (n_test, n_samples, -1))
+            ranks = sbc_ranks(samples[name], theta_test)
+            result[name] = dict(sbc_uniformity(ranks, n_samples, bins), ranks=ranks)
+    finally:
+        set_compute_dtype(amortizer, previous)
+
+    reference, reduced = samples['float32'], samples[compute_dtype]
+    std = np.maximum(reference.std(axis=1), np.finfo(np.float32).tiny)
+    result['max_mean_shift'] = float(np.max(np.abs(reduced.mean(axis=1) - reference.mean(axis=1)) / std))
+    result['mean_rank_shift'] = float(np.mean(np.abs(result[compute_dtype]['ranks'] - result['float32']['ranks'])) /
+                                      n_samples)
+    return result
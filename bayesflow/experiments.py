@@ -0,0 +1,500 @@
+import os
+import time
+from multiprocessing import Pool
+
+import numpy as np
+from tqdm.auto import tqdm
+
+from bayesflow.amortizers import SingleModelAmortizer
+from bayesflow.checkpoints import restore_rng_state
+from bayesflow.exceptions import ConfigurationError
+from bayesflow.models import GenerativeModel
+from bayesflow.networks import InvertibleNetwork
+from bayesflow.rng import accepts_rng, as_batch_rng
+from bayesflow.trainers import ParameterEstimationTrainer
+
+
+class Experiment:
+    """ Declarative description of a parameter estimation experiment: prior, simulator, encoding and networks.
+
+    Experiments are registered once via :func:`register_experiment` and trained back-to-back in a single process
+    by :class:`SweepDriver`, which shares the TensorFlow runtime, a process pool and the constructed generative
+    models between them.
+    """
+
+    def __init__(self, name, prior, simulator, inference_meta, summary_net, n_obs, encoding=None,
+                 checkpoint_path=None, trainer_settings=None, train_settings=None, pool_kwarg=None, rng=None,
+                 validation_settings=None, stopping_settings=None):
+        """ Creates an experiment.
+
+        Parameters
+        ----------
+        name             : str
+            Unique name of the experiment, e.g., ``'FHN_augment01'``
+        prior            : callable
+            Batched prior with signature ``params = prior(n_sim)``
+        simulator        : callable
+            Batched simulator with signature ``sim_data = simulator(params, n_obs[, **kwargs])``
+        inference_meta   : dict
+            Settings of the :class:`bayesflow.networks.InvertibleNetwork`
+        summary_net      : callable
+            Returns a fresh summary network, e.g., ``lambda: LSTM(64)``
+        n_obs            : int or callable
+            Number of observations per simulated data set
+        encoding         : callable or None, default: None
+            Encodes the simulator output for the networks, e.g., augmentation of missing values by a binary mask
+        checkpoint_path  : str or None, default: None
+            Checkpoint folder of the trainer
+        trainer_settings : dict or None, default: None
+            Keyword arguments of :class:`bayesflow.trainers.ParameterEstimationTrainer`, e.g., the learning rate
+        train_settings   : dict or None, default: None
+            Keyword arguments of the training method, e.g., ``{'epochs': 300, 'iterations_per_epoch': 1000,
+            'batch_size': 64}``
+        pool_kwarg       : str or None, default: None
+            Name of the simulator keyword argument receiving the shared process pool, if the simulator uses one
+        rng              : int, bayesflow.rng.BatchRNG or None, default: None
+            Seed or stream of the batch generators passed to a prior and simulator accepting ``rng``, e.g., one of
+            ``BatchRNG(seed).spawn(n_experiments)`` per experiment of a sweep
+        validation_settings : dict or None, default: None
+            Keyword arguments of :meth:`bayesflow.trainers.BaseTrainer.set_validation`, e.g.,
+            ``{'n_sim': 1000, 'n_obs': 21, 'every': 1000, 'cache_dir': './validation'}``
+        stopping_settings   : dict or None, default: None
+            Keyword arguments of :meth:`bayesflow.trainers.BaseTrainer.set_stopping`, e.g.,
+            ``{'patience': 10, 'max_simulations': 10 ** 7}``
+        """
+
+        if not callable(prior) or not callable(simulator) or not callable(summary_net):
+            raise ConfigurationError("prior, simulator and summary_net must be callable!")
+        if encoding is not None and not callable(encoding):
+            raise ConfigurationError("encoding must be callable or None!")
+
+        self.name = name
+        self.prior = prior
+        self.simulator = simulator
+        self.inference_meta = inference_meta
+        self.summary_net = summary_net
+        self.n_obs = n_obs
+        self.encoding = encoding
+        self.checkpoint_path = checkpoint_path
+        self.trainer_settings = trainer_settings or {}
+        self.train_settings = train_settings or {}
+        self.pool_kwarg = pool_kwarg
+        self.rng = rng
+        self.validation_settings = validation_settings
+        self.stopping_settings = stopping_settings
+        self._generative_model = None
+
+    @property
+    def generative_model(self):
+        """ The generative model, constructed on first use and reused by all later runs. """
+
+        if self._generative_model is None:
+            self._generative_model = GenerativeModel(self.prior, self.simulator, data_transform=self.encoding,
+                                                     rng=self.rng)
+        return self._generative_model
+
+    def build_amortizer(self):
+        """ Builds a fresh amortizer from the network settings. """
+
+        return SingleModelAmortizer(InvertibleNetwork(self.inference_meta), self.summary_net())
+
+    def build_trainer(self, amortizer=None):
+        """ Builds a trainer for the experiment.
+
+        Parameters
+        ----------
+        amortizer : bayesflow.amortizers.SingleModelAmortizer or None, default: None
+            The amortizer to train, ``None`` builds a fresh one
+
+        Returns
+        -------
+        trainer : bayesflow.trainers.ParameterEstimationTrainer
+        """
+
+        if amortizer is None:
+            amortizer = self.build_amortizer()
+        settings = dict(self.trainer_settings)
+        trainer = ParameterEstimationTrainer(network=amortizer, generative_model=self.generative_model,
+                                             checkpoint_path=self.checkpoint_path, **settings)
+        if self.validation_settings is not None:
+            trainer.set_validation(**self.validation_settings)
+        if self.stopping_settings is not None:
+            trainer.set_stopping(**self.stopping_settings)
+        return trainer
+
+
+_EXPERIMENTS = {}
+
+
+def register_experiment(name, prior, simulator, inference_meta, summary_net, n_obs, overwrite=False, **kwargs):
+    """ Registers an experiment under a unique name.
+
+    Parameters
+    ----------
+    name           : str
+        Unique name of the experiment
+    prior          : callable
+        Batched prior
+    simulator      : callable
+        Batched simulator
+    inference_meta : dict
+        Settings of the invertible network
+    summary_net    : callable
+        Returns a fresh summary network
+    n_obs          : int or callable
+        Number of observations per simulated data set
+    overwrite      : bool, default: False
+        Whether to replace an experiment registered under the same name
+    **kwargs : dict
+        Further arguments of :class:`Experiment`
+
+    Returns
+    -------
+    experiment : Experiment
+        The registered experiment
+
+    Examples
+    --------
+    >>> register_experiment('FHN_augment01', prior, batch_simulator, bf_meta, lambda: LSTM(64), n_obs=21,
+    ...                     checkpoint_path='./FHN_augment01_ckpts',
+    ...                     train_settings={'epochs': 300, 'iterations_per_epoch': 1000, 'batch_size': 64})
+    >>> losses = SweepDriver().run(['FHN_augment01', 'FHN_insert-5'])
+    """
+
+    if name in _EXPERIMENTS and not overwrite:
+        raise ConfigurationError("Experiment '{}' is already registered!".format(name))
+    experiment = Experiment(name, prior, simulator, inference_meta, summary_net, n_obs, **kwargs)
+    _EXPERIMENTS[name] = experiment
+    return experiment
+
+
+def get_experiment(name):
+    """ Returns the registered experiment with the given name. """
+
+    if name not in _EXPERIMENTS:
+        raise ConfigurationError("No experiment '{}' registered. Available: {}".format(name, list_experiments()))
+    return _EXPERIMENTS[name]
+
+
+def list_experiments():
+    """ Returns the names of all registered experiments. """
+
+    return sorted(_EXPERIMENTS)
+
+
+class SweepDriver:
+    """ Trains many registered experiments back-to-back in one process.
+
+    The TensorFlow runtime, imported modules and constructed generative models are initialized once, and a single
+    process pool is shared by all simulators that accept one (see ``pool_kwarg`` of :class:`Experiment`).
+
+    Attributes
+    ----------
+    stop_reasons : dict
+        Maps the names of trained experiments to the ``stop_reason`` of their trainers, e.g., ``'early_stopping'``
+    """
+
+    def __init__(self, n_processes=None):
+        """ Creates a sweep driver.
+
+        Parameters
+        ----------
+        n_processes : int or None, default: None
+            Size of the shared process pool, created on first use. ``None`` uses all cores
+        """
+
+        self.n_processes = n_processes or os.cpu_count()
+        self.stop_reasons = {}
+        self._pool = None
+
+    @property
+    def pool(self):
+        """ The shared process pool, created on first use. """
+
+        if self._pool is None:
+            self._pool = Pool(self.n_processes)
+        return self._pool
+
+    def close(self):
+        """ Shuts down the shared process pool. """
+
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def run_experiment(self, experiment, mode='online', **overrides):
+        """ Trains a single experiment.
+
+        Parameters
+        ----------
+        experiment : Experiment or str
+            The experiment or its registered name
+        mode       : {'online', 'experience_replay', 'simulate_and_train_offline'}, default: 'online'
+            The training method of :class:`bayesflow.trainers.ParameterEstimationTrainer`
+        **overrides : dict
+            Overrides the experiment's train settings
+
+        Returns
+        -------
+        losses : dict
+            The losses returned by the training method
+        """
+
+        if isinstance(experiment, str):
+            experiment = get_experiment(experiment)
+        if mode not in ('online', 'experience_replay', 'simulate_and_train_offline'):
+            raise ConfigurationError("mode should be in ['online', 'experience_replay', 'simulate_and_train_offline']")
+
+        settings = dict(n_obs=experiment.n_obs)
+        settings.update(experiment.train_settings)
+        settings.update(overrides)
+        if experiment.pool_kwarg is not None:
+            settings[experiment.pool_kwarg] = self.pool
+
+        trainer = experiment.build_trainer()
+        if mode == 'simulate_and_train_offline':
+            losses = trainer.simulate_and_train_offline(**settings)
+        else:
+            losses = getattr(trainer, 'train_' + mode)(**settings)
+        self.stop_reasons[experiment.name] = trainer.stop_reason
+        return losses
+
+    def run(self, names=None, mode='online', **overrides):
+        """ Trains several experiments back-to-back.
+
+        Parameters
+        ----------
+        names : list of str or None, default: None
+            Names of the experiments, ``None`` runs all registered experiments
+        mode  : str, default: 'online'
+            The training method, see :meth:`run_experiment`
+        **overrides : dict
+            Overrides the train settings of all experiments
+
+        Returns
+        -------
+        losses : dict
+            Maps experiment names to their losses
+        """
+
+        if names is None:
+            names = list_experiments()
+        return {name: self.run_experiment(name, mode, **overrides) for name in names}
+
+
+def _same_rng_state(a, b):
+    """ Whether two states of :func:`bayesflow.checkpoints.capture_rng_state` are equal. """
+
+    return a['random'] == b['random'] and all(np.array_equal(x, y) for x, y in zip(a['numpy'], b['numpy']))
+
+
+class SharedStreamSweep:
+    """ Trains several amortizers in lockstep on one shared simulation stream.
+
+    Each iteration simulates one raw batch ``(params, values, mask)`` and derives every variant's encoding from it
+    (e.g., augment01, insert-value, time labels), so that the simulation cost is paid once per sweep instead of
+    once per variant.
+    """
+
+    def __init__(self, prior, raw_simulator, variants, time_points=None, rng=None):
+        """ Creates a shared-stream sweep.
+
+        Parameters
+        ----------
+        prior         : callable
+            Batched prior with signature ``params = prior(n_sim)``
+        raw_simulator : callable
+            Batched simulator with signature ``values, mask = raw_simulator(params, n_obs[, **kwargs])``, returning
+            the complete simulated values of shape (n_sim, n_obs[, data_dim]) and the presence mask of shape
+            (n_sim, n_obs)
+        variants      : dict
+            Maps variant names to ``(encoding, trainer)`` pairs, where ``encoding(values, mask, time_points)``
+            is, e.g., one of :mod:`bayesflow.encodings` and ``trainer`` a
+            :class:`bayesflow.trainers.ParameterEstimationTrainer` of the variant's amortizer
+        time_points   : np.ndarray, callable or None, default: None
+            Time points of the observations, or a function ``time_points(n_obs)`` for variable n_obs
+        rng           : int, bayesflow.rng.BatchRNG or None, default: None
+            Seed or stream of the batch generators passed to a prior and raw simulator accepting ``rng``
+
+        Examples
+        --------
+        >>> variants = {
+        ...     'insert-1': (insert_value, ParameterEstimationTrainer(amortizer_insert, checkpoint_path=...)),
+        ...     'augment01': (augment01, ParameterEstimationTrainer(amortizer_augment, checkpoint_path=...)),
+        ... }
+        >>> sweep = SharedStreamSweep(prior, raw_simulator, variants, time_points)
+        >>> losses = sweep.train_online(epochs=300, iterations_per_epoch=1000, batch_size=128, n_obs=3)
+        """
+
+        if not callable(prior) or not callable(raw_simulator):
+            raise ConfigurationError("prior and raw_simulator must be callable!")
+        for name, (encoding, trainer) in variants.items():
+            if not callable(encoding):
+                raise ConfigurationError("Encoding of variant '{}' must be callable!".format(name))
+
+        self.prior = prior
+        self.raw_simulator = raw_simulator
+        self.variants = variants
+        self.time_points = time_points
+        self.rng = as_batch_rng(rng)
+
+    def _simulate(self, n_sim, n_obs, **kwargs):
+        """ Simulates one raw batch shared by all variants. """
+
+        rng = self.rng.next() if self.rng is not None else None
+        if rng is not None and accepts_rng(self.prior):
+            params = np.asarray(self.prior(n_sim, rng=rng), dtype=np.float32)
+        else:
+            params = np.asarray(self.prior(n_sim), dtype=np.float32)
+        if rng is not None and accepts_rng(self.raw_simulator):
+            kwargs['rng'] = rng
+        values, mask = self.raw_simulator(params, n_obs, **kwargs)
+        if callable(self.time_points):
+            time_points = self.time_points(n_obs)
+        else:
+            time_points = self.time_points
+        return params, values, mask, time_points
+
+    def _training_state(self, trainer, epoch, iteration, losses):
+        """ Collects the training state of a variant, together with the shared stream and the stop reason. """
+
+        state = trainer._training_state(epoch, iteration, losses)
+        state['stop_reason'] = trainer.stop_reason
+        if self.rng is not None:
+            state['batch_rng'] = self.rng.get_state()
+        return state
+
+    def _resume(self, losses, iterations_per_epoch):
+        """ Restores the latest checkpoints of all variants and returns the variants still training and the next
+        epoch and iteration. """
+
+        # Variants that stopped early stay stopped and only keep their loss history. Their checkpoints may stem
+        # from an earlier iteration, so the streams are never taken from them
+        active = {}
+        for name, (encoding, trainer) in self.variants.items():
+            state = trainer._latest_training_state()
+            if state is not None and state.get('stop_reason') is not None:
+                losses[name] = state['losses']
+                trainer.stop_reason = state['stop_reason']
+            else:
+                active[name] = (encoding, trainer)
+
+        positions, states = set(), []
+        for name, (encoding, trainer) in active.items():
+            state = trainer._restore_training_state(restore_rng=False)
+            if state is None:
+                positions.add((1, 1))
+                continue
+            losses[name] = state['losses']
+            positions.add(trainer._resume_position(state, iterations_per_epoch))
+            states.append(state)
+        if len(positions) > 1:
+            raise ConfigurationError("The variants were checkpointed at different iterations ({}) and cannot be "
+                                     "resumed on one shared stream!".format(sorted(positions)))
+
+        # The active variants share one position, so they must also agree on the shared and the global streams
+        for state in states[1:]:
+            if state.get('batch_rng') != states[0].get('batch_rng') or \
+                    not _same_rng_state(state['rng'], states[0]['rng']):
+                raise ConfigurationError("The checkpoints of the variants hold different random streams and cannot "
+                                         "be resumed on one shared stream!")
+        if states:
+            restore_rng_state(states[0]['rng'])
+            if self.rng is not None and 'batch_rng' in states[0]:
+                self.rng.set_state(states[0]['batch_rng'])
+        start_ep, start_it = positions.pop() if positions else (1, 1)
+        return active, start_ep, start_it
+
+    def train_online(self, epochs, iterations_per_epoch, batch_size, n_obs, resume=False, **kwargs):
+        """ Trains all variants online on the shared simulation stream.
+
+        Each variant runs the same training step as its trainer's own loops (see
+        :meth:`bayesflow.trainers.BaseTrainer.train_step`), including hand-crafted summary statistics, validation,
+        early stopping and resumable checkpoints. A variant that stops early drops out of the sweep, while the
+        others keep training.
+
+        Parameters
+        ----------
+        epochs               : int
+            Number of epochs (and number of times the checkpoints are stored)
+        iterations_per_epoch : int
+            Number of batch simulations per epoch
+        batch_size           : int
+            Number of simulations per backprop step
+        n_obs                : int or callable
+            Number of observations for each simulated dataset
+        resume               : bool, default: False
+            If True, continues all variants from the training states stored with their latest checkpoints
+        **kwargs : dict
+            Passed to the raw simulator
+
+        Returns
+        -------
+        losses : dict
+            Maps variant names to ``dict(ep_num : list(losses))``
+        """
+
+        losses = {name: dict() for name in self.variants}
+        active, start_ep, start_it = dict(self.variants), 1, 1
+        if resume:
+            active, start_ep, start_it = self._resume(losses, iterations_per_epoch)
+
+        for encoding, trainer in active.values():
+            trainer._start_training()
+        for ep in range(start_ep, epochs + 1):
+            if not active:
+                break
+            for name, (encoding, trainer) in active.items():
+                losses[name].setdefault(ep, [])
+                trainer.metrics.start_epoch(losses[name][ep])
+            first_it = start_it if ep == start_ep else 1
+            end_its = {name: iterations_per_epoch for name in active}
+            with tqdm(total=iterations_per_epoch, initial=first_it - 1,
+                      desc='Training epoch {}'.format(ep)) as p_bar:
+                for it in range(first_it, iterations_per_epoch + 1):
+
+                    # Determine n_obs and simulate the shared raw batch
+                    if type(n_obs) is int:
+                        n_obs_it = n_obs
+                    else:
+                        n_obs_it = n_obs()
+                    tic = time.perf_counter()
+                    params, values, mask, time_points = self._simulate(batch_size, n_obs_it, **kwargs)
+                    sim_time = time.perf_counter() - tic
+
+                    # One training step per variant on its own encoding
+                    for name, (encoding, trainer) in list(active.items()):
+                        tic = time.perf_counter()
+                        sim_data = np.asarray(encoding(values, mask, time_points), dtype=np.float32)
+                        encode_time = time.perf_counter() - tic
+                        _, stop = trainer.train_step(
+                            (params, sim_data), ep, it, losses[name], sim_time + encode_time, batch_size,
+                            summarize=True, state=lambda: self._training_state(trainer, ep, it, losses[name]))
+                        if stop:
+                            end_its[name] = it
+                            del active[name]
+
+                    # Update progress bar
+                    running = ','.join('{0}: {1:.3f}'.format(name, trainer.metrics.epoch_mean)
+                                       for name, (encoding, trainer) in self.variants.items() if name in end_its)
+                    p_bar.set_postfix_str("Epoch {0},Iteration {1},Running Loss: {2}".format(ep, it, running))
+                    p_bar.update(1)
+                    if not active:
+                        break
+
+            # Store after each epoch or early stop, recording the last trained iteration
+            for name, end_it in end_its.items():
+                encoding, trainer = self.variants[name]
+                trainer._profile_step(end_of_epoch=True, epoch=ep)
+                trainer._save_checkpoint(end_of_epoch=True,
+                                         state=lambda: self._training_state(trainer, ep, end_it, losses[name]))
+        for encoding, trainer in self.variants.values():
+            trainer._end_training()
+        return losses
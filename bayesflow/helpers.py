@@ -1,8 +1,53 @@
+import os
+
+import numpy as np
 import tensorflow as tf
 
 from bayesflow import default_settings
 from bayesflow.exceptions import ConfigurationError
 
+# Debug mode asserting that host-side float32 conversions do not copy, enabled by BAYESFLOW_CHECK_COPIES=1
+_CHECK_COPIES = os.environ.get('BAYESFLOW_CHECK_COPIES', '0') == '1'
+
+
+def set_copy_checks(enabled=True):
+    """ Enables or disables the debug assertions of :func:`as_float32` against unexpected copies. """
+
+    global _CHECK_COPIES
+    _CHECK_COPIES = enabled
+
+
+def as_float32(array, name='array', declared_dtype=None):
+    """ Returns an array as float32, copying only if it has another dtype or is not an array.
+
+    In debug mode (see :func:`set_copy_checks`), asserts that the array matches its declared dtype and that the
+    conversion does not copy, unless the declared dtype makes the copy expected.
+
+    Parameters
+    ----------
+    array          : array-like
+        The array, e.g., simulated data
+    name           : str, default: 'array'
+        Name of the array in assertion messages
+    declared_dtype : np.dtype or None, default: None
+        The dtype declared by the producer of the array, e.g., the ``dtype`` attribute of a simulator.
+        ``None`` expects float32
+
+    Returns
+    -------
+    array : np.ndarray(np.float32)
+    """
+
+    out = np.asarray(array, dtype=np.float32)
+    if _CHECK_COPIES:
+        if declared_dtype is not None:
+            assert np.asarray(array).dtype == np.dtype(declared_dtype), \
+                "{} has dtype {} but declares {}".format(name, np.asarray(array).dtype, np.dtype(declared_dtype))
+        if declared_dtype is None or np.dtype(declared_dtype) == np.float32:
+            assert out is array, "Unexpected copy of {} ({}) while converting to float32".format(
+                name, getattr(array, 'dtype', type(array).__name__))
+    return out
+
 
 def clip_gradients(gradients, clip_value=5., clip_method='norm'):
     """ Performs gradient clipping on a list of gradients.
@@ -0,0 +1,102 @@
+import importlib
+import pkgutil
+
+# Submodules of the core package and the experiment-specific modules of the experiment folders
+SUBMODULES = (
+    'abc', 'amortizers', 'benchmarks', 'buffer', 'checkpoints', 'computational_utilities', 'default_settings',
+    'density', 'diagnostics', 'encodings', 'error_metrics', 'exceptions', 'execution', 'experiments', 'helpers',
+    'lazy', 'losses', 'metrics', 'models', 'networks', 'posterior_grid', 'predictive', 'profiling', 'recovery',
+    'reference', 'rendering', 'rng', 'sbc', 'simulators', 'stopping', 'store', 'trainers', 'validation', 'version'
+)
+
+
+class LazyImport:
+    """ Stand-in for a module, or an attribute of a module, that is imported on first use.
+
+    Keeps heavy optional stacks (matplotlib, seaborn, scikit-learn, parts of SciPy) out of the import path of
+    headless training jobs, while module-level names such as ``plt`` or ``r2_score`` keep working unchanged.
+    """
+
+    def __init__(self, module, attr=None):
+        """ Creates the stand-in.
+
+        Parameters
+        ----------
+        module : str
+            Absolute name of the module, e.g., ``'matplotlib.pyplot'``
+        attr   : str or None, default: None
+            Name of the attribute to resolve from the module, e.g., ``'r2_score'``. ``None`` stands in for the module
+        """
+
+        self.__dict__['_module'] = module
+        self.__dict__['_attr'] = attr
+        self.__dict__['_obj'] = None
+
+    def _load(self):
+        """ Imports the module and resolves the attribute on first use. """
+
+        obj = self.__dict__['_obj']
+        if obj is None:
+            obj = importlib.import_module(self._module)
+            if self._attr is not None:
+                obj = getattr(obj, self._attr)
+            self.__dict__['_obj'] = obj
+        return obj
+
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._load(), name, value)
+
+    def __call__(self, *args, **kwargs):
+        return self._load()(*args, **kwargs)
+
+    def __repr__(self):
+        target = self._module if self._attr is None else '{}.{}'.format(self._module, self._attr)
+        return "<lazy import of '{}'>".format(target)
+
+
+def lazy_import(module, attr=None):
+    """ Returns a :class:`LazyImport` of a module or one of its attributes. """
+
+    return LazyImport(module, attr)
+
+
+def lazy_submodules(name, path, namespace):
+    """ Sets up a package that imports its submodules on first attribute access.
+
+    Only submodules found on the package path are advertised, e.g., ``error_metrics`` exists in some experiment
+    folders only.
+
+    Parameters
+    ----------
+    name      : str
+        Name of the package
+    path      : list of str
+        The ``__path__`` of the package
+    namespace : dict
+        The ``globals()`` of the package
+
+    Returns
+    -------
+    submodules  : tuple of str
+        The available submodules
+    __getattr__ : callable
+        The module-level ``__getattr__`` of the package
+    __dir__     : callable
+        The module-level ``__dir__`` of the package
+    """
+
+    available = {module.name for module in pkgutil.iter_modules(path)}
+    submodules = tuple(sub for sub in SUBMODULES if sub in available)
+
+    def __getattr__(attr):
+        if attr in submodules:
+            return importlib.import_module(name + '.' + attr)
+        raise AttributeError("module '{}' has no attribute '{}'".format(name, attr))
+
+    def __dir__():
+        return sorted(list(namespace) + list(submodules))
+
+    return submodules, __getattr__, __dir__
@@ -0,0 +1,149 @@
+import os
+import time
+
+import numpy as np
+
+# Columns of a metrics record, stored as consecutive float64 values
+METRICS_COLUMNS = ('step', 'epoch', 'iteration', 'time', 'steps_per_sec', 'sim_time', 'train_time', 'loss',
+                   'grad_norm')
+
+
+class MetricsLogger:
+    """ Running training metrics with periodic records in an append-only binary log.
+
+    Per step, only constant-time running sums are updated. Every ``log_every`` steps, the window means of the loss,
+    the gradient norm and the simulation and training time per step are appended as one record of
+    ``METRICS_COLUMNS`` to the log file. Gradient norms may be passed as tensors, they are summed without
+    synchronization and only converted once per record. Use :func:`load_metrics` to read the log.
+
+    Attributes
+    ----------
+    step       : int
+        Number of logged steps, continues across resumed runs
+    epoch_mean : float
+        Running mean of the loss in the current epoch
+    """
+
+    def __init__(self, path=None, log_every=100):
+        """ Creates a metrics logger.
+
+        Parameters
+        ----------
+        path      : str or None, default: None
+            The log file, e.g., ``'checkpoints/metrics.bin'``. Records are appended if it exists, after dropping
+            a truncated last record.
+            ``None`` keeps running aggregates only
+        log_every : int, default: 100
+            Number of steps per record
+        """
+
+        self.path = path
+        self.log_every = log_every
+        self.step = 0
+        if path is not None and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Drop a truncated last record (e.g., from a killed job), otherwise all appended records would be misaligned
+        if path is not None and os.path.exists(path):
+            record_size = 8 * len(METRICS_COLUMNS)
+            size = os.path.getsize(path)
+            if size % record_size != 0:
+                with open(path, 'r+b') as f:
+                    f.truncate(size // record_size * record_size)
+        self.start_epoch()
+        self._reset_window()
+
+    def _reset_window(self):
+        self._window = {'n': 0, 'loss': 0., 'grad_norm': 0., 'n_grad_norm': 0, 'sim_time': 0., 'train_time': 0.}
+        self._window_start = time.perf_counter()
+
+    def start_epoch(self, losses=None):
+        """ Resets the running epoch loss, optionally seeded with the losses of a resumed epoch. """
+
+        self._epoch_sum = float(np.sum(losses)) if losses else 0.
+        self._epoch_count = len(losses) if losses else 0
+
+    @property
+    def epoch_mean(self):
+        return self._epoch_sum / self._epoch_count if self._epoch_count > 0 else np.nan
+
+    def update(self, loss, sim_time=0., train_time=0., grad_norm=None, epoch=0, iteration=0):
+        """ Adds the metrics of one training step and writes a record every ``log_every`` steps.
+
+        Parameters
+        ----------
+        loss       : float
+            The loss of the step
+        sim_time   : float, default: 0.
+            Seconds spent simulating the batch
+        train_time : float, default: 0.
+            Seconds spent in the backpropagation step
+        grad_norm  : float, tf.Tensor or None, default: None
+            Global norm of the gradients before clipping
+        epoch      : int, default: 0
+            The current epoch
+        iteration  : int, default: 0
+            The current iteration within the epoch
+        """
+
+        loss = float(loss)
+        self.step += 1
+        self._epoch_sum += loss
+        self._epoch_count += 1
+
+        w = self._window
+        w['n'] += 1
+        w['loss'] += loss
+        w['sim_time'] += sim_time
+        w['train_time'] += train_time
+        if grad_norm is not None:
+            w['grad_norm'] = w['grad_norm'] + grad_norm
+            w['n_grad_norm'] += 1
+        self._epoch, self._iteration = epoch, iteration
+
+        if w['n'] >= self.log_every:
+            self.flush()
+
+    def flush(self):
+        """ Writes the record of the current (possibly incomplete) window, if it holds any steps. """
+
+        w = self._window
+        if w['n'] == 0:
+            return
+        elapsed = time.perf_counter() - self._window_start
+        grad_norm = float(w['grad_norm']) / w['n_grad_norm'] if w['n_grad_norm'] > 0 else np.nan
+        record = np.array([self.step, self._epoch, self._iteration, time.time(),
+                           w['n'] / elapsed if elapsed > 0 else np.nan, w['sim_time'] / w['n'],
+                           w['train_time'] / w['n'], w['loss'] / w['n'], grad_norm], dtype=np.float64)
+        if self.path is not None:
+            with open(self.path, 'ab') as f:
+                record.tofile(f)
+        self._reset_window()
+
+
+def load_metrics(path):
+    """ Loads a metrics log written by :class:`MetricsLogger`.
+
+    A truncated last record (e.g., from a killed job) is ignored. Records of steps that were logged again after
+    resuming from an earlier checkpoint are superseded by the later records.
+
+    Parameters
+    ----------
+    path : str
+        The log file
+
+    Returns
+    -------
+    metrics : dict
+        Maps each entry of ``METRICS_COLUMNS`` to an array with one value per record
+    """
+
+    n_cols = len(METRICS_COLUMNS)
+    raw = np.fromfile(path, dtype=np.float64)
+    records = raw[:raw.size // n_cols * n_cols].reshape(-1, n_cols)
+
+    # Keep a record only if all later records have larger steps
+    step = records[:, 0]
+    later_min = np.append(np.minimum.accumulate(step[::-1])[::-1][1:], np.inf)
+    records = records[step < later_min]
+    return {name: records[:, i] for i, name in enumerate(METRICS_COLUMNS)}
@@ -5,7 +5,64 @@ from typing import Union
 import numpy as np
 import tensorflow as tf
 
+from bayesflow.encodings import EncodingPipeline
 from bayesflow.exceptions import SimulationError, ConfigurationError
+from bayesflow.helpers import as_float32
+from bayesflow.profiling import profile_section
+from bayesflow.rng import accepts_rng, as_batch_rng
+
+
+class OutputSpec:
+    """ Declares the output of a prior or simulator up front, so that generative models need not probe it.
+
+    Attach a spec as ``output_spec`` attribute to the prior or simulator, or pass it to the generative model.
+    Generative models and trainers then skip their probe simulations and check the declared shapes lazily
+    on the first real batch.
+
+    Examples
+    --------
+    >>> prior.output_spec = OutputSpec(shape=(5,))                       # prior(n_sim) -> (n_sim, 5)
+    >>> simulator.output_spec = OutputSpec(shape=(None, 2))              # -> (n_sim, n_obs, 2)
+    >>> single_simulator.output_spec = OutputSpec(shape=(None, 2), batched=False, dtype=np.float64)
+    """
+
+    def __init__(self, shape, dtype=np.float32, batched=True):
+        """ Creates an output spec.
+
+        Parameters
+        ----------
+        shape   : tuple
+            Shape of a single output (without the batch dimension). ``None`` entries, e.g., for the number
+            of observations, match any size
+        dtype   : np.dtype, default: np.float32
+            The output dtype
+        batched : bool, default: True
+            Whether the callable works on batches, i.e., ``prior(n_sim)`` or ``simulator(params, n_obs)``,
+            or returns a single draw and needs to be wrapped
+        """
+
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.batched = batched
+
+    def check(self, output, n_sim, name='output'):
+        """ Raises a SimulationError if a batched output does not match the spec.
+
+        Parameters
+        ----------
+        output : np.ndarray
+            The batched output of shape ``(n_sim, *shape)``
+        n_sim  : int
+            The expected batch size
+        name   : str, default: 'output'
+            Name of the output in error messages
+        """
+
+        shape = np.shape(output)
+        expected = (n_sim,) + self.shape
+        if len(shape) != len(expected) or any(e is not None and s != e for s, e in zip(shape, expected)):
+            raise SimulationError("{} of shape {} does not match the declared shape {}".format(
+                name, shape, tuple('?' if e is None else e for e in expected)))
 
 
 class GenerativeModel(object):
@@ -68,7 +125,8 @@ class MetaGenerativeModel(GenerativeModel):
     """
 
     def __init__(self, model_prior, priors, simulators,
-                 param_transforms=None, data_transforms=None, param_padding=None, skip_consistency_check=False):
+                 param_transforms=None, data_transforms=None, param_padding=None, skip_consistency_check=False,
+                 rng=None):
         """ Initializes a :class:`MetaGenerativeModel` instance that wraps generative models for each underlying model.
 
         Parameters
@@ -91,6 +149,10 @@ class MetaGenerativeModel(GenerativeModel):
 
         param_padding : callable, optional, default: None
             Function to pad parameter matrix if models have a different number of parameters.
+
+        rng : int or bayesflow.rng.BatchRNG, optional, default: None
+            Seed or counter-based stream handing each batch its own generator, passed to the model prior, priors
+            and simulators accepting an ``rng`` keyword. ``None`` keeps their own (global) random state
         """
 
         assert len(priors) == len(simulators), "Must provide same number of priors and simulators!"
@@ -101,6 +163,8 @@ class MetaGenerativeModel(GenerativeModel):
         data_transforms = self._configure_transform(data_transforms)
 
         self.model_prior = model_prior
+        self.rng = None
+        self._model_prior_rng = accepts_rng(model_prior)
 
         self.generative_models = [SimpleGenerativeModel(prior=prior,
                                                         simulator=simulator,
@@ -112,7 +176,11 @@ class MetaGenerativeModel(GenerativeModel):
 
         self._max_param_length = None
         self._data_dim = None
-        self._find_max_param_length_and_data_dim()
+        if self.has_output_spec and all(t is None for t in param_transforms + data_transforms):
+            self._max_param_length = max(g.prior_spec.shape[0] for g in self.generative_models)
+            self._data_dim = self.generative_models[0].simulator_spec.shape[1:]
+        else:
+            self._find_max_param_length_and_data_dim()
 
         if param_padding is not None:
             self.param_padding = param_padding
@@ -120,10 +188,19 @@ class MetaGenerativeModel(GenerativeModel):
             self.param_padding = lambda x: np.pad(x,
                                                   pad_width=((0, 0), (0, self._max_param_length - x.shape[1])),
                                                   mode='constant')
-        if not skip_consistency_check:
+        # Models with declared output specs are checked lazily on their first batch
+        if not skip_consistency_check and not self.has_output_spec:
             self._check_consistency()
+        # Probe batches do not advance the batch counter
+        self.rng = as_batch_rng(rng)
+
+    @property
+    def has_output_spec(self):
+        """ Whether all priors and simulators declare their outputs. """
 
-    def __call__(self, n_sim: int, n_obs: Union[int, callable], **kwargs):
+        return all(g.has_output_spec for g in self.generative_models)
+
+    def __call__(self, n_sim: int, n_obs: Union[int, callable], rng=None, **kwargs):
         """ Simulates `n_sim` datasets with `n_obs` observations each.
 
         Parameters
@@ -137,6 +214,9 @@ class MetaGenerativeModel(GenerativeModel):
             -  if `int`, then treated as a fixed number of observations, \n
             -  if `callable`, then treated as a function for sampling N, i.e., :math:`N \sim p(N)`
 
+        rng : np.random.Generator, optional, default: None
+            Generator of this batch, ``None`` takes the next batch generator of ``self.rng`` if set
+
         **kwargs
             Additional keyword arguments that are passed to the simulators
 
@@ -153,10 +233,16 @@ class MetaGenerativeModel(GenerativeModel):
 
         # Prepare data and params placeholders
         params = np.empty((n_sim, self._max_param_length), dtype=np.float32)
-        sim_data = np.empty((n_sim, n_obs, *self._data_dim))
+        sim_data = np.empty((n_sim, n_obs, *self._data_dim), dtype=np.float32)
+
+        if rng is None and self.rng is not None:
+            rng = self.rng.next()
 
         # Sample model indices
-        model_indices = self.model_prior(n_sim, self.n_models)
+        if rng is not None and self._model_prior_rng:
+            model_indices = self.model_prior(n_sim, self.n_models, rng=rng)
+        else:
+            model_indices = self.model_prior(n_sim, self.n_models)
 
         # gather model indices and simulate datasets of same model index as batch
         # create frequency table of model indices
@@ -165,7 +251,7 @@ class MetaGenerativeModel(GenerativeModel):
         # iterate over each unique model index and create all datasets for that model index
         for m_idx, n in zip(m_idx, n):
             # sample batch of same models
-            params_, sim_data_ = self.generative_models[m_idx](n, n_obs, **kwargs)
+            params_, sim_data_ = self.generative_models[m_idx](n, n_obs, rng=rng, **kwargs)
 
             # sort data back into the batch-sized arrays
             target_indices = np.where(model_indices == m_idx)  # find indices in batch-sized array
@@ -174,9 +260,29 @@ class MetaGenerativeModel(GenerativeModel):
 
         model_indices = tf.keras.utils.to_categorical(model_indices, self.n_models)
 
-        return np.array(model_indices, dtype=np.float32), \
-               np.array(params, dtype=np.float32), \
-               np.array(sim_data, dtype=np.float32)
+        return np.asarray(model_indices, dtype=np.float32), params, sim_data
+
+    def regenerate(self, step, n_sim, n_obs, **kwargs):
+        """ Simulates the batch of the given step of ``self.rng`` again, e.g., to replay or debug a training step.
+
+        Parameters
+        ----------
+        step  : int
+            The batch counter, i.e., the number of batches simulated before
+        n_sim : int
+            The batch size of the original batch
+        n_obs : int
+            The number of observations of the original batch
+
+        Returns
+        -------
+        model_indices, params, sim_data : np.array(np.float32)
+            The batch, identical to the original one
+        """
+
+        if self.rng is None:
+            raise ConfigurationError("Batches can only be regenerated with an rng seed or BatchRNG!")
+        return self(n_sim, n_obs, rng=self.rng.generator(step), **kwargs)
 
     def _configure_transform(self, transform):
         """
@@ -241,10 +347,26 @@ class SimpleGenerativeModel(GenerativeModel):
         Transform function for the parameters, i.e. clipping.
     data_transform: callable, optional
         Transform function for the data, i.e. logarithm.
+    encoding: callable, optional
+        Missing data encoding applied to the raw simulator output ``(values, mask, time_points)``.
+    time_points: np.ndarray or callable, optional
+        Time points of the observations passed to the encoding.
+    raw_cache: dict or None
+        The last raw simulation ``{'params', 'values', 'mask', 'time_points'}`` if an encoding is used.
+    profiler: bayesflow.profiling.StepProfiler or None
+        Times prior sampling, simulation, encoding and dtype conversion if set.
+    prior_dtype, simulator_dtype: np.dtype or None
+        Output dtypes declared by the prior and simulator through an output spec or a ``dtype`` attribute.
+    prior_spec, simulator_spec: OutputSpec or None
+        Declared outputs of the prior and simulator.
+    rng: bayesflow.rng.BatchRNG or None
+        Counter-based stream of the batch generators.
     """
 
     def __init__(self, prior: callable, simulator: callable,
-                 param_transform: callable = None, data_transform: callable = None, skip_consistency_check=False):
+                 param_transform: callable = None, data_transform: callable = None, skip_consistency_check=False,
+                 encoding: Union[callable, list] = None, time_points=None, prior_spec: OutputSpec = None,
+                 simulator_spec: OutputSpec = None, rng=None):
         """ Initializes a :class:`SimpleGenerativeModel` that can simulate batches of parameters and data.
 
         Parameters
@@ -258,15 +380,35 @@ class SimpleGenerativeModel(GenerativeModel):
             Transform function for the parameters, i.e. clipping.
         data_transform: callable, optional
             Transform function for the data, i.e. logarithm.
+        encoding: callable or list(callable), optional
+            Missing data encoding, e.g., ``bayesflow.encodings.augment01``. If given, the simulator returns the raw
+            ``(values, mask)`` or ``(values, mask, time_points)`` and the encoding maps them to the network input.
+            A list is chained into a :class:`bayesflow.encodings.EncodingPipeline`.
+        time_points: np.ndarray or callable, optional
+            Time points of the observations, or a function ``time_points(n_obs)``, passed to the encoding
+            unless the simulator returns them.
+        prior_spec: OutputSpec, optional
+            Declared output of the prior, defaults to its ``output_spec`` attribute. Skips the batching probe.
+        simulator_spec: OutputSpec, optional
+            Declared (raw) output of the simulator, defaults to its ``output_spec`` attribute.
+        rng: int or bayesflow.rng.BatchRNG, optional
+            Seed or counter-based stream handing each batch its own ``np.random.Generator``, passed to a prior and
+            simulator accepting an ``rng`` keyword, e.g., ``prior(n_sim, rng=rng)``. Batches can then be regenerated
+            from (seed, step) with :meth:`regenerate`. ``None`` keeps their own (global) random state.
 
         Important
         ---------
         -  If ``prior`` works on batches, it must meet the signature ``prior(n_sim)``
         -  If ``simulator`` works on batches, it must meet the signature ``simulator(n_sim, n_obs[,**kwargs])``
+        -  Priors and simulators returning float32 arrays are passed on without copies. Others may declare their
+           output dtype through a ``dtype`` attribute, e.g., ``simulator.dtype = np.float64``, which marks the
+           float32 conversion as expected in copy-checking debug mode (see :func:`bayesflow.helpers.as_float32`)
         """
 
         if not callable(prior):
             raise ConfigurationError("prior must be callable!")
+        self.prior_spec = prior_spec if prior_spec is not None else getattr(prior, 'output_spec', None)
+        self.prior_dtype = self.prior_spec.dtype if self.prior_spec is not None else getattr(prior, 'dtype', None)
 
         # Handle parsing arguments of CPython functions
         if isinstance(prior.__call__, types.MethodWrapperType):
@@ -276,17 +418,33 @@ class SimpleGenerativeModel(GenerativeModel):
 
         if not callable(simulator):
             raise ConfigurationError("simulator must be callable!")
+        self.simulator_spec = simulator_spec if simulator_spec is not None else getattr(simulator, 'output_spec', None)
+        self.simulator_dtype = self.simulator_spec.dtype if self.simulator_spec is not None \
+            else getattr(simulator, 'dtype', None)
 
         self.prior = prior
         self.simulator = simulator
+        self.rng = as_batch_rng(rng)
+        self._prior_rng = accepts_rng(prior)
+        self._simulator_rng = accepts_rng(simulator)
         self.param_transform = param_transform
         self.data_transform = data_transform
+
+        if isinstance(encoding, (list, tuple)):
+            encoding = EncodingPipeline(*encoding)
+        if encoding is not None and not callable(encoding):
+            raise ConfigurationError("encoding must be callable, a list of callables or None!")
+        self.encoding = encoding
+        self.time_points = time_points
+        self.raw_cache = None
+        self.profiler = None
+        self._pending_checks = self.prior_spec is not None or self.simulator_spec is not None
         self._set_prior_and_simulator()
 
         #if not skip_consistency_check:
         #    self._check_consistency()
 
-    def __call__(self, n_sim, n_obs, **kwargs):
+    def __call__(self, n_sim, n_obs, rng=None, **kwargs):
         """
         Simulates n_sim datasets of n_obs observations from the provided simulator with parameters from the prior.
 
@@ -300,6 +458,9 @@ class SimpleGenerativeModel(GenerativeModel):
             -  if `int`, then treated as a fixed number of observations, \n
             -  if `callable`, then treated as a function for sampling N, i.e., :math:`N \sim p(N)`
 
+        rng : np.random.Generator, optional, default: None
+            Generator of this batch, ``None`` takes the next batch generator of ``self.rng`` if set
+
         **kwargs
             Additional keyword arguments that are passed to the simulator
 
@@ -312,19 +473,123 @@ class SimpleGenerativeModel(GenerativeModel):
 
         """
 
-        # simulate params and data
-        params = self.prior(n_sim)
-        sim_data = self.simulator(params, n_obs, **kwargs)
+        if rng is None and self.rng is not None:
+            rng = self.rng.next()
+
+        # simulate params and data, the prior and simulator draw from the batch generator if they accept it
+        with profile_section(self.profiler, 'prior'):
+            params = self.prior(n_sim, rng=rng) if rng is not None and self._prior_rng else self.prior(n_sim)
+        with profile_section(self.profiler, 'simulation'):
+            if rng is not None and self._simulator_rng:
+                kwargs['rng'] = rng
+            sim_data = self.simulator(params, n_obs, **kwargs)
+        if self._pending_checks:
+            self._check_specs(params, sim_data, n_sim)
+
+        with profile_section(self.profiler, 'encoding'):
+            # parameter transform if specified
+            if self.param_transform is not None:
+                params = self.param_transform(params)
+
+            # cache raw simulation and encode missing data if specified
+            if self.encoding is not None:
+                self.raw_cache = self._to_raw(params, sim_data, n_obs)
+                sim_data = self._encode(self.encoding, self.raw_cache)
+
+            # data transform if specified
+            if self.data_transform is not None:
+                sim_data = self.data_transform(sim_data)
+
+        # the declared dtypes only describe untransformed outputs
+        params_dtype = self.prior_dtype if self.param_transform is None else None
+        data_dtype = self.simulator_dtype if self.encoding is None and self.data_transform is None else None
+        with profile_section(self.profiler, 'conversion'):
+            return as_float32(params, 'params', params_dtype), as_float32(sim_data, 'sim_data', data_dtype)
+
+    def regenerate(self, step, n_sim, n_obs, **kwargs):
+        """ Simulates the batch of the given step of ``self.rng`` again, e.g., to replay or debug a training step.
 
-        # parameter transform if specified
-        if self.param_transform is not None:
-            params = self.param_transform(params)
+        Parameters
+        ----------
+        step  : int
+            The batch counter, i.e., the number of batches simulated before
+        n_sim : int
+            The batch size of the original batch
+        n_obs : int
+            The number of observations of the original batch
 
-        # data transform if specified
+        Returns
+        -------
+        params, sim_data : np.array(np.float32)
+            The batch, identical to the original one
+        """
+
+        if self.rng is None:
+            raise ConfigurationError("Batches can only be regenerated with an rng seed or BatchRNG!")
+        return self(n_sim, n_obs, rng=self.rng.generator(step), **kwargs)
+
+    def encode(self, encoding=None, raw=None):
+        """ Encodes a raw simulation without calling the simulator again, e.g., to convert the last
+        simulated batch into another missing data encoding.
+
+        Parameters
+        ----------
+        encoding : callable, list(callable) or None, default: None
+            The encoding, ``None`` uses the encoding of the generative model
+        raw      : dict or None, default: None
+            A raw simulation ``{'params', 'values', 'mask', 'time_points'}``, ``None`` uses the cached last batch
+
+        Returns
+        -------
+        params : np.array(np.float32)
+            Array of the parameters of shape ``(n_sim, param_dim)``
+        sim_data : np.array(np.float32)
+            Array of the encoded data sets
+        """
+
+        if raw is None:
+            raw = self.raw_cache
+        if raw is None:
+            raise SimulationError("No raw simulation cached. Simulate with an encoding first or pass raw!")
+        if encoding is None:
+            encoding = self.encoding
+        elif isinstance(encoding, (list, tuple)):
+            encoding = EncodingPipeline(*encoding)
+
+        sim_data = self._encode(encoding, raw)
         if self.data_transform is not None:
             sim_data = self.data_transform(sim_data)
+        return np.asarray(raw['params'], dtype=np.float32), np.asarray(sim_data, dtype=np.float32)
+
+    @property
+    def has_output_spec(self):
+        """ Whether both the prior and the simulator declare their outputs. """
+
+        return self.prior_spec is not None and self.simulator_spec is not None
+
+    def _check_specs(self, params, sim_data, n_sim):
+        """ Checks the first batch against the declared output specs. """
+
+        if self.prior_spec is not None:
+            self.prior_spec.check(params, n_sim, 'Prior output')
+        if self.simulator_spec is not None:
+            values = sim_data[0] if self.encoding is not None else sim_data
+            self.simulator_spec.check(values, n_sim, 'Simulator output')
+        self._pending_checks = False
 
-        return np.array(params, dtype=np.float32), np.array(sim_data, dtype=np.float32)
+    def _to_raw(self, params, sim_data, n_obs):
+        """ Collects the raw simulator output ``(values, mask[, time_points])`` into a raw simulation dict. """
+
+        if len(sim_data) == 3:
+            values, mask, time_points = sim_data
+        else:
+            values, mask = sim_data
+            time_points = self.time_points(n_obs) if callable(self.time_points) else self.time_points
+        return {'params': params, 'values': values, 'mask': mask, 'time_points': time_points}
+
+    @staticmethod
+    def _encode(encoding, raw):
+        return encoding(raw['values'], raw['mask'], raw['time_points'])
 
     def _set_prior_and_simulator(self):
         """ Wraps prior and simulator to support batch simulation and provide a uniform interface.
@@ -335,10 +600,21 @@ class SimpleGenerativeModel(GenerativeModel):
         If not, they are wrapped to fulfil the interface:
         -  ``params = self.prior(batch_size)``
         -  ``sim_data = self.simulator(params, n_obs)``
+
+        Declared output specs replace the probes.
         """
         _n_sim = 16
         _n_obs = 128
 
+        if self.prior_spec is not None:
+            if not self.prior_spec.batched:
+                self._single_prior = self.prior
+                self.prior = self._batch_single_prior
+            if self.simulator_spec is not None and not self.simulator_spec.batched:
+                self._single_simulator = self.simulator
+                self.simulator = self._batch_single_simulator
+            return
+
         # Wrap prior callable if necessary
         try:
             _params = self.prior(_n_sim)
@@ -351,7 +627,7 @@ class SimpleGenerativeModel(GenerativeModel):
 
         except Exception as err:
             self._single_prior = self.prior
-            self.prior = lambda n_sim: np.array([self._single_prior() for _ in range(n_sim)])
+            self.prior = self._batch_single_prior
 
             _params = self.prior(_n_sim)
 
@@ -385,6 +661,18 @@ class SimpleGenerativeModel(GenerativeModel):
                 raise SimulationError(f"Simulator callable could not be wrapped to batch generation!\n{repr(err)}")
         """
 
+    def _batch_single_prior(self, n_sim, rng=None):
+        """ Batches a prior returning a single parameter set, sharing the batch generator across draws. """
+
+        if rng is None:
+            return np.array([self._single_prior() for _ in range(n_sim)])
+        return np.array([self._single_prior(rng=rng) for _ in range(n_sim)])
+
+    def _batch_single_simulator(self, params, n_obs, **kwargs):
+        """ Batches a simulator returning a single dataset, sharing the batch generator across datasets. """
+
+        return np.array([self._single_simulator(theta, n_obs, **kwargs) for theta in params])
+
     def _check_consistency(self):
         """ Performs an internal consistency check.
         """
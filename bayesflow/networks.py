@@ -1,5 +1,4 @@
 import numpy as np
-from scipy.stats import multivariate_t
 
 import tensorflow as tf
 from tensorflow.keras.layers import Dense, LSTM
@@ -354,6 +353,10 @@ class CouplingNet(tf.keras.Model):
 
         super(CouplingNet, self).__init__()
 
+        # Compute dtype of the dense stack, e.g., 'bfloat16', see bayesflow.execution.set_compute_dtype. Not named
+        # compute_dtype, which is a read-only property of Keras layers
+        self._dense_compute_dtype = meta.get('compute_dtype')
+
         self.dense = Sequential(
             # Hidden layer structure
             [Dense(units, 
@@ -381,8 +384,25 @@ class CouplingNet(tf.keras.Model):
             N = int(target.shape[1])
             condition = tf.stack([condition] * N, axis=1)
         inp = tf.concat((target, condition), axis=-1)
-        out = self.dense(inp)
-        return out
+        if self._dense_compute_dtype is None:
+            return self.dense(inp)
+        return self._reduced_precision_forward(inp)
+
+    def _reduced_precision_forward(self, inp):
+        """Runs the dense stack in ``self._dense_compute_dtype`` with float32 weights and a float32 output, so that
+        the soft clamp, the Jacobian and the loss stay in float32.
+        """
+
+        if not self.dense.built:
+            self.dense.build(inp.shape)
+        dtype = tf.as_dtype(self._dense_compute_dtype)
+        h = tf.cast(inp, dtype)
+        for layer in self.dense.layers:
+            h = tf.tensordot(h, tf.cast(layer.kernel, dtype), axes=1)
+            if layer.use_bias:
+                h = h + tf.cast(layer.bias, dtype)
+            h = layer.activation(h)
+        return tf.cast(h, tf.float32)
 
 
 class ConditionalCouplingLayer(tf.keras.Model):
@@ -678,10 +698,7 @@ class InvertibleNetwork(tf.keras.Model):
                 z_samples = tf.random.normal(shape=(n_samples, self.z_dim))
             # Sample from a t-distro
             else:
-                df = self.tail_network(condition).numpy().item()
-                loc = np.zeros(self.z_dim)
-                shape = np.eye(self.z_dim)
-                z_samples = multivariate_t(df=df, loc=loc, shape=shape).rvs(n_samples)
+                z_samples = _sample_student_t(self.tail_network(condition), n_samples, self.z_dim)[0]
                 
             param_samples = self.inverse(z_samples, tf.tile(condition, [n_samples, 1]))
             
@@ -693,19 +710,38 @@ class InvertibleNetwork(tf.keras.Model):
                 z_samples = tf.random.normal(shape=(int(condition.shape[0]), n_samples, self.z_dim))
             # Sample from a t-distro    
             else:
-                dfs = self.tail_network(condition).numpy().squeeze()
-                loc = np.zeros(self.z_dim)
-                shape = np.eye(self.z_dim)
-                z_samples = tf.stack(
-                    [multivariate_t(df=df, loc=loc, shape=shape).rvs(n_samples) 
-                    for df in dfs]
-                )
+                z_samples = _sample_student_t(self.tail_network(condition), n_samples, self.z_dim)
             param_samples = self.inverse(z_samples, condition)
         if to_numpy:
             return param_samples.numpy()
         return param_samples
 
 
+def _sample_student_t(df, n_samples, z_dim):
+    """ Draws standard multivariate t samples for a batch of degrees of freedom of shape (n_datasets, 1).
+
+    Each sample is a unit Gaussian vector divided by ``sqrt(u / df)`` with ``u ~ chi2(df)``, drawn as
+    ``2 * Gamma(df / 2, 1)``. Uses TensorFlow ops only, so the tail path stays on the device and can be traced.
+    Returns a tensor of shape (n_datasets, n_samples, z_dim).
+    """
+
+    df = tf.cast(df, tf.float32)
+    z = tf.random.normal(shape=(tf.shape(df)[0], n_samples, z_dim))
+    chi2 = 2. * tf.transpose(tf.random.gamma([n_samples], 0.5 * df), [1, 0, 2])
+    return z / tf.sqrt(chi2 / df[:, tf.newaxis, :])
+
+
+def _sample_dirichlet(alpha, n_samples):
+    """ Draws Dirichlet samples for a batch of concentration vectors of shape (n_datasets, n_models).
+
+    Returns a tensor of shape (n_datasets, n_samples, n_models).
+    """
+
+    gamma = tf.random.gamma([n_samples], alpha)
+    gamma = tf.transpose(gamma, [1, 0, 2])
+    return gamma / tf.reduce_sum(gamma, axis=-1, keepdims=True)
+
+
 class EvidentialNetwork(tf.keras.Model):
 
     def __init__(self, meta):
@@ -808,19 +844,17 @@ class EvidentialNetwork(tf.keras.Model):
         Returns
         -------
         pm_samples : tf.Tensor or np.array
-            The posterior samples from the Dirichlet distribution, shape (n_samples, n_batch, n_models)
+            The posterior samples from the Dirichlet distribution, shape (n_datasets, n_samples, n_models)
         """
 
         # Compute evidential values
         alpha = self.evidence(obs_data)
-        n_datasets = alpha.shape[0]
 
-        # Sample for each dataset
-        pm_samples = np.stack([np.random.dirichlet(alpha[n, :], size=n_samples) for n in range(n_datasets)], axis=0)
+        # Sample all datasets at once, normalized Gamma(alpha_j, 1) draws are Dirichlet(alpha) distributed
+        pm_samples = _sample_dirichlet(alpha, n_samples)
 
-        # Convert to tensor, if specified
-        if not to_numpy:
-             pm_samples = tf.convert_to_tensor(pm_samples, dtype=tf.float32)
+        if to_numpy:
+            return pm_samples.numpy()
         return pm_samples
 
 
@@ -0,0 +1,269 @@
+import numpy as np
+from scipy.integrate import simpson, trapezoid
+
+
+def evaluate_grid(density_xy, x_grid, y_grid, vectorized=False):
+    """ Evaluates a bivariate (posterior) density on the meshgrid spanned by `x_grid` and `y_grid`.
+
+    By default, the density is called point-wise with scalars. Callables that broadcast over arrays may opt in to a
+    single call with the meshgrid arrays via `vectorized`. Broadcasting cannot be detected reliably, since a density
+    reducing over all array entries (e.g., ``np.sum`` of the residuals) may still return the shape of the grid,
+    but with wrong values.
+
+    Parameters
+    ----------
+    density_xy : callable
+        Density with signature ``density_xy(x, y)``
+    x_grid     : np.ndarray of shape (n_x, )
+        Grid points of the first parameter
+    y_grid     : np.ndarray of shape (n_y, )
+        Grid points of the second parameter
+    vectorized : bool, default: False
+        Whether `density_xy` broadcasts element-wise over arrays of equal shape, e.g., written with
+        :func:`gaussian_log_likelihood`
+
+    Returns
+    -------
+    density : np.ndarray of shape (n_y, n_x)
+        The density values with ``density[iy, ix] = density_xy(x_grid[ix], y_grid[iy])``,
+        i.e., in the layout expected by ``plt.contour(x_grid, y_grid, density)``
+    """
+
+    X, Y = np.meshgrid(x_grid, y_grid)
+    if not vectorized:
+        return np.vectorize(density_xy, otypes=[np.float64])(X, Y)
+    density = np.asarray(density_xy(X, Y), dtype=np.float64)
+    if density.shape != X.shape:
+        raise ValueError("Density returned shape {} on a grid of shape {}, use vectorized=False for densities "
+                         "of scalars.".format(density.shape, X.shape))
+    return density
+
+
+def integrate_grid(values, grid, axis=-1, rule='simpson'):
+    """ Integrates grid values along one axis with the trapezoid or Simpson rule.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        The function values on the grid
+    grid   : np.ndarray of shape (values.shape[axis], )
+        The grid points along `axis`
+    axis   : int, default: -1
+        The axis to integrate along
+    rule   : {'simpson', 'trapezoid'}, default: 'simpson'
+        The quadrature rule
+
+    Returns
+    -------
+    integral : np.ndarray
+        The integrated values, with `axis` removed
+    """
+
+    if rule == 'simpson':
+        return simpson(values, x=grid, axis=axis)
+    elif rule == 'trapezoid':
+        return trapezoid(values, x=grid, axis=axis)
+    raise ValueError("rule parameter should be a string in ['simpson', 'trapezoid']")
+
+
+def normalize_grid(density, x_grid, y_grid, rule='simpson', log=False):
+    """ Normalizes a (possibly unnormalized or log-) density on a grid to integrate to one over the grid.
+
+    Parameters
+    ----------
+    density : np.ndarray of shape (n_y, n_x)
+        The unnormalized density values, as returned by :func:`evaluate_grid`
+    x_grid  : np.ndarray of shape (n_x, )
+        Grid points of the first parameter
+    y_grid  : np.ndarray of shape (n_y, )
+        Grid points of the second parameter
+    rule    : {'simpson', 'trapezoid'}, default: 'simpson'
+        The quadrature rule
+    log     : bool, default: False
+        If True, `density` holds log-density values which are exponentiated in a numerically stable way
+
+    Returns
+    -------
+    density : np.ndarray of shape (n_y, n_x)
+        The normalized density values
+
+    Raises
+    ------
+    ValueError
+        If the density does not integrate to a positive, finite value over the grid, e.g., if it vanishes on the
+        whole grid or the grid misses its mass
+    """
+
+    if log:
+        density = np.exp(density - np.max(density))
+    Z = integrate_grid(integrate_grid(density, x_grid, axis=1, rule=rule), y_grid, rule=rule)
+    if not np.isfinite(Z) or Z <= 0:
+        raise ValueError("Density integrates to {} over the grid and cannot be normalized. Check the density "
+                         "and the grid bounds.".format(Z))
+    return density / Z
+
+
+def grid_marginals(density, x_grid, y_grid, rule='simpson'):
+    """ Computes both marginal densities of a bivariate density given on a grid.
+
+    Parameters
+    ----------
+    density : np.ndarray of shape (n_y, n_x)
+        The density values, as returned by :func:`evaluate_grid` or :func:`normalize_grid`
+    x_grid  : np.ndarray of shape (n_x, )
+        Grid points of the first parameter
+    y_grid  : np.ndarray of shape (n_y, )
+        Grid points of the second parameter
+    rule    : {'simpson', 'trapezoid'}, default: 'simpson'
+        The quadrature rule
+
+    Returns
+    -------
+    marginal_x : np.ndarray of shape (n_x, )
+        Marginal density of the first parameter at `x_grid`
+    marginal_y : np.ndarray of shape (n_y, )
+        Marginal density of the second parameter at `y_grid`
+    """
+
+    marginal_x = integrate_grid(density, y_grid, axis=0, rule=rule)
+    marginal_y = integrate_grid(density, x_grid, axis=1, rule=rule)
+    return marginal_x, marginal_y
+
+
+def posterior_marginals(posterior_xy, x_eval, y_eval, bounds, n_grid=401, normalize=True, rule='simpson',
+                        vectorized=False):
+    """ Computes the marginal densities of a bivariate posterior at given points, replacing point-wise
+    ``quad`` integration by a single grid evaluation.
+
+    The joint density is evaluated once on an ``n_grid x n_grid`` grid over `bounds`, optionally normalized
+    on that grid, reduced to its marginals and linearly interpolated at `x_eval` and `y_eval`.
+
+    Parameters
+    ----------
+    posterior_xy : callable
+        (Unnormalized) posterior density with signature ``posterior_xy(x, y)``
+    x_eval       : np.ndarray
+        Points at which to return the marginal density of the first parameter
+    y_eval       : np.ndarray
+        Points at which to return the marginal density of the second parameter
+    bounds       : array-like of length 4
+        Integration bounds ``(x_min, x_max, y_min, y_max)``
+    n_grid       : int, default: 401
+        Number of grid points per parameter (odd numbers suit the Simpson rule)
+    normalize    : bool, default: True
+        Whether to normalize the density on the grid. Set to False if `posterior_xy` is already normalized
+        and the truncation to `bounds` should not be compensated
+    rule         : {'simpson', 'trapezoid'}, default: 'simpson'
+        The quadrature rule
+    vectorized   : bool, default: False
+        Whether `posterior_xy` broadcasts over arrays, see :func:`evaluate_grid`
+
+    Returns
+    -------
+    marginal_x : np.ndarray of shape x_eval.shape
+    marginal_y : np.ndarray of shape y_eval.shape
+    """
+
+    x_grid = np.linspace(bounds[0], bounds[1], n_grid)
+    y_grid = np.linspace(bounds[2], bounds[3], n_grid)
+    density = evaluate_grid(posterior_xy, x_grid, y_grid, vectorized)
+    if normalize:
+        density = normalize_grid(density, x_grid, y_grid, rule=rule)
+    marginal_x, marginal_y = grid_marginals(density, x_grid, y_grid, rule=rule)
+    return np.interp(x_eval, x_grid, marginal_x), np.interp(y_eval, y_grid, marginal_y)
+
+
+def posterior_plot_grids(param_samples, posterior_xy, contour=(3, 201), marginals=(5, 151, 8), vectorized=False):
+    """ Evaluates a bivariate posterior on grids around the sample means, as drawn by the posterior diagnostics.
+
+    Deferred diagnostics (see :func:`bayesflow.rendering.deferrable`) call it in the calling process, so that their
+    plot specs hold these arrays instead of the posterior callable.
+
+    Parameters
+    ----------
+    param_samples : np.ndarray of shape (n_samples, 2)
+        Approximate posterior samples, whose means and standard deviations span the grids
+    posterior_xy  : callable or dict
+        (Unnormalized) posterior density with signature ``posterior_xy(x, y)``. A dict returned by this function
+        is passed through, e.g., in a deferred call
+    contour       : tuple or None, default: (3, 201)
+        ``(n_sd, n_grid)`` of the density grid spanning +- `n_sd` standard deviations. ``None`` skips the density
+    marginals     : tuple or None, default: (5, 151, 8)
+        ``(n_sd, n_grid, bounds_sd)`` of the marginal grids and the integration bounds. ``None`` skips the marginals
+    vectorized    : bool, default: False
+        Whether `posterior_xy` broadcasts over arrays, see :func:`evaluate_grid`
+
+    Returns
+    -------
+    grids : dict
+        Dictionary with keys ``'contour'``, holding ``(x_grid, y_grid, density)``, and ``'marginals'``, holding
+        ``(x_grid, y_grid, marginal_x, marginal_y)``, or ``None`` if skipped
+    """
+
+    if isinstance(posterior_xy, dict):
+        return posterior_xy
+    mean = np.mean(param_samples, axis=0)
+    std = np.sqrt(np.diag(np.cov(np.transpose(param_samples))))
+
+    grids = {'contour': None, 'marginals': None}
+    if contour is not None:
+        n_sd, n_grid = contour
+        A = np.linspace(mean[0] - n_sd * std[0], mean[0] + n_sd * std[0], n_grid)
+        B = np.linspace(mean[1] - n_sd * std[1], mean[1] + n_sd * std[1], n_grid)
+        grids['contour'] = (A, B, evaluate_grid(posterior_xy, A, B, vectorized))
+    if marginals is not None:
+        n_sd, n_grid, bounds_sd = marginals
+        A = np.linspace(mean[0] - n_sd * std[0], mean[0] + n_sd * std[0], n_grid)
+        B = np.linspace(mean[1] - n_sd * std[1], mean[1] + n_sd * std[1], n_grid)
+        bounds = np.array([mean[0] - bounds_sd * std[0], mean[0] + bounds_sd * std[0],
+                           mean[1] - bounds_sd * std[1], mean[1] + bounds_sd * std[1]])
+        grids['marginals'] = (A, B) + tuple(posterior_marginals(posterior_xy, A, B, bounds, vectorized=vectorized))
+    return grids
+
+
+def gaussian_log_likelihood(observed, predicted, sigma):
+    """ Computes a Gaussian log-likelihood for broadcasted model predictions, e.g., over a parameter meshgrid.
+
+    Parameters
+    ----------
+    observed  : np.ndarray of shape (n_obs, ...)
+        The (available) observations
+    predicted : np.ndarray of shape (..., n_obs, ...)
+        Model predictions whose trailing dimensions match `observed`
+    sigma     : float
+        The noise standard deviation
+
+    Returns
+    -------
+    log_lik : np.ndarray
+        The log-likelihood with the trailing observation dimensions summed out
+
+    Examples
+    --------
+    Conversion reaction posterior evaluated over a meshgrid of log-rates
+
+    >>> def log_posterior(k1, k2):
+    ...     c1, c2 = 10**k1[..., np.newaxis], 10**k2[..., np.newaxis]
+    ...     pred = c1/(c1+c2) * (1 - np.exp(-(c1+c2) * t_avail))
+    ...     return gaussian_log_likelihood(x_avail, pred, sigma) + normal_log_pdf(k1, -0.75, 0.25) \\
+    ...         + normal_log_pdf(k2, -0.75, 0.25)
+    >>> density = normalize_grid(evaluate_grid(log_posterior, A, B, vectorized=True), A, B, log=True)
+    """
+
+    observed = np.asarray(observed)
+    residual = (observed - predicted) / sigma
+    axes = tuple(range(-observed.ndim, 0))
+    return -0.5 * np.sum(np.log(2 * np.pi * sigma ** 2) + residual ** 2, axis=axes)
+
+
+def normal_log_pdf(x, loc, scale):
+    """ Broadcasted log-density of a univariate normal distribution. """
+
+    return -0.5 * ((x - loc) / scale) ** 2 - np.log(scale) - 0.5 * np.log(2 * np.pi)
+
+
+def uniform_log_pdf(x, low, high):
+    """ Broadcasted log-density of a univariate uniform distribution on ``(low, high)``. """
+
+    x = np.asarray(x)
+    return np.where((x > low) & (x < high), -np.log(high - low), -np.inf)
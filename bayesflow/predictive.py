@@ -0,0 +1,161 @@
+import numpy as np
+
+from bayesflow.lazy import lazy_import
+
+LineCollection = lazy_import('matplotlib.collections', 'LineCollection')
+
+
+def predictive_trajectories(simulate, param_samples, time_points, n_draws=None, batch_size=None):
+    """ Simulates the posterior predictive trajectories of all posterior draws in vectorized calls.
+
+    Parameters
+    ----------
+    simulate      : callable
+        Batched simulator with signature ``simulate(theta, time_points)``, where ``theta`` has shape
+        (n_batch, n_params) and the return value has shape (n_batch, n_time), e.g.,
+        :func:`bayesflow.simulators.conversion_reaction` or a :class:`bayesflow.reference.ODETrajectory`
+    param_samples : np.ndarray of shape (n_samples, n_params)
+        The posterior draws
+    time_points   : np.ndarray of shape (n_time, )
+        The shared (dense) time grid
+    n_draws       : int or None, default: None
+        Number of posterior draws to simulate, ``None`` uses all
+    batch_size    : int or None, default: None
+        Number of draws per simulator call to bound the memory of stiff batched ODE solves. ``None`` simulates all
+        draws in a single call
+
+    Returns
+    -------
+    trajectories : np.ndarray of shape (n_draws, n_time)
+    """
+
+    param_samples = np.atleast_2d(param_samples)
+    if n_draws is not None:
+        param_samples = param_samples[:n_draws]
+    n_draws = param_samples.shape[0]
+    if batch_size is None or batch_size >= n_draws:
+        return np.asarray(simulate(param_samples, time_points))
+    return np.concatenate([np.asarray(simulate(param_samples[i:i + batch_size], time_points))
+                           for i in range(0, n_draws, batch_size)], axis=0)
+
+
+def predictive_bands(trajectories, quantiles=(0.05, 0.25, 0.75, 0.95)):
+    """ Reduces predictive trajectories to their pointwise mean, median and quantile bands.
+
+    Parameters
+    ----------
+    trajectories : np.ndarray of shape (n_draws, n_time)
+        The output of :func:`predictive_trajectories`
+    quantiles    : tuple of float, default: (0.05, 0.25, 0.75, 0.95)
+        Lower and upper quantiles of the (nested) bands, symmetric around the median
+
+    Returns
+    -------
+    bands : dict
+        Dictionary with keys ``'mean'`` and ``'median'`` of shape (n_time, ), ``'quantiles'`` (the sorted levels)
+        and ``'values'`` of shape (n_quantiles, n_time)
+    """
+
+    trajectories = np.asarray(trajectories)
+    levels = np.sort(np.asarray(quantiles, dtype=np.float64))
+
+    # A single quantile call sorts each time point once for the median and all band levels
+    values = np.nanquantile(trajectories, np.append(levels, 0.5), axis=0)
+    return {
+        'mean': np.nanmean(trajectories, axis=0),
+        'median': values[-1],
+        'quantiles': levels,
+        'values': values[:-1]
+    }
+
+
+def thin_traces(trajectories, n_traces, rng=None):
+    """ Selects a random subset of the predictive trajectories for plotting.
+
+    Parameters
+    ----------
+    trajectories : np.ndarray of shape (n_draws, n_time)
+        The predictive trajectories
+    n_traces     : int
+        Number of trajectories to keep
+    rng          : np.random.Generator or None, default: None
+        The random number generator, ``None`` creates a fresh one
+
+    Returns
+    -------
+    traces : np.ndarray of shape (min(n_traces, n_draws), n_time)
+    """
+
+    if n_traces >= trajectories.shape[0]:
+        return trajectories
+    if rng is None:
+        rng = np.random.default_rng()
+    return trajectories[np.sort(rng.choice(trajectories.shape[0], n_traces, replace=False))]
+
+
+def plot_trajectories(ax, time_points, trajectories, color='grey', linewidth=0.6, alpha=0.3, label=None):
+    """ Draws many trajectories as a single ``LineCollection`` instead of one line artist per trajectory.
+
+    Parameters
+    ----------
+    ax           : matplotlib.axes.Axes
+        The axes to draw into
+    time_points  : np.ndarray of shape (n_time, )
+        The time grid of the trajectories
+    trajectories : np.ndarray of shape (n_draws, n_time)
+        The trajectories
+    color        : str, default: 'grey'
+        The line color
+    linewidth    : float, default: 0.6
+        The line width
+    alpha        : float, default: 0.3
+        The line opacity
+    label        : str or None, default: None
+        The legend label
+
+    Returns
+    -------
+    collection : matplotlib.collections.LineCollection
+    """
+
+    trajectories = np.asarray(trajectories)
+    segments = np.empty(trajectories.shape + (2, ))
+    segments[..., 0] = time_points
+    segments[..., 1] = trajectories
+    collection = LineCollection(segments, colors=color, linewidths=linewidth, alpha=alpha, label=label)
+    ax.add_collection(collection)
+    ax.autoscale_view()
+    return collection
+
+
+def plot_predictive_bands(ax, time_points, bands, color='grey', alpha=0.2, linewidth=0.9, label=None):
+    """ Draws the nested quantile bands and the median of :func:`predictive_bands`.
+
+    Parameters
+    ----------
+    ax          : matplotlib.axes.Axes
+        The axes to draw into
+    time_points : np.ndarray of shape (n_time, )
+        The time grid of the bands
+    bands       : dict
+        The output of :func:`predictive_bands`
+    color       : str, default: 'grey'
+        The color of the bands and the median
+    alpha       : float, default: 0.2
+        The opacity of each band, overlapping inner bands appear darker
+    linewidth   : float, default: 0.9
+        The line width of the median
+    label       : str or None, default: None
+        The legend label of the median
+
+    Returns
+    -------
+    median : matplotlib.lines.Line2D
+    """
+
+    values = bands['values']
+    n_bands = values.shape[0] // 2
+    for i in range(n_bands):
+        ax.fill_between(time_points, values[i], values[-(i + 1)], color=color, alpha=alpha, linewidth=0)
+    median, = ax.plot(time_points, bands['median'], color=color, linewidth=linewidth, label=label)
+    return median
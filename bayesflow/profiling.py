@@ -0,0 +1,155 @@
+import time
+from contextlib import nullcontext
+
+import tensorflow as tf
+
+_NULL_SECTION = nullcontext()
+
+
+class _Section:
+    """ Reusable timer accumulating the wall-clock time of one named section. """
+
+    __slots__ = ('total', 'count', '_tic')
+
+    def __init__(self):
+        self.total = 0.
+        self.count = 0
+        self._tic = 0.
+
+    def __enter__(self):
+        self._tic = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.total += time.perf_counter() - self._tic
+        self.count += 1
+        return False
+
+
+class StepProfiler:
+    """ Timers around the sections of a training step with per-epoch breakdown reports.
+
+    Sections timed by the trainers and generative models are ``'prior'``, ``'simulation'``, ``'encoding'``
+    (parameter/data transforms and missing data encodings), ``'conversion'`` (host-side dtype conversions),
+    ``'summary_stats'``, ``'forward'`` (loss computation), ``'backward'`` (gradients) and ``'apply'`` (clipping and
+    optimizer update). The remainder of the step time, e.g., buffer handling, checkpoints and logging, is reported
+    as ``'other'``.
+
+    TensorFlow dispatches GPU kernels asynchronously, so with ``sync=True`` the trainer waits for the results of the
+    forward and backward passes and the optimizer update inside their sections. This adds a small synchronization
+    cost, but attributes device time to the section that caused it.
+
+    Optionally, a ``tf.profiler`` trace of the steps in ``trace_steps`` is written to ``trace_dir`` for inspection
+    in TensorBoard.
+
+    Examples
+    --------
+    >>> profiler = trainer.enable_profiling(trace_dir='logs/profile', trace_steps=(100, 110))
+    >>> losses = trainer.train_online(epochs=2, iterations_per_epoch=500, batch_size=64, n_obs=n_obs)
+    Epoch 1 profile: 500 steps, 41.2 ms/step
+      simulation        29.815 ms   72.4%
+      ...
+    >>> profiler.history[-1]['sections']['simulation']['share']
+    """
+
+    def __init__(self, trace_dir=None, trace_steps=(10, 20), sync=True):
+        """ Creates a step profiler.
+
+        Parameters
+        ----------
+        trace_dir   : str or None, default: None
+            Log directory of the ``tf.profiler`` trace, ``None`` disables tracing
+        trace_steps : tuple(int, int), default: (10, 20)
+            The first (inclusive) and last (exclusive) step of the trace window, skipping warm-up steps
+        sync        : bool, default: True
+            Whether the trainer waits for asynchronous TensorFlow work inside the timed sections
+        """
+
+        self.trace_dir = trace_dir
+        self.trace_steps = trace_steps
+        self.sync = sync
+        self.history = []
+        self.n_steps = 0
+        self._tracing = False
+        self._reset()
+
+    def _reset(self):
+        self._sections = {}
+        self._epoch_steps = 0
+        self._epoch_start = time.perf_counter()
+
+    def section(self, name):
+        """ Returns the context manager timing the named section. """
+
+        timer = self._sections.get(name)
+        if timer is None:
+            timer = self._sections[name] = _Section()
+        return timer
+
+    def step(self):
+        """ Marks the end of a training step and starts or stops the trace window. """
+
+        self.n_steps += 1
+        self._epoch_steps += 1
+        if self.trace_dir is None:
+            return
+        if not self._tracing and self.n_steps == self.trace_steps[0]:
+            tf.profiler.experimental.start(self.trace_dir)
+            self._tracing = True
+        elif self._tracing and self.n_steps >= self.trace_steps[1]:
+            tf.profiler.experimental.stop()
+            self._tracing = False
+
+    def report(self, epoch=None, print_report=True):
+        """ Summarizes the sections since the last report and starts a new reporting period.
+
+        Parameters
+        ----------
+        epoch        : int or None, default: None
+            The epoch the report belongs to
+        print_report : bool, default: True
+            Whether to print the breakdown
+
+        Returns
+        -------
+        report : dict
+            Dictionary with keys ``'epoch'``, ``'n_steps'``, ``'step_time'`` (seconds per step) and ``'sections'``,
+            which maps each section to its ``'total'`` seconds, seconds ``'per_step'`` and ``'share'`` of the step time
+        """
+
+        elapsed = time.perf_counter() - self._epoch_start
+        n_steps = max(self._epoch_steps, 1)
+        sections = {name: timer.total for name, timer in self._sections.items()}
+        sections['other'] = max(elapsed - sum(sections.values()), 0.)
+        report = {
+            'epoch': epoch,
+            'n_steps': self._epoch_steps,
+            'step_time': elapsed / n_steps,
+            'sections': {name: {'total': total, 'per_step': total / n_steps,
+                                'share': total / elapsed if elapsed > 0 else 0.}
+                         for name, total in sections.items()}
+        }
+        self.history.append(report)
+
+        if print_report:
+            print("Epoch {0} profile: {1} steps, {2:.1f} ms/step".format(epoch, self._epoch_steps,
+                                                                         1e3 * report['step_time']))
+            for name, res in sorted(report['sections'].items(), key=lambda kv: -kv[1]['total']):
+                print("  {0:<16s} {1:8.3f} ms {2:6.1f}%".format(name, 1e3 * res['per_step'], 100 * res['share']))
+        self._reset()
+        return report
+
+    def stop_trace(self):
+        """ Stops a running trace, e.g., if training ended inside the trace window. """
+
+        if self._tracing:
+            tf.profiler.experimental.stop()
+            self._tracing = False
+
+
+def profile_section(profiler, name):
+    """ Returns the timer of a section, or a no-op context if profiling is disabled (``profiler`` is ``None``). """
+
+    if profiler is None:
+        return _NULL_SECTION
+    return profiler.section(name)
@@ -0,0 +1,53 @@
+import numpy as np
+
+
+def recovery_metrics(theta_true, theta_est):
+    """ Computes the parameter recovery metrics of point estimates for all parameters at once.
+
+    Parameters
+    ----------
+    theta_true : np.ndarray of shape (n_test, n_params)
+        The data-generating parameters
+    theta_est  : np.ndarray of shape (n_test, n_params)
+        The estimates, e.g., posterior means
+
+    Returns
+    -------
+    metrics : dict
+        Dictionary with keys ``'rmse'``, ``'nrmse'`` (RMSE divided by the range of the true values) and ``'r2'``
+        (coefficient of determination as ``sklearn.metrics.r2_score``), each of shape (n_params, )
+    """
+
+    theta_true = np.asarray(theta_true, dtype=np.float64)
+    theta_est = np.asarray(theta_est, dtype=np.float64)
+
+    ss_res = np.sum((theta_est - theta_true) ** 2, axis=0)
+    ss_tot = np.sum((theta_true - np.mean(theta_true, axis=0)) ** 2, axis=0)
+    rmse = np.sqrt(ss_res / theta_true.shape[0])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        nrmse = rmse / (np.max(theta_true, axis=0) - np.min(theta_true, axis=0))
+        r2 = 1. - ss_res / ss_tot
+
+    # Constant true values, following the convention of scikit-learn
+    r2 = np.where(ss_tot > 0, r2, np.where(ss_res > 0, 0., 1.))
+    return {'rmse': rmse, 'nrmse': nrmse, 'r2': r2}
+
+
+def sample_rmse(theta_true, theta_samples):
+    """ Computes the RMSE of the posterior samples around the true parameters of each test set.
+
+    Parameters
+    ----------
+    theta_true    : np.ndarray of shape (n_test, n_params)
+        The data-generating parameters
+    theta_samples : np.ndarray of shape (n_test, n_samples, n_params)
+        Samples from the approximate posterior of each test set
+
+    Returns
+    -------
+    rmse : np.ndarray of shape (n_test, n_params)
+    """
+
+    theta_true = np.asarray(theta_true, dtype=np.float64)
+    theta_samples = np.asarray(theta_samples, dtype=np.float64)
+    return np.sqrt(np.mean((theta_samples - theta_true[:, np.newaxis, :]) ** 2, axis=1))
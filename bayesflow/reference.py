@@ -0,0 +1,321 @@
+import os
+from multiprocessing import Pool
+
+import numpy as np
+from scipy.integrate import solve_ivp
+
+from bayesflow.exceptions import ConfigurationError
+from bayesflow.posterior_grid import gaussian_log_likelihood
+from bayesflow.store import reference_key
+
+
+class ODETrajectory:
+    """ Solves an ODE model for a whole batch of parameter vectors in a single integrator call.
+
+    The states of all parameter vectors are stacked into one system, so that the integrator overhead is paid
+    once per step for the entire batch instead of once per parameter vector (e.g., per emcee walker).
+    """
+
+    def __init__(self, rhs, x0, observable=0, method='LSODA', rtol=1e-6, atol=1e-8):
+        """ Creates a batched ODE solver.
+
+        Parameters
+        ----------
+        rhs        : callable
+            Batched right-hand side with signature ``rhs(t, x, theta)``, where ``x`` has shape (n_batch, n_states),
+            ``theta`` has shape (n_batch, n_params) and the return value has shape (n_batch, n_states)
+        x0         : array-like of shape (n_states, )
+            The initial condition, shared by all parameter vectors
+        observable : int or None, default: 0
+            Index of the observed state. ``None`` returns all states
+        method     : str, default: 'LSODA'
+            Integration method passed to ``scipy.integrate.solve_ivp``
+        rtol       : float, default: 1e-6
+            Relative tolerance of the integrator
+        atol       : float, default: 1e-8
+            Absolute tolerance of the integrator
+        """
+
+        self.rhs = rhs
+        self.x0 = np.asarray(x0, dtype=np.float64)
+        self.observable = observable
+        self.method = method
+        self.rtol = rtol
+        self.atol = atol
+
+    def __call__(self, theta, time_points):
+        """ Integrates the ODE for all parameter vectors.
+
+        Parameters
+        ----------
+        theta       : np.ndarray of shape (n_batch, n_params)
+            The parameter vectors
+        time_points : np.ndarray of shape (n_time, )
+            Increasing time points at which the solution is returned, starting at the initial time
+
+        Returns
+        -------
+        traj : np.ndarray of shape (n_batch, n_time) or (n_batch, n_time, n_states) if observable is None
+        """
+
+        theta = np.atleast_2d(theta)
+        traj = self._solve(theta, time_points)
+
+        # A single stiff or diverging parameter vector fails the stacked solve, retry each one separately so that
+        # only the failing ones get NaN trajectories
+        if traj is None:
+            traj = np.full((theta.shape[0], len(time_points), self.x0.shape[0]), np.nan)
+            if theta.shape[0] > 1:
+                for b in range(theta.shape[0]):
+                    traj_b = self._solve(theta[b:b+1], time_points)
+                    if traj_b is not None:
+                        traj[b] = traj_b[0]
+
+        if self.observable is None:
+            return traj
+        return traj[:, :, self.observable]
+
+    def _solve(self, theta, time_points):
+        """ Integrates the stacked system, returns ``None`` if the integrator fails. """
+
+        n_batch, n_states = theta.shape[0], self.x0.shape[0]
+
+        def stacked_rhs(t, x):
+            return self.rhs(t, x.reshape(n_batch, n_states), theta).ravel()
+
+        y0 = np.tile(self.x0, n_batch)
+        sol = solve_ivp(stacked_rhs, (time_points[0], time_points[-1]), y0, method=self.method, t_eval=time_points,
+                        rtol=self.rtol, atol=self.atol)
+        if not sol.success:
+            return None
+        return sol.y.reshape(n_batch, n_states, -1).transpose(0, 2, 1)
+
+
+class GaussianLogLikelihood:
+    """ Batched Gaussian log-likelihood of (possibly partially missing) observations of a deterministic model. """
+
+    def __init__(self, trajectory, time_points, observed, sigma):
+        """ Creates the log-likelihood of a single data set.
+
+        Parameters
+        ----------
+        trajectory  : callable
+            Batched model solution with signature ``trajectory(theta, time_points)`` returning an np.ndarray of
+            shape (n_batch, n_time), e.g., an :class:`ODETrajectory` or a vectorized closed-form solution
+        time_points : np.ndarray of shape (n_time, )
+            The time points of the available observations
+        observed    : np.ndarray of shape (n_time, )
+            The available observations
+        sigma       : float
+            The noise standard deviation
+        """
+
+        self.trajectory = trajectory
+        self.time_points = np.asarray(time_points)
+        self.observed = np.asarray(observed)
+        self.sigma = sigma
+
+    def __call__(self, theta):
+        pred = self.trajectory(theta, self.time_points)
+        log_lik = gaussian_log_likelihood(self.observed, pred, self.sigma)
+        return np.where(np.isfinite(log_lik), log_lik, -np.inf)
+
+
+class BatchedLogPosterior:
+    """ Unnormalized log-posterior for emcee's ``vectorize=True`` mode.
+
+    The log-likelihood is only evaluated for the walkers with non-zero prior density, so that no ODE is
+    integrated for proposals outside the prior support.
+    """
+
+    def __init__(self, log_likelihood, log_prior):
+        """ Combines a batched log-likelihood and a batched log-prior.
+
+        Parameters
+        ----------
+        log_likelihood : callable
+            Maps an np.ndarray of shape (n_batch, n_params) to log-likelihoods of shape (n_batch, )
+        log_prior      : callable
+            Maps an np.ndarray of shape (n_batch, n_params) to log-prior densities of shape (n_batch, )
+        """
+
+        self.log_likelihood = log_likelihood
+        self.log_prior = log_prior
+
+    def __call__(self, theta):
+        theta = np.atleast_2d(theta)
+        log_post = np.asarray(self.log_prior(theta), dtype=np.float64)
+        inside = np.isfinite(log_post)
+        if np.any(inside):
+            log_post[inside] += self.log_likelihood(theta[inside])
+        return log_post
+
+
+def run_emcee(log_posterior, p0, n_steps, burn_in=0, thin=1, seed=None):
+    """ Runs a vectorized emcee ensemble sampler.
+
+    Parameters
+    ----------
+    log_posterior : callable
+        Batched log-posterior, e.g., a :class:`BatchedLogPosterior`
+    p0            : np.ndarray of shape (n_walkers, n_params)
+        The initial walker positions
+    n_steps       : int
+        Number of sampler steps
+    burn_in       : int, default: 0
+        Number of initial steps discarded from the returned chain
+    thin          : int, default: 1
+        Thinning of the returned chain
+    seed          : int or None, default: None
+        Seed of the sampler's random state
+
+    Returns
+    -------
+    chain : np.ndarray of shape (n_walkers * (n_steps - burn_in) // thin, n_params)
+        The flattened chain
+    """
+
+    import emcee
+
+    n_walkers, n_dim = p0.shape
+    sampler = emcee.EnsembleSampler(n_walkers, n_dim, log_posterior, vectorize=True)
+    if seed is not None:
+        sampler.random_state = np.random.RandomState(seed).get_state()
+    sampler.run_mcmc(p0, n_steps)
+    return sampler.get_chain(discard=burn_in, thin=thin, flat=True)
+
+
+class _ReferenceWorker:
+    """ Picklable per-data-set task of :func:`reference_posteriors`. """
+
+    def __init__(self, make_log_posterior, make_p0, n_steps, burn_in, thin, seed, chain_dir, model, observed):
+        self.make_log_posterior = make_log_posterior
+        self.make_p0 = make_p0
+        self.n_steps = n_steps
+        self.burn_in = burn_in
+        self.thin = thin
+        self.seed = seed
+        self.chain_dir = chain_dir
+        self.model = model
+        self.observed = observed
+
+    def chain_file(self, i, seed):
+        """ Path of the chain of data set ``i``, keyed by everything that determines it. """
+
+        observed = None if self.observed is None else self.observed[i]
+        settings = {'n_steps': self.n_steps, 'burn_in': self.burn_in, 'thin': self.thin}
+        key = reference_key(self.model, observed, settings, seed)
+        return os.path.join(self.chain_dir, 'chain_{}_{}.npy'.format(i, key[:16]))
+
+    def __call__(self, i):
+        seed = None if self.seed is None else self.seed + i
+        if self.chain_dir is not None:
+            chain_file = self.chain_file(i, seed)
+            if os.path.exists(chain_file):
+                return i, np.load(chain_file)
+
+        rng = np.random.default_rng(seed)
+        chain = run_emcee(self.make_log_posterior(i), self.make_p0(i, rng), self.n_steps, self.burn_in, self.thin,
+                          seed)
+
+        # Write to a temporary file first, so that an interrupted run never leaves a truncated chain to be resumed
+        if self.chain_dir is not None:
+            with open(chain_file + '.tmp', 'wb') as f:
+                np.save(f, chain)
+            os.replace(chain_file + '.tmp', chain_file)
+        return i, chain
+
+
+def reference_posteriors(make_log_posterior, make_p0, n_datasets, n_steps, burn_in=0, thin=1, seed=None,
+                         chain_dir=None, n_processes=None, p_bar=None, model=None, observed=None):
+    """ Computes MCMC reference posteriors of many data sets in parallel, persisting each chain to disk.
+
+    Already persisted chains are loaded instead of recomputed, so interrupted runs can be resumed. The chain files
+    are keyed by `model`, the observed data set, the sampler settings and the seed (see
+    :func:`bayesflow.store.reference_key`), so changing any of them never loads a stale chain.
+
+    Parameters
+    ----------
+    make_log_posterior : callable
+        Returns the batched log-posterior of data set ``i`` via ``make_log_posterior(i)``. Must be picklable
+        (e.g., a module-level function) if ``n_processes != 1``
+    make_p0            : callable
+        Returns the initial walker positions of data set ``i`` via ``make_p0(i, rng)``,
+        an np.ndarray of shape (n_walkers, n_params)
+    n_datasets         : int
+        Number of data sets
+    n_steps            : int
+        Number of sampler steps per data set
+    burn_in            : int, default: 0
+        Number of initial steps discarded
+    thin               : int, default: 1
+        Thinning of the chains
+    seed               : int or None, default: None
+        Base seed, data set ``i`` uses ``seed + i``
+    chain_dir          : str or None, default: None
+        Directory for the per-data-set chains ``chain_{i}_{key}.npy``. ``None`` disables persistence
+    n_processes        : int or None, default: None
+        Number of worker processes. ``None`` uses all cores, ``1`` runs sequentially
+    p_bar              : progressbar or None
+        Updated once per finished data set
+    model              : str or None, default: None
+        Name (and version) of the model, e.g., ``'CR3'``. ``None`` uses the qualified name of `make_log_posterior`.
+        Change it whenever the model definition changes
+    observed           : np.ndarray or None, default: None
+        The observed data sets, indexed by data set along the first axis. Should be given with `chain_dir`, so
+        that chains of other data sets are never loaded
+
+    Returns
+    -------
+    result : dict
+        Dictionary with keys ``'samples'`` of shape (n_datasets, n_chain, n_params) and
+        ``'means'``, ``'stds'`` of shape (n_datasets, n_params)
+
+    Examples
+    --------
+    Conversion reaction references with the closed-form solution, evaluated for all walkers at once
+
+    >>> def cr_solution(theta, t):
+    ...     k = 10**theta[:, :, np.newaxis]
+    ...     s = k[:, 0] + k[:, 1]
+    ...     return k[:, 0] / s * (1 - np.exp(-s * t))
+    >>> def make_log_posterior(i):
+    ...     present = x_augment01[i, :, 1] == 1
+    ...     log_lik = GaussianLogLikelihood(cr_solution, time_points[present], x_augment01[i, present, 0], sigma)
+    ...     return BatchedLogPosterior(log_lik, lambda theta: np.sum(norm.logpdf(theta, -0.75, 0.25), axis=1))
+    >>> def make_p0(i, rng):
+    ...     return rng.normal(-0.75, 0.25, size=(10, 2))
+    >>> ref = reference_posteriors(make_log_posterior, make_p0, 500, n_steps=10000, chain_dir='mcmc_chains',
+    ...                            model='CR3', observed=x_augment01)
+    >>> mcmc_means, mcmc_stds = ref['means'], ref['stds']
+    """
+
+    if chain_dir is not None:
+        os.makedirs(chain_dir, exist_ok=True)
+    if observed is not None and len(observed) != n_datasets:
+        raise ConfigurationError("Got {} observed data sets for {} reference posteriors!".format(len(observed),
+                                                                                                 n_datasets))
+    if model is None:
+        model = '{}:{}'.format(make_log_posterior.__module__, make_log_posterior.__qualname__)
+    worker = _ReferenceWorker(make_log_posterior, make_p0, n_steps, burn_in, thin, seed, chain_dir, model, observed)
+
+    chains = [None] * n_datasets
+    pool = Pool(n_processes) if n_processes != 1 else None
+    results = map(worker, range(n_datasets)) if pool is None else pool.imap_unordered(worker, range(n_datasets))
+    try:
+        for i, chain in results:
+            chains[i] = chain
+            if p_bar is not None:
+                p_bar.update(1)
+    except BaseException:
+        # Do not wait for the remaining data sets on errors or interrupts
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+        raise
+    if pool is not None:
+        pool.close()
+        pool.join()
+
+    samples = np.stack(chains, axis=0)
+    return {'samples': samples, 'means': np.mean(samples, axis=1), 'stds': np.std(samples, axis=1)}
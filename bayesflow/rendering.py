@@ -0,0 +1,375 @@
+import functools
+import hashlib
+import importlib
+import inspect
+import json
+import multiprocessing
+import os
+import pickle
+import warnings
+
+import numpy as np
+
+from bayesflow.exceptions import ConfigurationError
+
+
+class PlotSpec:
+    """ Lightweight description of a figure: the plotting function, its data and styling arguments and the output.
+
+    A spec holds references and arrays only, no matplotlib objects, so it is cheap to create, picklable and can be
+    rendered later, in another process, by a :class:`FigureRenderer`. The plotting function is stored by module and
+    name and must be importable at module level, e.g., a function of :mod:`bayesflow.diagnostics`.
+
+    Attributes
+    ----------
+    path    : str or None
+        The output path without extension, e.g., ``'figures/FHN_metrics'``
+    formats : tuple of str
+        The output formats, e.g., ``('png', 'pdf')``
+    dpi     : int
+        The resolution of raster formats
+    rc      : dict
+        ``matplotlib.rcParams`` applied while rendering this figure only
+    axes    : dict or None
+        If given, ``plt.subplots(**axes)`` is created and its axes are passed as first argument to the function
+    """
+
+    def __init__(self, function, args=(), kwargs=None, path=None, formats=('png', ), dpi=600, rc=None, axes=None):
+        """ Creates a plot spec.
+
+        Parameters
+        ----------
+        function : callable or str
+            The plotting function or its ``'module:name'``. It draws into a new figure (or the passed axes) and
+            returns the figure or draws into the current figure
+        args     : tuple, default: ()
+            Positional arguments of the function, e.g., arrays of samples
+        kwargs   : dict or None, default: None
+            Keyword arguments of the function, e.g., styling
+        path     : str or None, default: None
+            The output path without extension, may be set later
+        formats  : tuple of str, default: ('png', )
+            The output formats
+        dpi      : int, default: 600
+            The resolution of raster formats
+        rc       : dict or None, default: None
+            Figure-local ``matplotlib.rcParams``
+        axes     : dict or None, default: None
+            Keyword arguments of ``plt.subplots`` for functions drawing into passed axes, e.g.,
+            ``{'nrows': 1, 'ncols': 2, 'figsize': (10, 4)}``
+        """
+
+        if callable(function):
+            function = '{}:{}'.format(function.__module__, function.__qualname__)
+        self.function = function
+        self.args = tuple(args)
+        self.kwargs = dict(kwargs) if kwargs is not None else {}
+        self.path = path
+        self.formats = tuple(formats)
+        self.dpi = dpi
+        self.rc = dict(rc) if rc is not None else {}
+        self.axes = axes
+
+    @property
+    def outputs(self):
+        """ The output files of the figure. """
+
+        if self.path is None:
+            raise ConfigurationError("Plot spec of '{}' has no output path!".format(self.function))
+        return ['{}.{}'.format(self.path, fmt) for fmt in self.formats]
+
+    def content_hash(self):
+        """ Hash of everything that determines the rendered files: function source, arguments, styling and output. """
+
+        h = hashlib.sha256()
+        _update_hash(h, (self.function, self.formats, self.dpi, self.rc, self.axes))
+        try:
+            _update_hash(h, inspect.getsource(_resolve(self.function)))
+        except (OSError, TypeError):
+            pass
+        _update_hash(h, self.args)
+        _update_hash(h, self.kwargs)
+        return h.hexdigest()
+
+
+def _update_hash(h, obj):
+    """ Feeds a nested structure of arrays, containers and scalars into a hash object. """
+
+    if isinstance(obj, np.ndarray):
+        h.update('ndarray{}{}'.format(obj.dtype.str, obj.shape).encode())
+        h.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, dict):
+        h.update(b'dict')
+        for key in sorted(obj, key=repr):
+            _update_hash(h, key)
+            _update_hash(h, obj[key])
+    elif isinstance(obj, (list, tuple)):
+        h.update('{}{}'.format(type(obj).__name__, len(obj)).encode())
+        for item in obj:
+            _update_hash(h, item)
+    elif callable(obj) and hasattr(obj, '__qualname__'):
+        # The repr of functions holds their memory address, which changes between sessions
+        h.update('callable{}:{}'.format(getattr(obj, '__module__', None), obj.__qualname__).encode())
+        try:
+            h.update(inspect.getsource(obj).encode())
+        except (OSError, TypeError):
+            pass
+    else:
+        h.update(repr(obj).encode())
+
+
+def _resolve(function):
+    """ Imports a ``'module:name'`` reference. """
+
+    module, name = function.split(':')
+    obj = importlib.import_module(module)
+    for attr in name.split('.'):
+        obj = getattr(obj, attr)
+    return obj
+
+
+def render_spec(spec):
+    """ Renders a plot spec and writes its output files.
+
+    Worker processes of a :class:`FigureRenderer` render with the Agg backend. Called directly, the current backend
+    is used, so figures may also be displayed inline.
+
+    Parameters
+    ----------
+    spec : PlotSpec
+        The figure to render
+
+    Returns
+    -------
+    outputs : list of str
+        The written files
+    """
+
+    import matplotlib.pyplot as plt
+    from matplotlib.figure import Figure
+
+    function = _resolve(spec.function)
+    outputs = spec.outputs
+    with plt.rc_context(spec.rc), warnings.catch_warnings():
+        # Inline plt.show() calls of the diagnostics are no-ops with Agg
+        warnings.filterwarnings('ignore', message='.*non-interactive.*')
+        if spec.axes is not None:
+            fig, ax = plt.subplots(**spec.axes)
+            function(ax, *spec.args, **spec.kwargs)
+        else:
+            fig = function(*spec.args, **spec.kwargs)
+            if not isinstance(fig, Figure):
+                fig = plt.gcf()
+        for fname in outputs:
+            if os.path.dirname(fname):
+                os.makedirs(os.path.dirname(fname), exist_ok=True)
+            fig.savefig(fname, dpi=spec.dpi, bbox_inches='tight')
+    plt.close('all')
+    return outputs
+
+
+def _init_worker():
+    """ Selects the headless Agg backend in a renderer process. """
+
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def _render_worker(item):
+    """ Pool worker rendering one spec, returning its index so that results can be matched to the specs. """
+
+    index, spec = item
+    return index, render_spec(spec)
+
+
+class FigureRenderer:
+    """ Renders plot specs in parallel worker processes and skips figures whose content did not change.
+
+    Each spec is rendered in a separate process with the Agg backend, so notebooks and training jobs are not
+    blocked by rasterizing at high resolution, and global ``rcParams`` changes of one figure never leak into another.
+    The content hash of each rendered spec is recorded in a manifest file per output folder. A spec whose hash
+    matches the manifest and whose output files exist is skipped, so regenerating a ``figures/`` folder only renders
+    the figures whose data, styling or plotting code changed.
+
+    Examples
+    --------
+    >>> renderer = FigureRenderer()
+    >>> for name, est in estimates.items():
+    ...     renderer.submit(true_vs_estimated(theta_test, est, param_names, defer='figures/{}_metrics'.format(name)),
+    ...                     formats=('png', 'pdf'))
+    >>> result = renderer.render()
+    >>> len(result['rendered']), len(result['skipped'])
+    """
+
+    MANIFEST = '.render_manifest.json'
+
+    def __init__(self, n_processes=None, skip_unchanged=True):
+        """ Creates a figure renderer.
+
+        Parameters
+        ----------
+        n_processes    : int or None, default: None
+            Number of worker processes, ``None`` uses all cores and ``1`` renders in the calling process (with its
+            current backend)
+        skip_unchanged : bool, default: True
+            Whether to skip specs whose content hash matches the last rendered version
+        """
+
+        self.n_processes = n_processes
+        self.skip_unchanged = skip_unchanged
+        self.specs = []
+
+    def submit(self, spec, path=None, formats=None, dpi=None):
+        """ Queues a spec for rendering, optionally overriding its output settings.
+
+        Parameters
+        ----------
+        spec    : PlotSpec
+            The figure to render
+        path    : str or None, default: None
+            The output path without extension
+        formats : tuple of str or None, default: None
+            The output formats
+        dpi     : int or None, default: None
+            The resolution of raster formats
+
+        Returns
+        -------
+        spec : PlotSpec
+        """
+
+        if path is not None:
+            spec.path = path
+        if formats is not None:
+            spec.formats = tuple(formats)
+        if dpi is not None:
+            spec.dpi = dpi
+        if spec.path is None:
+            raise ConfigurationError("Plot spec of '{}' has no output path!".format(spec.function))
+        self.specs.append(spec)
+        return spec
+
+    def render(self, specs=None):
+        """ Renders the queued specs (or the given ones) and updates the manifests.
+
+        Parameters
+        ----------
+        specs : list of PlotSpec or None, default: None
+            The specs to render, ``None`` renders and clears the queue
+
+        Returns
+        -------
+        result : dict
+            Dictionary with the lists ``'rendered'`` and ``'skipped'`` of output files
+        """
+
+        if specs is None:
+            specs, self.specs = self.specs, []
+
+        # Compare content hashes with the manifests of the output folders
+        hashes = [spec.content_hash() for spec in specs]
+        manifests = {}
+        todo, skipped = [], []
+        for i, (spec, digest) in enumerate(zip(specs, hashes)):
+            manifest = self._manifest(manifests, spec)
+            if (self.skip_unchanged and all(manifest.get(os.path.basename(f)) == digest for f in spec.outputs)
+                    and all(os.path.exists(f) for f in spec.outputs)):
+                skipped.extend(spec.outputs)
+            else:
+                todo.append((i, spec))
+
+        rendered = []
+        n_processes = min(self.n_processes or os.cpu_count() or 1, max(len(todo), 1))
+        # Spawned workers start without the caller's TensorFlow threads and interactive backend
+        pool = None
+        if n_processes != 1:
+            pool = multiprocessing.get_context('spawn').Pool(n_processes, initializer=_init_worker)
+        results = map(_render_worker, todo) if pool is None else pool.imap_unordered(_render_worker, todo)
+        try:
+            for i, outputs in results:
+                manifest = self._manifest(manifests, specs[i])
+                for fname in outputs:
+                    manifest[os.path.basename(fname)] = hashes[i]
+                rendered.extend(outputs)
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+            for directory, manifest in manifests.items():
+                self._write_manifest(directory, manifest)
+        return {'rendered': rendered, 'skipped': skipped}
+
+    def _manifest(self, manifests, spec):
+        """ Returns the (cached) manifest of the output folder of a spec. """
+
+        directory = os.path.dirname(spec.path) or '.'
+        if directory not in manifests:
+            path = os.path.join(directory, self.MANIFEST)
+            if os.path.exists(path):
+                with open(path) as f:
+                    manifests[directory] = json.load(f)
+            else:
+                manifests[directory] = {}
+        return manifests[directory]
+
+    def _write_manifest(self, directory, manifest):
+        """ Atomically replaces the manifest of an output folder. """
+
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, self.MANIFEST)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(manifest, f, indent=1, sort_keys=True)
+        os.replace(path + '.tmp', path)
+
+
+def deferrable(function=None, evaluate=None):
+    """ Lets a diagnostics function return a :class:`PlotSpec` instead of drawing, via the keyword ``defer``.
+
+    ``defer=None`` (default) draws immediately as before. ``defer=True`` or an output path without extension returns
+    a spec of the call, to be rendered by a :class:`FigureRenderer`. Deferred calls are rendered with ``show=False``
+    and ``filename=None``, since the renderer writes the output files.
+
+    Specs are pickled to the renderer processes and skipped by content hash, so their arguments must be data.
+    Functions taking callables (e.g., a posterior density defined in a notebook) evaluate them in the calling
+    process through `evaluate`, e.g., ``@deferrable(evaluate=hook)``. Arguments that are still not
+    picklable raise a :class:`bayesflow.exceptions.ConfigurationError`.
+
+    Parameters
+    ----------
+    function : callable or None, default: None
+        The diagnostics function, ``None`` returns a decorator taking `evaluate`
+    evaluate : callable or None, default: None
+        Called when deferring with the dict of all bound arguments of the call, returns a dict of the arguments to
+        replace in the spec, e.g., a posterior callable by its evaluations on the plot grids
+    """
+
+    if function is None:
+        return functools.partial(deferrable, evaluate=evaluate)
+
+    @functools.wraps(function)
+    def wrapper(*args, defer=None, **kwargs):
+        if not defer:
+            return function(*args, **kwargs)
+        signature = inspect.signature(function)
+        if evaluate is not None:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            bound.arguments.update(evaluate(dict(bound.arguments)))
+            args, kwargs = bound.args, bound.kwargs
+        kwargs.update({key: value for key, value in (('show', False), ('filename', None))
+                       if key in signature.parameters})
+        for value in list(args) + list(kwargs.values()):
+            _check_picklable(function, value)
+        return PlotSpec(wrapper, args, kwargs, path=None if defer is True else defer)
+    return wrapper
+
+
+def _check_picklable(function, value):
+    """ Raises a ConfigurationError if an argument of a deferred call cannot be sent to a renderer process. """
+
+    try:
+        pickle.dumps(value)
+    except Exception as err:
+        raise ConfigurationError("Argument {!r} of the deferred call of '{}' cannot be pickled ({}). Pass arrays or "
+                                 "module-level functions instead of lambdas and closures.".format(
+                                     value, function.__qualname__, err)) from None
@@ -0,0 +1,106 @@
+import inspect
+
+import numpy as np
+
+
+def accepts_rng(function):
+    """ Whether a prior or simulator takes an ``rng`` keyword argument. """
+
+    try:
+        return 'rng' in inspect.signature(function).parameters
+    except (TypeError, ValueError):
+        return False
+
+
+class BatchRNG:
+    """ Counter-based random streams handing each simulated batch its own ``np.random.Generator``.
+
+    The generator of batch ``step`` is a Philox generator seeded by ``SeedSequence(seed, spawn_key=(..., step))``.
+    It depends on ``(seed, step)`` only, not on the batches simulated before, so any batch can be regenerated for
+    replay or debugging without storing it, and resuming training only requires the step counter. Parallel workers
+    simulating parts of one batch use :meth:`worker_generators`, and independent runs sharing one root seed (e.g., the
+    experiments of a sweep) use the child streams of :meth:`spawn`. Streams never overlap, unlike offsets of the
+    global ``np.random`` state.
+
+    Examples
+    --------
+    >>> rng = BatchRNG(seed=42)
+    >>> model = GenerativeModel(prior, simulator, rng=rng)
+    >>> params, sim_data = model(n_sim=64, n_obs=21)         # batch 0
+    >>> params_again, _ = model.regenerate(0, n_sim=64, n_obs=21)
+    """
+
+    # Spawn key prefixes separating the batches of a stream from its child streams
+    _BATCH, _CHILD = 0, 1
+
+    def __init__(self, seed=None, stream=()):
+        """ Creates a batch RNG.
+
+        Parameters
+        ----------
+        seed   : int or None, default: None
+            The root seed, ``None`` draws fresh entropy from the OS (see :attr:`seed` to reproduce the run)
+        stream : tuple of int, default: ()
+            The spawn key of the stream, set by :meth:`spawn`
+        """
+
+        self.seed = np.random.SeedSequence(seed).entropy
+        self.stream = tuple(stream)
+        self.step = 0
+
+    def seed_sequence(self, step):
+        """ Returns the seed sequence of the batch with the given step. """
+
+        return np.random.SeedSequence(self.seed, spawn_key=self.stream + (self._BATCH, step))
+
+    def generator(self, step):
+        """ Returns a fresh generator of the batch with the given step, without advancing the counter. """
+
+        return np.random.Generator(np.random.Philox(self.seed_sequence(step)))
+
+    def worker_generators(self, step, n_workers):
+        """ Returns independent generators for ``n_workers`` parallel workers simulating parts of one batch. """
+
+        return [np.random.Generator(np.random.Philox(child)) for child in self.seed_sequence(step).spawn(n_workers)]
+
+    def next(self):
+        """ Returns the generator of the next batch and advances the counter. """
+
+        generator = self.generator(self.step)
+        self.step += 1
+        return generator
+
+    def spawn(self, n_children):
+        """ Returns independent child streams, e.g., one per experiment or per parallel simulation worker.
+
+        Parameters
+        ----------
+        n_children : int
+            Number of child streams
+
+        Returns
+        -------
+        children : list of BatchRNG
+        """
+
+        return [BatchRNG(self.seed, self.stream + (self._CHILD, i)) for i in range(n_children)]
+
+    def get_state(self):
+        """ Returns the picklable state of the stream, e.g., for resumable training. """
+
+        return {'seed': self.seed, 'stream': self.stream, 'step': self.step}
+
+    def set_state(self, state):
+        """ Restores a state returned by :meth:`get_state`. """
+
+        self.seed = state['seed']
+        self.stream = tuple(state['stream'])
+        self.step = state['step']
+
+
+def as_batch_rng(rng):
+    """ Converts a seed or ``None`` into a :class:`BatchRNG`, passing existing instances and ``None`` through. """
+
+    if rng is None or isinstance(rng, BatchRNG):
+        return rng
+    return BatchRNG(rng)
@@ -0,0 +1,207 @@
+import numpy as np
+from scipy.stats import chi2, kstwobign
+
+
+def sbc_ranks(theta_samples, theta_test, chunk_size=1024):
+    """ Computes the rank statistics of simulation-based calibration (SBC) as advocated by Talts et al. (2018).
+
+    The comparison ``theta_samples < theta_test`` is performed in chunks of test sets, so that the boolean
+    temporary never exceeds ``chunk_size * n_samples * n_params`` entries.
+
+    Parameters
+    ----------
+    theta_samples : np.ndarray of shape (n_test, n_samples, n_params)
+        Samples from the approximate posterior of each test set
+    theta_test    : np.ndarray of shape (n_test, n_params)
+        The data-generating parameters of each test set
+    chunk_size    : int, default: 1024
+        Number of test sets to rank at once
+
+    Returns
+    -------
+    ranks : np.ndarray of shape (n_test, n_params)
+        The number of posterior samples smaller than the true parameter value
+    """
+
+    # Convert tf.Tensors to numpy, if passed
+    theta_samples = np.asarray(theta_samples)
+    theta_test = np.asarray(theta_test)
+
+    n_test = theta_test.shape[0]
+    ranks = np.empty(theta_test.shape, dtype=np.int64)
+    for start in range(0, n_test, chunk_size):
+        stop = min(start + chunk_size, n_test)
+        ranks[start:stop] = np.sum(theta_samples[start:stop] < theta_test[start:stop, np.newaxis, :], axis=1)
+    return ranks
+
+
+def sbc_rank_counts(ranks, n_samples, bins=None):
+    """ Computes the rank histograms of SBC per parameter.
+
+    Parameters
+    ----------
+    ranks     : np.ndarray of shape (n_test, n_params)
+        The rank statistics as returned by :func:`sbc_ranks`
+    n_samples : int
+        Number of posterior samples used for ranking, i.e., ranks lie in ``{0, ..., n_samples}``
+    bins      : int or None, default: None
+        Number of histogram bins. ``None`` results in one bin per possible rank value
+
+    Returns
+    -------
+    counts : np.ndarray of shape (n_params, bins)
+        The number of test sets falling into each rank bin
+    """
+
+    n_ranks = n_samples + 1
+    if bins is None:
+        bins = n_ranks
+
+    # Map each rank to its bin, bins cover (nearly) equal portions of {0, ..., n_samples}
+    bin_idx = (np.asarray(ranks) * bins) // n_ranks
+    counts = np.stack([np.bincount(bin_idx[:, j], minlength=bins) for j in range(bin_idx.shape[1])])
+    return counts
+
+
+def sbc_uniformity(ranks, n_samples, bins=25):
+    """ Tests the SBC rank statistics for uniformity with a chi-square and an ECDF (Kolmogorov-Smirnov) statistic.
+
+    Parameters
+    ----------
+    ranks     : np.ndarray of shape (n_test, n_params)
+        The rank statistics as returned by :func:`sbc_ranks`
+    n_samples : int
+        Number of posterior samples used for ranking
+    bins      : int, default: 25
+        Number of histogram bins for the chi-square statistic
+
+    Returns
+    -------
+    stats : dict
+        Dictionary with keys ``'chi2', 'chi2_pvalue', 'ecdf_dev', 'ecdf_pvalue'``,
+        each holding an np.ndarray of shape (n_params, )
+    """
+
+    ranks = np.asarray(ranks)
+    n_test = ranks.shape[0]
+    n_ranks = n_samples + 1
+
+    # Chi-square statistic on binned ranks, expected counts account for unequal bin widths
+    counts = sbc_rank_counts(ranks, n_samples, bins)
+    bin_edges = -(-np.arange(bins + 1) * n_ranks // bins)
+    expected = n_test * np.diff(bin_edges) / n_ranks
+    chi2_stat = np.sum((counts - expected) ** 2 / expected, axis=1)
+    chi2_pvalue = chi2.sf(chi2_stat, df=bins - 1)
+
+    # Maximum deviation of the rank ECDF from the discrete uniform CDF
+    ecdf = np.cumsum(sbc_rank_counts(ranks, n_samples), axis=1) / n_test
+    uniform_cdf = np.arange(1, n_ranks + 1) / n_ranks
+    ecdf_dev = np.max(np.abs(ecdf - uniform_cdf), axis=1)
+    ecdf_pvalue = kstwobign.sf(np.sqrt(n_test) * ecdf_dev)
+
+    return {'chi2': chi2_stat, 'chi2_pvalue': chi2_pvalue, 'ecdf_dev': ecdf_dev, 'ecdf_pvalue': ecdf_pvalue}
+
+
+def stream_sbc_ranks(simulate, sample_posterior, n_test, n_samples, test_chunk_size=500, sample_chunk_size=None,
+                     p_bar=None):
+    """ Runs SBC in bounded memory by simulating test sets and posterior samples in chunks and reducing
+    them to ranks on the fly. Posterior samples are discarded after ranking.
+
+    Parameters
+    ----------
+    simulate          : callable
+        Simulates test sets with signature ``theta, x = simulate(n_sim)``
+    sample_posterior  : callable
+        Samples from the approximate posterior with signature ``samples = sample_posterior(x, n_samples)``,
+        for instance, ``amortizer.sample``. Must return an array of shape (n_sim, n_samples, n_params)
+        or (n_samples, n_params) if ``n_sim == 1``
+    n_test            : int
+        Total number of test sets
+    n_samples         : int
+        Number of posterior samples per test set
+    test_chunk_size   : int, default: 500
+        Number of test sets simulated and sampled at once
+    sample_chunk_size : int or None, default: None
+        Number of posterior samples drawn at once per test set. ``None`` draws all ``n_samples`` at once
+    p_bar             : progressbar or None
+        Updated once per chunk of test sets
+
+    Returns
+    -------
+    theta_test : np.ndarray of shape (n_test, n_params)
+        The data-generating parameters of all test sets
+    ranks      : np.ndarray of shape (n_test, n_params)
+        The SBC rank statistics
+    """
+
+    if sample_chunk_size is None:
+        sample_chunk_size = n_samples
+
+    theta_chunks = []
+    rank_chunks = []
+    for start in range(0, n_test, test_chunk_size):
+        n_sim = min(test_chunk_size, n_test - start)
+        theta, x = simulate(n_sim)
+        theta = np.asarray(theta)
+
+        # Ranks are additive over disjoint sets of posterior samples
+        ranks = np.zeros(theta.shape, dtype=np.int64)
+        for s_start in range(0, n_samples, sample_chunk_size):
+            n_draws = min(sample_chunk_size, n_samples - s_start)
+            samples = np.reshape(sample_posterior(x, n_draws), (n_sim, n_draws, -1))
+            ranks += np.sum(samples < theta[:, np.newaxis, :], axis=1)
+
+        theta_chunks.append(theta)
+        rank_chunks.append(ranks)
+
+        if p_bar is not None:
+            p_bar.set_postfix_str("Test sets {}/{}".format(start + n_sim, n_test))
+            p_bar.update(1)
+
+    return np.concatenate(theta_chunks, axis=0), np.concatenate(rank_chunks, axis=0)
+
+
+def run_sbc(amortizer, generative_model, n_test, n_samples, n_obs, bins=25, test_chunk_size=500,
+            sample_chunk_size=None, p_bar=None, **kwargs):
+    """ Performs streaming simulation-based calibration of an amortizer on its generative model.
+
+    Parameters
+    ----------
+    amortizer         : bayesflow.amortizers.SingleModelAmortizer
+        The trained amortizer with a ``sample(x, n_samples)`` method
+    generative_model  : bayesflow.models.GenerativeModel
+        A generative model returning ``(params, sim_data)`` for ``generative_model(n_sim, n_obs)``
+    n_test            : int
+        Total number of test sets
+    n_samples         : int
+        Number of posterior samples per test set
+    n_obs             : int
+        Number of observations per test set
+    bins              : int, default: 25
+        Number of histogram bins
+    test_chunk_size   : int, default: 500
+        Number of test sets simulated and sampled at once
+    sample_chunk_size : int or None, default: None
+        Number of posterior samples drawn at once per test set
+    p_bar             : progressbar or None
+        Updated once per chunk of test sets
+    **kwargs : dict
+        Passed to the generative model
+
+    Returns
+    -------
+    result : dict
+        Dictionary with keys ``'theta_test', 'ranks', 'counts'`` and the uniformity statistics of :func:`sbc_uniformity`
+    """
+
+    simulate = lambda n_sim: generative_model(n_sim, n_obs, **kwargs)
+    theta_test, ranks = stream_sbc_ranks(simulate, amortizer.sample, n_test, n_samples,
+                                         test_chunk_size, sample_chunk_size, p_bar)
+
+    result = {
+        'theta_test': theta_test,
+        'ranks': ranks,
+        'counts': sbc_rank_counts(ranks, n_samples, bins)
+    }
+    result.update(sbc_uniformity(ranks, n_samples, bins))
+    return result
@@ -0,0 +1,162 @@
+import numpy as np
+
+
+def sir_tau_leaping(theta, N=1000, u0=(999, 1, 0), iota=0.5, dt=0.1, n_dt=500, n_obs=21, rng=None):
+    """ Simulates a batch of stochastic SIR processes with binomial tau-leaping, vectorized over the batch.
+
+    Each step draws the infections and recoveries of all processes at once, so the Python loop runs over the
+    ``n_dt`` time steps only, not over the processes.
+
+    Parameters
+    ----------
+    theta : np.ndarray of shape (n_sim, 2)
+        The infection rates ``beta`` and recovery rates ``gamma``
+    N     : int, default: 1000
+        The population size
+    u0    : tuple of length 3, default: (999, 1, 0)
+        The initial state ``(S, I, R)``
+    iota  : float, default: 0.5
+        External infection pressure
+    dt    : float, default: 0.1
+        The time step
+    n_dt  : int, default: 500
+        Number of simulation time steps
+    n_obs : int, default: 21
+        Number of equidistant observations in ``[0, n_dt * dt]``, including the initial state.
+        ``n_dt`` must be a multiple of ``n_obs - 1``
+    rng   : np.random.Generator or None, default: None
+        The random number generator, ``None`` creates a fresh one
+
+    Returns
+    -------
+    x : np.ndarray of shape (n_sim, n_obs, 3)
+        The fractions ``(S, I, R) / N`` at the observation times
+    """
+
+    if rng is None:
+        rng = np.random.default_rng()
+
+    theta = np.atleast_2d(theta)
+    beta, gamma = theta[:, 0], theta[:, 1]
+    n_sim = theta.shape[0]
+    obs_every = n_dt // (n_obs - 1)
+
+    S = np.full(n_sim, u0[0], dtype=np.int64)
+    I = np.full(n_sim, u0[1], dtype=np.int64)
+    R = np.full(n_sim, u0[2], dtype=np.int64)
+    x = np.empty((n_sim, n_obs, 3))
+    x[:, 0] = np.array(u0)
+
+    # Recovery probability per step does not depend on the state
+    rfrac = 1.0 - np.exp(-gamma * dt)
+    for j in range(1, n_dt + 1):
+        ifrac = 1.0 - np.exp(-beta * (I + iota) / N * dt)
+        infection = rng.binomial(S, ifrac)
+        recovery = rng.binomial(I, rfrac)
+        S = S - infection
+        I = I + infection - recovery
+        R = R + recovery
+        if j % obs_every == 0:
+            x[:, j // obs_every] = np.stack([S, I, R], axis=-1)
+    return x / N
+
+
+def sir_prior_sample(n_sim, rng=None, low_beta=0.01, high_beta=1., low_gamma=0.):
+    """ Samples the hierarchical SIR prior ``beta ~ U(low_beta, high_beta)``, ``gamma ~ U(low_gamma, beta)``.
+
+    Parameters
+    ----------
+    n_sim     : int
+        Number of prior draws
+    rng       : np.random.Generator or None, default: None
+        The random number generator, ``None`` creates a fresh one
+    low_beta  : float, default: 0.01
+    high_beta : float, default: 1.
+    low_gamma : float, default: 0.
+
+    Returns
+    -------
+    theta : np.ndarray of shape (n_sim, 2)
+    """
+
+    if rng is None:
+        rng = np.random.default_rng()
+    beta = rng.uniform(low_beta, high_beta, size=n_sim)
+    gamma = rng.uniform(low_gamma, beta)
+    return np.stack([beta, gamma], axis=-1)
+
+
+def random_missing_mask(n_sim, n_obs, n_missing, rng=None):
+    """ Samples presence masks with ``n_missing`` observations missing uniformly at random in each dataset.
+
+    Replaces ``random.sample(range(n_obs), n_missing[m])`` per dataset on the global ``random`` state: a single
+    ranking of uniform keys draws all masks from the given generator.
+
+    Parameters
+    ----------
+    n_sim     : int
+        Number of datasets
+    n_obs     : int
+        Number of observations per dataset
+    n_missing : int or np.ndarray of shape (n_sim, )
+        Number of missing observations of all or of each dataset
+    rng       : np.random.Generator or None, default: None
+        The random number generator, ``None`` creates a fresh one
+
+    Returns
+    -------
+    mask : np.ndarray of shape (n_sim, n_obs) and dtype bool
+        ``True`` where the observation is present
+    """
+
+    if rng is None:
+        rng = np.random.default_rng()
+    # The ranks of i.i.d. uniform keys are a uniformly random permutation per dataset
+    ranks = np.argsort(np.argsort(rng.random((n_sim, n_obs)), axis=1), axis=1)
+    return ranks >= np.reshape(n_missing, (-1, 1))
+
+
+def sir_prior_log_pdf(theta, low_beta=0.01, high_beta=1., low_gamma=0.):
+    """ Batched log-density of the hierarchical SIR prior of :func:`sir_prior_sample`.
+
+    Parameters
+    ----------
+    theta : np.ndarray of shape (n_sim, 2)
+
+    Returns
+    -------
+    log_pdf : np.ndarray of shape (n_sim, ), ``-inf`` outside the prior support
+    """
+
+    beta, gamma = theta[:, 0], theta[:, 1]
+    inside = (beta > low_beta) & (beta < high_beta) & (gamma > low_gamma) & (gamma < beta)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_pdf = -np.log(high_beta - low_beta) - np.log(beta - low_gamma)
+    return np.where(inside, log_pdf, -np.inf)
+
+
+def conversion_reaction(theta, time_points, x0=(1., 0.)):
+    """ Closed-form solution of the conversion reaction ``A <-> B`` for a batch of log10 rate constants.
+
+    The total amount ``x1 + x2`` is conserved, so the observed state ``x2`` relaxes exponentially to its
+    equilibrium and no ODE solver is needed.
+
+    Parameters
+    ----------
+    theta       : np.ndarray of shape (n_sim, 2)
+        The log10 rate constants ``log10(k1)`` and ``log10(k2)``
+    time_points : np.ndarray of shape (n_time, )
+        The time points of the solution
+    x0          : tuple of length 2, default: (1., 0.)
+        The initial state ``(x1, x2)``
+
+    Returns
+    -------
+    x2 : np.ndarray of shape (n_sim, n_time)
+        The observed state at the time points
+    """
+
+    k = 10 ** np.atleast_2d(theta)
+    s = k[:, 0:1] + k[:, 1:2]
+    x2_eq = k[:, 0:1] * (x0[0] + x0[1]) / s
+    return x2_eq + (x0[1] - x2_eq) * np.exp(-s * np.asarray(time_points)[np.newaxis])
@@ -0,0 +1,188 @@
+import tensorflow as tf
+
+from bayesflow.exceptions import ConfigurationError
+
+
+class PlateauSchedule(tf.keras.optimizers.schedules.LearningRateSchedule, tf.Module):
+    """ Learning rate schedule scaled down whenever the validation loss plateaus.
+
+    Wraps a fixed learning rate or another schedule, e.g., the ``ExponentialDecay`` of the training scripts, and
+    multiplies it by a scale that a :class:`TrainingMonitor` reduces on plateaus. The scale is a variable, so it is
+    stored in the trainer's checkpoints and survives resumed runs.
+
+    Examples
+    --------
+    >>> schedule = PlateauSchedule(tf.keras.optimizers.schedules.ExponentialDecay(0.0005, 1000, 0.95))
+    >>> trainer = ParameterEstimationTrainer(amortizer, generative_model, learning_rate=schedule)
+    >>> trainer.set_validation(n_sim=1000, n_obs=21, every=1000)
+    >>> trainer.set_stopping(patience=10, plateau_patience=4)
+    """
+
+    def __init__(self, base, name='plateau_schedule'):
+        """ Creates a plateau schedule.
+
+        Parameters
+        ----------
+        base : float or tf.keras.optimizers.schedules.LearningRateSchedule
+            The learning rate or schedule to scale
+        name : str, default: 'plateau_schedule'
+            The name of the module
+        """
+
+        tf.Module.__init__(self, name=name)
+        self.base = base
+        self.scale = tf.Variable(1., trainable=False, dtype=tf.float32, name='scale')
+
+    def __call__(self, step):
+        learning_rate = self.base(step) if callable(self.base) else self.base
+        return tf.cast(learning_rate, tf.float32) * self.scale
+
+    def reduce(self, factor, min_scale=0.):
+        """ Multiplies the scale by ``factor``, but not below ``min_scale``, and returns the new scale. """
+
+        self.scale.assign(max(float(self.scale.numpy()) * factor, min_scale))
+        return float(self.scale.numpy())
+
+    def get_config(self):
+        base = self.base.get_config() if hasattr(self.base, 'get_config') else self.base
+        return {'base': base, 'scale': float(self.scale.numpy()), 'name': self.name}
+
+
+class TrainingMonitor:
+    """ Decides when training stops, based on a smoothed validation loss and a simulation budget.
+
+    After each validation evaluation, the loss is smoothed with an exponential moving average. If the smoothed loss
+    has not improved by ``min_delta`` for ``plateau_patience`` evaluations, the learning rate of a
+    :class:`PlateauSchedule` is reduced, and after ``patience`` evaluations training stops early. Independently,
+    training stops once ``max_simulations`` datasets have been simulated. The reason is stored in
+    :attr:`stop_reason`.
+
+    Attributes
+    ----------
+    stop_reason   : str or None
+        ``'early_stopping'`` or ``'simulation_budget'`` once training should stop, else ``None``
+    best          : float
+        The best smoothed validation loss so far
+    best_step     : int or None
+        The optimizer step of the best smoothed validation loss
+    n_simulations : int
+        Number of datasets simulated so far
+    reductions    : list of tuple
+        The ``(step, scale)`` of each learning rate reduction
+    """
+
+    def __init__(self, patience=None, min_delta=0., smoothing=0.6, plateau_patience=None, plateau_factor=0.5,
+                 min_scale=1e-3, max_simulations=None):
+        """ Creates a training monitor.
+
+        Parameters
+        ----------
+        patience         : int or None, default: None
+            Number of evaluations without improvement before training stops, ``None`` disables early stopping
+        min_delta        : float, default: 0.
+            Minimum decrease of the smoothed loss counting as improvement
+        smoothing        : float, default: 0.6
+            Weight of the previous value in the moving average of the validation loss, ``0.`` disables smoothing
+        plateau_patience : int or None, default: None
+            Number of evaluations without improvement before the learning rate is reduced, ``None`` disables
+            plateau scheduling
+        plateau_factor   : float, default: 0.5
+            Factor of each learning rate reduction
+        min_scale        : float, default: 1e-3
+            Lower bound of the learning rate scale
+        max_simulations  : int or None, default: None
+            Simulation budget, ``None`` disables the budget
+        """
+
+        if not 0. <= smoothing < 1.:
+            raise ConfigurationError("smoothing must be in [0, 1)!")
+        if not 0. < plateau_factor < 1.:
+            raise ConfigurationError("plateau_factor must be in (0, 1)!")
+
+        self.patience = patience
+        self.min_delta = min_delta
+        self.smoothing = smoothing
+        self.plateau_patience = plateau_patience
+        self.plateau_factor = plateau_factor
+        self.min_scale = min_scale
+        self.max_simulations = max_simulations
+        self.reset()
+
+    def reset(self):
+        """ Clears the monitored history. """
+
+        self.smoothed = None
+        self.best = float('inf')
+        self.best_step = None
+        self.wait = 0
+        self.plateau_wait = 0
+        self.n_simulations = 0
+        self.reductions = []
+        self.stop_reason = None
+
+    @property
+    def uses_validation(self):
+        return self.patience is not None or self.plateau_patience is not None
+
+    def add_simulations(self, n_simulations):
+        """ Counts simulated datasets and stops training once the budget is spent.
+
+        Returns
+        -------
+        stop_reason : str or None
+        """
+
+        self.n_simulations += n_simulations
+        if self.max_simulations is not None and self.n_simulations >= self.max_simulations:
+            self.stop_reason = 'simulation_budget'
+        return self.stop_reason
+
+    def update(self, val_loss, step, schedule=None):
+        """ Adds a validation loss, reduces the learning rate on plateaus and stops training early.
+
+        Parameters
+        ----------
+        val_loss : float
+            The validation loss
+        step     : int
+            The optimizer step of the evaluation
+        schedule : PlateauSchedule or None, default: None
+            The learning rate schedule reduced on plateaus
+
+        Returns
+        -------
+        stop_reason : str or None
+        """
+
+        if self.smoothed is None:
+            self.smoothed = val_loss
+        else:
+            self.smoothed = self.smoothing * self.smoothed + (1. - self.smoothing) * val_loss
+
+        if self.smoothed < self.best - self.min_delta:
+            self.best, self.best_step = self.smoothed, step
+            self.wait = self.plateau_wait = 0
+            return self.stop_reason
+
+        self.wait += 1
+        self.plateau_wait += 1
+        if self.plateau_patience is not None and self.plateau_wait >= self.plateau_patience and schedule is not None:
+            self.reductions.append((step, schedule.reduce(self.plateau_factor, self.min_scale)))
+            self.plateau_wait = 0
+        if self.patience is not None and self.wait >= self.patience:
+            self.stop_reason = 'early_stopping'
+        return self.stop_reason
+
+    def get_state(self):
+        """ Returns the monitored history, e.g., for resumable training. """
+
+        return {name: getattr(self, name) for name in ('smoothed', 'best', 'best_step', 'wait', 'plateau_wait',
+                                                       'n_simulations', 'reductions')}
+
+    def set_state(self, state):
+        """ Restores a history returned by :meth:`get_state`. """
+
+        for name, value in state.items():
+            setattr(self, name, value)
+        self.reductions = list(self.reductions)
+        self.stop_reason = None
@@ -0,0 +1,296 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+
+def _hash_update(h, obj):
+    """ Feeds a (nested) Python/NumPy object into a hash in a canonical, type-aware way. """
+
+    if isinstance(obj, dict):
+        h.update(b'dict')
+        for k in sorted(obj, key=str):
+            _hash_update(h, str(k))
+            _hash_update(h, obj[k])
+    elif isinstance(obj, (list, tuple)):
+        h.update(b'list')
+        for v in obj:
+            _hash_update(h, v)
+    elif isinstance(obj, np.ndarray) or hasattr(obj, '__array__') and not np.isscalar(obj):
+        arr = np.ascontiguousarray(obj)
+        h.update(b'array' + str(arr.dtype).encode() + str(arr.shape).encode())
+        h.update(arr.tobytes())
+    else:
+        h.update(type(obj).__name__.encode() + repr(obj).encode())
+
+
+def reference_key(model, observed, settings=None, seed=None):
+    """ Computes the content-addressed key of a reference posterior.
+
+    Parameters
+    ----------
+    model    : str
+        Name (and version) of the model, e.g., ``'CR3'``. Change it whenever the model definition changes
+    observed : np.ndarray or dict of np.ndarray
+        The observed data set(s), hashed by dtype, shape and content
+    settings : dict or None, default: None
+        Sampler settings, e.g., ``{'sampler': 'emcee', 'n_walkers': 10, 'n_steps': 10000}``
+    seed     : int or None, default: None
+        The random seed of the sampler
+
+    Returns
+    -------
+    key : str
+        Hexadecimal SHA-256 digest
+    """
+
+    h = hashlib.sha256()
+    _hash_update(h, {'model': model, 'observed': observed, 'settings': settings or {}, 'seed': seed})
+    return h.hexdigest()
+
+
+class ChunkedArray:
+    """ Lazily loaded array stored as chunks along its first axis.
+
+    Only the chunks touched by an index are read. Uncompressed chunks are memory-mapped.
+    """
+
+    def __init__(self, files, shape, dtype, chunk_size):
+        self.files = files
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.chunk_size = chunk_size
+
+    def __len__(self):
+        return self.shape[0]
+
+    def _chunk(self, k):
+        """ Loads chunk k, memory-mapped if stored uncompressed. """
+
+        path = self.files[k]
+        if path.endswith('.npz'):
+            with np.load(path) as f:
+                return f['arr_0']
+        return np.load(path, mmap_mode='r')
+
+    def _rows(self, rows):
+        """ Stacks the given rows, loading each touched chunk once. """
+
+        if not rows.size:
+            return np.empty((0,) + self.shape[1:], dtype=self.dtype)
+        loaded = {k: self._chunk(k) for k in np.unique(rows // self.chunk_size)}
+        return np.stack([loaded[r // self.chunk_size][r % self.chunk_size] for r in rows])
+
+    def __getitem__(self, index):
+        if not isinstance(index, tuple):
+            index = (index, )
+        if not index:
+            return np.asarray(self)
+        first, rest = index[0], index[1:]
+
+        # A leading new axis: index the stored axes, then prepend it
+        if first is None:
+            return self[rest][np.newaxis]
+
+        # A leading Ellipsis: expand it, so that the first entry of the index refers to axis 0
+        if first is Ellipsis:
+            if any(i is Ellipsis for i in rest):
+                raise IndexError("an index can only have a single ellipsis ('...')")
+            n_indexed = sum(np.ndim(i) if np.asarray(i).dtype == bool else 1 for i in rest if i is not None)
+            n_expand = len(self.shape) - n_indexed
+            if n_expand < 0:
+                raise IndexError("too many indices for array")
+            if n_expand == 0:
+                return self[rest]
+            first, rest = slice(None), (slice(None), ) * (n_expand - 1) + rest
+
+        # Integer index touches a single chunk
+        if isinstance(first, (int, np.integer)):
+            i = first + self.shape[0] if first < 0 else first
+            if not 0 <= i < self.shape[0]:
+                raise IndexError("index {} is out of bounds for axis 0 with size {}".format(first, self.shape[0]))
+            row = self._chunk(i // self.chunk_size)[i % self.chunk_size]
+            return row[rest] if rest else row
+
+        # Any other index: load the touched chunks only
+        rows = np.arange(self.shape[0])[first]
+        if isinstance(first, slice):
+            out = self._rows(rows)
+            return out[(slice(None), ) + rest] if rest else out
+
+        # Array indexes are mapped onto the loaded rows, so that they still broadcast with array indexes of the
+        # other axes as in NumPy
+        needed = np.unique(rows)
+        return self._rows(needed)[(np.searchsorted(needed, rows), ) + rest]
+
+    def __array__(self, dtype=None, copy=None):
+        # Concatenating the chunks always copies, see the ``copy`` keyword of the NumPy 2 array protocol
+        if copy is False:
+            raise ValueError('ChunkedArray cannot be converted to an array without a copy.')
+        arr = np.concatenate([np.asarray(self._chunk(k)) for k in range(len(self.files))], axis=0)
+        return arr if dtype is None else arr.astype(dtype)
+
+
+class ReferenceStore:
+    """ Persistent, content-addressed store of reference posterior results (e.g., MCMC or ABC samples).
+
+    Each entry lives in ``root/<key>/`` and holds a ``meta.json`` plus every array split into chunks along its
+    first axis. Entries are written to a temporary directory and renamed into place, so a crashed run never
+    leaves a partial entry behind.
+    """
+
+    def __init__(self, root, chunk_size=100, compress=True):
+        """ Opens (or creates) a store.
+
+        Parameters
+        ----------
+        root       : str
+            The directory of the store
+        chunk_size : int, default: 100
+            Number of entries along the first axis per chunk, e.g., data sets per chunk
+        compress   : bool, default: True
+            Whether chunks are stored compressed (``.npz``). Uncompressed chunks (``.npy``) are memory-mapped on load
+        """
+
+        self.root = root
+        self.chunk_size = chunk_size
+        self.compress = compress
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.root, key)
+
+    def __contains__(self, key):
+        return os.path.exists(os.path.join(self._path(key), 'meta.json'))
+
+    def put(self, key, arrays, meta=None):
+        """ Stores a dict of arrays under a key, replacing an existing entry.
+
+        Parameters
+        ----------
+        key    : str
+            The key, e.g., computed by :func:`reference_key`
+        arrays : dict
+            Maps names to array-like values. Scalars are stored as arrays of shape (1, )
+        meta   : dict or None, default: None
+            JSON-serializable metadata, e.g., the settings the key was computed from
+        """
+
+        tmp_dir = tempfile.mkdtemp(dir=self.root, prefix='.tmp_')
+        index = {}
+        try:
+            for name, value in arrays.items():
+                value = np.asarray(value)
+                if value.ndim == 0:
+                    value = value[np.newaxis]
+                files = []
+                for k, start in enumerate(range(0, max(value.shape[0], 1), self.chunk_size)):
+                    chunk = value[start:start + self.chunk_size]
+                    fname = '{}.{}.{}'.format(name, k, 'npz' if self.compress else 'npy')
+                    if self.compress:
+                        np.savez_compressed(os.path.join(tmp_dir, fname), chunk)
+                    else:
+                        np.save(os.path.join(tmp_dir, fname), chunk)
+                    files.append(fname)
+                index[name] = {'files': files, 'shape': list(value.shape), 'dtype': str(value.dtype),
+                               'chunk_size': self.chunk_size}
+            with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+                json.dump({'arrays': index, 'meta': meta or {}}, f)
+
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        # Atomically publish the entry. An existing entry is first renamed aside, so that the key always holds
+        # either the old or the new complete entry and the old one is restored if the swap fails
+        target = self._path(key)
+        old_dir = None
+        if os.path.exists(target):
+            old_dir = tempfile.mkdtemp(dir=self.root, prefix='.old_')
+            os.rmdir(old_dir)
+            os.rename(target, old_dir)
+        try:
+            os.rename(tmp_dir, target)
+        except Exception:
+            if old_dir is not None:
+                os.rename(old_dir, target)
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        if old_dir is not None:
+            shutil.rmtree(old_dir, ignore_errors=True)
+
+    def get(self, key):
+        """ Lazily loads an entry.
+
+        Parameters
+        ----------
+        key : str
+            The key of the entry
+
+        Returns
+        -------
+        arrays : dict
+            Maps names to :class:`ChunkedArray` objects; use ``np.asarray`` to load an array completely
+        meta   : dict
+            The metadata stored with the entry
+        """
+
+        if key not in self:
+            raise KeyError(key)
+        path = self._path(key)
+        with open(os.path.join(path, 'meta.json')) as f:
+            entry = json.load(f)
+        arrays = {
+            name: ChunkedArray([os.path.join(path, fname) for fname in info['files']],
+                               info['shape'], info['dtype'], info['chunk_size'])
+            for name, info in entry['arrays'].items()
+        }
+        return arrays, entry['meta']
+
+    def get_or_compute(self, compute, model, observed, settings=None, seed=None):
+        """ Returns a stored reference, computing and storing it only if it is missing.
+
+        Parameters
+        ----------
+        compute  : callable
+            Computes the reference without arguments and returns a dict of arrays
+        model    : str
+            Name (and version) of the model
+        observed : np.ndarray or dict of np.ndarray
+            The observed data set(s)
+        settings : dict or None, default: None
+            Sampler settings
+        seed     : int or None, default: None
+            The random seed of the sampler
+
+        Returns
+        -------
+        arrays : dict
+            Maps names to :class:`ChunkedArray` objects
+
+        Examples
+        --------
+        >>> store = ReferenceStore('references')
+        >>> settings = {'sampler': 'emcee', 'n_walkers': 10, 'n_steps': 10000}
+        >>> ref = store.get_or_compute(lambda: reference_posteriors(...), 'CR3', x_augment01, settings, seed=42)
+        >>> mcmc_means = np.asarray(ref['means'])
+        """
+
+        key = reference_key(model, observed, settings, seed)
+        if key not in self:
+            meta = {'model': model, 'settings': settings or {}, 'seed': seed}
+            self.put(key, compute(), meta=json.loads(json.dumps(meta, default=str)))
+        return self.get(key)[0]
+
+    def delete(self, key):
+        """ Removes an entry, if present. """
+
+        shutil.rmtree(self._path(key), ignore_errors=True)
+
+    def keys(self):
+        """ Returns the keys of all complete entries. """
+
+        return [k for k in sorted(os.listdir(self.root)) if not k.startswith('.') and k in self]
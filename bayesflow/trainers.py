@@ -1,21 +1,31 @@
+import os
+import time
 from abc import ABC, abstractmethod
 
 import numpy as np
 import tensorflow as tf
 from tensorflow.keras.optimizers import Adam
 from tensorflow.keras.utils import to_categorical
-from tqdm.notebook import tqdm
+from tqdm.auto import tqdm
 
 from bayesflow.buffer import MemoryReplayBuffer
-from bayesflow.exceptions import SimulationError, SummaryStatsError, OperationNotSupportedError, LossError
-from bayesflow.helpers import clip_gradients
+from bayesflow.checkpoints import CheckpointWriter, capture_rng_state, restore_rng_state, save_training_state, \
+    load_training_state
+from bayesflow.exceptions import SimulationError, SummaryStatsError, OperationNotSupportedError, LossError, \
+    ConfigurationError
+from bayesflow.helpers import clip_gradients, as_float32
 from bayesflow.losses import kl_latent_space_gaussian, log_loss
+from bayesflow.metrics import MetricsLogger
+from bayesflow.profiling import StepProfiler, profile_section
+from bayesflow.stopping import PlateauSchedule, TrainingMonitor
+from bayesflow.validation import ValidationSet, simulator_hash
 
 
 class BaseTrainer(ABC):
 
     def __init__(self, network, generative_model, loss, summary_stats, optimizer,
-                 learning_rate, checkpoint_path, max_to_keep, clip_method, clip_value, skip_checks):
+                 learning_rate, checkpoint_path, max_to_keep, clip_method, clip_value, skip_checks,
+                 save_every=None, async_checkpoint=False, metrics_path=None):
         """Base class for a trainer performing forward inference and training an amortized neural estimator.
 
         Parameters
@@ -30,8 +40,8 @@ class BaseTrainer(ABC):
             Optional summary statistics function
         optimizer        : None or tf.keras.optimizer.Optimizer
             Optimizer for the neural network. ``None`` will result in `tf.keras.optimizers.Adam`
-        learning_rate    : float
-            The learning rate used for the optimizer
+        learning_rate    : float or tf.keras.optimizers.schedules.LearningRateSchedule
+            The learning rate used for the optimizer. A schedule that is a ``tf.Module`` is checkpointed as well
         checkpoint_path  : string, optional
             Optional folder name for storing the trained network
         max_to_keep      : int, optional
@@ -42,6 +52,13 @@ class BaseTrainer(ABC):
             The value used for gradient clipping when clip_method is in {'value', 'norm'}
         skip_checks      : boolean
             If True, do not perform consistency checks, i.e., simulator runs and passed through nets
+        save_every       : int or None, default: None
+            Additionally saves a checkpoint every ``save_every`` optimizer steps, not only after each epoch
+        async_checkpoint : bool, default: False
+            If True, checkpoints are written and pruned in the background, see
+            :class:`bayesflow.checkpoints.CheckpointWriter`
+        metrics_path     : str or None, default: None
+            Optional append-only log of the training metrics, see :class:`bayesflow.metrics.MetricsLogger`
         """
 
         self.network = network
@@ -57,6 +74,14 @@ class BaseTrainer(ABC):
         self.clip_method = clip_method
         self.clip_value = clip_value
         self.n_obs = None
+        self.metrics = MetricsLogger(metrics_path)
+        self._grad_norm = None
+        self.profiler = None
+        self.validation = None
+        self.stopping = None
+        self.stop_reason = None
+        self._compiled_step = None
+        self.learning_rate = learning_rate
 
         # Optimizer settings
         if optimizer is None:
@@ -66,7 +91,10 @@ class BaseTrainer(ABC):
 
         # Checkpoint settings
         if checkpoint_path is not None:
-            self.checkpoint = tf.train.Checkpoint(optimizer=self.optimizer, model=self.network)
+            trackables = {'optimizer': self.optimizer, 'model': self.network}
+            if isinstance(learning_rate, tf.Module):
+                trackables['lr_schedule'] = learning_rate
+            self.checkpoint = tf.train.Checkpoint(**trackables)
             self.manager = tf.train.CheckpointManager(self.checkpoint, checkpoint_path, max_to_keep=max_to_keep)
             self.checkpoint.restore(self.manager.latest_checkpoint)
             if self.manager.latest_checkpoint:
@@ -78,8 +106,244 @@ class BaseTrainer(ABC):
             self.manager = None
         self.checkpoint_path = checkpoint_path
 
+        # Step-wise or background checkpointing, otherwise the manager saves after each epoch
+        if self.checkpoint is not None and (save_every is not None or async_checkpoint):
+            self.writer = CheckpointWriter(self.checkpoint, checkpoint_path, max_to_keep=max_to_keep,
+                                           save_every=save_every, async_write=async_checkpoint)
+        else:
+            self.writer = None
+
+        # Generative models with declared output specs are checked lazily on the first batch
+        self._pending_checks = False
         if not skip_checks:
-            self._check_consistency()
+            if getattr(self.generative_model, 'has_output_spec', False):
+                self._pending_checks = True
+            else:
+                self._check_consistency()
+
+    def enable_profiling(self, trace_dir=None, trace_steps=(10, 20), sync=True):
+        """Times the sections of each training step and prints a breakdown after each epoch.
+
+        Parameters
+        ----------
+        trace_dir   : str or None, default: None
+            Optional log directory for a ``tf.profiler`` trace of the steps in ``trace_steps``
+        trace_steps : tuple(int, int), default: (10, 20)
+            First (inclusive) and last (exclusive) step of the trace window
+        sync        : bool, default: True
+            Whether to wait for asynchronous TensorFlow work inside the timed sections
+
+        Returns
+        -------
+        profiler : bayesflow.profiling.StepProfiler
+            The profiler, set ``trainer.profiler = None`` to disable profiling again
+        """
+
+        self.profiler = StepProfiler(trace_dir, trace_steps, sync)
+        models = [self.generative_model] + list(getattr(self.generative_model, 'generative_models', []))
+        for model in models:
+            if model is not None and hasattr(model, 'profiler'):
+                model.profiler = self.profiler
+        return self.profiler
+
+    def set_validation(self, n_sim, n_obs, every=1000, batch_size=512, seed=0, cache_dir=None, key=None,
+                       compiled=True, **kwargs):
+        """Simulates a fixed validation set once and evaluates the loss on it every ``every`` optimizer steps.
+
+        The set is simulated with a fixed seed and cached in ``cache_dir`` under a key hashing the code of the
+        generative model and the simulation settings, so the validation losses are comparable across epochs and
+        runs, and later runs load the set instead of simulating it. The evaluations are stored in
+        ``trainer.validation.history`` and in the training state of checkpoints.
+
+        Parameters
+        ----------
+        n_sim      : int
+            Number of validation simulations, e.g., 1000
+        n_obs      : int
+            Number of observations (fixed) for each data set
+        every      : int or None, default: 1000
+            Number of optimizer steps between evaluations, ``None`` evaluates on demand only
+        batch_size : int, default: 512
+            Number of simulations per loss evaluation
+        seed       : int, default: 0
+            Seed of the validation simulations
+        cache_dir  : str or None, default: None
+            Folder of the cached validation sets, e.g., the checkpoint folder. ``None`` disables caching
+        key        : str or None, default: None
+            Cache key, ``None`` hashes the generative model (see :func:`bayesflow.validation.simulator_hash`)
+        compiled   : bool, default: True
+            Whether to evaluate the loss as a ``tf.function``
+        **kwargs : dict
+            Passed to the simulator(s)
+
+        Returns
+        -------
+        validation : bayesflow.validation.ValidationSet
+            The validation set, set ``trainer.validation = None`` to disable validation again
+        """
+
+        if self.generative_model is None:
+            raise OperationNotSupportedError("No generative model specified. Validation sets cannot be simulated!")
+        if not isinstance(n_obs, (int, np.integer)):
+            raise ConfigurationError("Validation sets need a fixed n_obs!")
+        if n_sim < 1 or batch_size < 1 or (every is not None and every < 1):
+            raise ConfigurationError("n_sim, batch_size and every must be positive!")
+
+        if key is None:
+            key = '{}_{}'.format(type(self).__name__,
+                                 simulator_hash(self.generative_model, n_sim, n_obs, seed, **kwargs)[:16])
+        validation = ValidationSet.simulate(
+            lambda n, n_o, **kw: self._forward_inference(n, n_o, summarize=False, **kw),
+            n_sim, n_obs, seed=seed, cache_dir=cache_dir, key=key, every=every, batch_size=batch_size,
+            compiled=compiled, **kwargs)
+
+        # Hand-crafted summaries are computed once and not cached, so they may change between runs
+        if self.summary_stats is not None:
+            validation.args = validation.args[:-1] + (np.asarray(self.summary_stats(validation.args[-1]),
+                                                                 dtype=np.float32), )
+        self.validation = validation
+        return validation
+
+    def validate(self):
+        """Evaluates the loss on the validation set and records it at the current optimizer step.
+
+        Returns
+        -------
+        val_loss : float
+        """
+
+        if self.validation is None:
+            raise OperationNotSupportedError("No validation set. Call trainer.set_validation first!")
+        return self.validation.evaluate(self.loss, self.network, step=self.metrics.step)
+
+    def set_stopping(self, patience=None, min_delta=0., smoothing=0.6, plateau_patience=None, plateau_factor=0.5,
+                     min_scale=1e-3, max_simulations=None):
+        """Stops training early when the smoothed validation loss stops improving or the simulation budget is spent,
+        and reduces the learning rate on plateaus.
+
+        Training stops right after the step that triggers a criterion and stores a checkpoint of that step, whose
+        training state records the last trained iteration, so ``resume=True`` continues the interrupted epoch.
+        ``trainer.stop_reason`` records why: ``'early_stopping'``, ``'simulation_budget'`` or ``'epochs'`` if all
+        epochs were trained.
+
+        Parameters
+        ----------
+        patience         : int or None, default: None
+            Number of validation evaluations without improvement before training stops
+        min_delta        : float, default: 0.
+            Minimum decrease of the smoothed validation loss counting as improvement
+        smoothing        : float, default: 0.6
+            Weight of the previous value in the moving average of the validation loss
+        plateau_patience : int or None, default: None
+            Number of evaluations without improvement before the learning rate is reduced. Requires a
+            :class:`bayesflow.stopping.PlateauSchedule` as learning rate
+        plateau_factor   : float, default: 0.5
+            Factor of each learning rate reduction
+        min_scale        : float, default: 1e-3
+            Lower bound of the learning rate scale
+        max_simulations  : int or None, default: None
+            Number of simulated datasets after which online training stops
+
+        Returns
+        -------
+        monitor : bayesflow.stopping.TrainingMonitor
+            The monitor, set ``trainer.stopping = None`` to disable it again
+        """
+
+        monitor = TrainingMonitor(patience, min_delta, smoothing, plateau_patience, plateau_factor, min_scale,
+                                  max_simulations)
+        if monitor.uses_validation and (self.validation is None or self.validation.every is None):
+            raise ConfigurationError("Early stopping and plateau scheduling need a validation set evaluated every "
+                                     "few steps. Call trainer.set_validation first!")
+        if plateau_patience is not None and not isinstance(self.learning_rate, PlateauSchedule):
+            raise ConfigurationError("Plateau scheduling needs a bayesflow.stopping.PlateauSchedule as learning rate!")
+        self.stopping = monitor
+        return monitor
+
+    def _monitor_step(self, n_simulations=0):
+        """Evaluates the validation loss if due and updates the stopping criteria after the current step.
+
+        Returns
+        -------
+        stop : bool
+            Whether training should stop
+        """
+
+        val_loss = None
+        if self.validation is not None and self.validation.due(self.metrics.step):
+            with profile_section(self.profiler, 'validation'):
+                val_loss = self.validate()
+        if self.stopping is None:
+            return False
+        if n_simulations:
+            self.stopping.add_simulations(n_simulations)
+        if val_loss is not None and self.stopping.uses_validation:
+            schedule = self.learning_rate if isinstance(self.learning_rate, PlateauSchedule) else None
+            self.stopping.update(val_loss, self.metrics.step, schedule)
+        self.stop_reason = self.stopping.stop_reason
+        return self.stop_reason is not None
+
+    def _start_training(self):
+        """Clears the stop reason of a previous training run.
+        """
+
+        self.stop_reason = None
+        if self.stopping is not None:
+            self.stopping.stop_reason = None
+
+    def _end_training(self):
+        """Records the stop reason and waits for pending checkpoints and metrics.
+        """
+
+        if self.stop_reason is None:
+            self.stop_reason = 'epochs'
+        else:
+            print("Training stopped at step {}: {}.".format(self.metrics.step, self.stop_reason))
+        self._flush_checkpoints()
+        self.metrics.flush()
+        if self.profiler is not None:
+            self.profiler.stop_trace()
+
+    def set_execution_mode(self, jit_compile=True, compute_dtype=None):
+        """Compiles the forward and backward pass of the training steps and sets the compute dtype of the
+        coupling nets.
+
+        With ``jit_compile``, the loss and its gradients are computed by one XLA-compiled graph, retraced for each
+        new batch shape (e.g., each value of a variable ``n_obs``). With ``compute_dtype='bfloat16'``, the dense
+        stacks of the coupling nets compute in bfloat16 on float32 weights, while the ``atan`` soft clamp, the
+        ``log_det_J`` accumulation, the summary network and the loss stay in float32. Use
+        :func:`bayesflow.benchmarks.execution_modes` to time the modes and
+        :func:`bayesflow.execution.calibration_check` to check the calibration of a trained network. Each call traces
+        the compiled steps and the validation loss again, so switch the compute dtype through this method rather than
+        :func:`bayesflow.execution.set_compute_dtype` once the steps are compiled.
+
+        Parameters
+        ----------
+        jit_compile   : bool, default: True
+            Whether to compile the steps with XLA, ``False`` restores eager steps
+        compute_dtype : str or None, default: None
+            ``'bfloat16'`` or ``None`` for float32 compute, see :func:`bayesflow.execution.set_compute_dtype`
+        """
+
+        from bayesflow.execution import compile_gradient_step, set_compute_dtype
+
+        # Traced functions keep the compute dtype they were traced with, so the steps and the compiled validation
+        # loss are traced again
+        set_compute_dtype(self.network, compute_dtype)
+        self._compiled_step = compile_gradient_step(self.loss, self.network) if jit_compile else None
+        if self.validation is not None:
+            self.validation.reset_compiled()
+
+    def _profile_step(self, end_of_epoch=False, epoch=None):
+        """Marks the end of a training step or epoch for the profiler, if profiling is enabled.
+        """
+
+        if self.profiler is None:
+            return
+        if end_of_epoch:
+            self.profiler.report(epoch)
+        else:
+            self.profiler.step()
 
     def load_pretrained_network(self):
         """Attempts to load a pre-trained network if checkpoint path is provided and a checkpoint manager exists.
@@ -90,7 +354,59 @@ class BaseTrainer(ABC):
         status = self.checkpoint.restore(self.manager.latest_checkpoint)
         return status
 
-    def train_online(self, epochs, iterations_per_epoch, batch_size, n_obs, **kwargs):
+    def train_step(self, args, epoch, iteration, losses, sim_time=0., n_simulations=0, summarize=False,
+                   state=None):
+        """Performs one training step on a simulated batch together with its bookkeeping: backpropagation, loss
+        history, metrics, profiling, validation, stopping criteria and checkpointing.
+
+        All training loops run their steps through this method, including loops driving several trainers at once
+        (e.g., :class:`bayesflow.experiments.SharedStreamSweep`).
+
+        Parameters
+        ----------
+        args          : tuple
+            The (encoded) inputs of the loss, e.g., ``(params, sim_data)``
+        epoch         : int
+            The current epoch
+        iteration     : int
+            The current iteration within the epoch
+        losses        : dict(ep_num : list(losses))
+            The loss history, the loss of the step is appended to ``losses[epoch]``
+        sim_time      : float, default: 0.
+            Seconds spent simulating and encoding the batch
+        n_simulations : int, default: 0
+            Number of simulated data sets of the batch, counted towards the simulation budget
+        summarize     : bool, default: False
+            Whether to compute the hand-crafted summary statistics of the data first, if given
+        state         : callable or None, default: None
+            Returns the training state to store with a checkpoint due at this step, e.g.,
+            ``lambda: trainer._training_state(ep, it, losses)``
+
+        Returns
+        -------
+        loss : float
+            The loss of the step
+        stop : bool
+            Whether training should stop after this step, see :meth:`set_stopping`
+        """
+
+        tic = time.perf_counter()
+        if summarize and self.summary_stats is not None:
+            args = tuple(args[:-1]) + (self.summary_stats(args[-1]), )
+
+        # One step backprop
+        loss = self._train_step(*args)
+        train_time = time.perf_counter() - tic
+
+        # Store loss into dictionary and metrics, then check the stopping criteria and store a due checkpoint
+        losses.setdefault(epoch, []).append(loss)
+        self.metrics.update(loss, sim_time, train_time, self._grad_norm, epoch, iteration)
+        self._profile_step()
+        stop = self._monitor_step(n_simulations)
+        self._save_checkpoint(state=state)
+        return loss, stop
+
+    def train_online(self, epochs, iterations_per_epoch, batch_size, n_obs, resume=False, **kwargs):
         """Trains the inference network(s) via online learning. Additional keyword arguments
         are passed to the simulators.
 
@@ -105,6 +421,9 @@ class BaseTrainer(ABC):
             -  if `int`, then treated as a fixed number of observations, \n
             -  if `callable`, then treated as a function for sampling N, i.e., :math:`N \sim p(N)`
 
+        resume : bool, default: False
+            If True, continues from the training state stored with the latest checkpoint (epoch, iteration,
+            loss history and RNG streams), e.g., after preemption. Starts from scratch if there is none
         **kwargs : dict
             Passed to the simulator(s)
 
@@ -114,33 +433,49 @@ class BaseTrainer(ABC):
             A dictionary storing the losses across epochs and iterations
         """
 
-        losses = dict()
-        for ep in range(1, epochs + 1):
-            losses[ep] = []
-            with tqdm(total=iterations_per_epoch, desc='Training epoch {}'.format(ep)) as p_bar:
-                for it in range(1, iterations_per_epoch + 1):
+        losses, start_ep, start_it = dict(), 1, 1
+        if resume:
+            state = self._restore_training_state()
+            if state is not None:
+                losses = state['losses']
+                start_ep, start_it = self._resume_position(state, iterations_per_epoch)
+
+        self._start_training()
+        for ep in range(start_ep, epochs + 1):
+            losses.setdefault(ep, [])
+            self.metrics.start_epoch(losses[ep])
+            first_it, end_it = start_it if ep == start_ep else 1, iterations_per_epoch
+            with tqdm(total=iterations_per_epoch, initial=first_it - 1,
+                      desc='Training epoch {}'.format(ep)) as p_bar:
+                for it in range(first_it, iterations_per_epoch + 1):
 
                     # Determine n_obs and generate data on-the-fly
                     if type(n_obs) is int:
                         n_obs_it = n_obs
                     else:
                         n_obs_it = n_obs()
+                    tic = time.perf_counter()
                     args = self._forward_inference(batch_size, n_obs_it, **kwargs)
+                    sim_time = time.perf_counter() - tic
 
-                    # One step backprop
-                    loss = self._train_step(*args)
-
-                    # Store loss into dictionary
-                    losses[ep].append(loss)
+                    # One step backprop with metrics, stopping criteria and checkpoint
+                    loss, stop = self.train_step(args, ep, it, losses, sim_time, batch_size,
+                                                 state=lambda: self._training_state(ep, it, losses))
 
                     # Update progress bar
                     p_bar.set_postfix_str("Epoch {0},Iteration {1},Loss: {2:.3f},Running Loss: {3:.3f}"
-                                          .format(ep, it, loss, np.mean(losses[ep])))
+                                          .format(ep, it, loss, self.metrics.epoch_mean))
                     p_bar.update(1)
-
-            # Store after each epoch, if specified
-            if self.manager is not None:
-                self.manager.save()
+                    if stop:
+                        end_it = it
+                        break
+
+            # Report profile and store after each epoch or early stop, recording the last trained iteration
+            self._profile_step(end_of_epoch=True, epoch=ep)
+            self._save_checkpoint(end_of_epoch=True, state=lambda: self._training_state(ep, end_it, losses))
+            if self.stop_reason is not None:
+                break
+        self._end_training()
         return losses
 
     def train_offline(self, epochs, batch_size, *args, **kwargs):
@@ -225,26 +560,29 @@ class BaseTrainer(ABC):
             .batch(batch_size)
 
         losses = dict()
+        self._start_training()
         for ep in range(1, epochs + 1):
             losses[ep] = []
+            self.metrics.start_epoch()
             with tqdm(total=int(np.ceil(n_sim / batch_size)), desc='Training epoch {}'.format(ep)) as p_bar:
                 # Loop through dataset
                 for bi, batch in enumerate(data_set):
-                    # Extract arguments from batch
-                    args_b = tuple(batch)
+                    # One step backpropagation on the arguments of the batch
+                    loss, stop = self.train_step(tuple(batch), ep, bi + 1, losses)
 
-                    # One step backpropagation
-                    loss = self._train_step(*args_b)
-
-                    # Store loss and update progress bar
-                    losses[ep].append(loss)
+                    # Update progress bar
                     p_bar.set_postfix_str("Epoch {0},Batch {1},Loss: {2:.3f},Running Loss: {3:.3f}"
-                                          .format(ep, bi + 1, loss, np.mean(losses[ep])))
+                                          .format(ep, bi + 1, loss, self.metrics.epoch_mean))
                     p_bar.update(1)
-
-            # Store after each epoch, if specified
-            if self.manager is not None:
-                self.manager.save()
+                    if stop:
+                        break
+
+            # Report profile and store after each epoch, if specified
+            self._profile_step(end_of_epoch=True, epoch=ep)
+            self._save_checkpoint(end_of_epoch=True)
+            if self.stop_reason is not None:
+                break
+        self._end_training()
         return losses
 
     def simulate_and_train_offline(self, n_sim, epochs, batch_size, n_obs, **kwargs):
@@ -339,17 +677,146 @@ class BaseTrainer(ABC):
 
         return losses
 
-    def _train_step(self, *args):
-        """Computes loss and applies gradients.
+    def _save_checkpoint(self, end_of_epoch=False, state=None):
+        """Saves a checkpoint if one is due, i.e., after each epoch and every ``save_every`` optimizer steps.
+
+        Parameters
+        ----------
+        end_of_epoch : bool, default: False
+            Whether the current step ends an epoch
+        state        : callable or None, default: None
+            Returns the training state to store with the checkpoint, only called if a checkpoint is due
         """
-        with tf.GradientTape() as tape:
-            loss = self.loss(self.network, *args)
 
-        # One step backprop
-        gradients = tape.gradient(loss, self.network.trainable_variables)
-        self._apply_gradients(gradients, self.network.trainable_variables)
+        if self.writer is not None:
+            self.writer.step(int(self.optimizer.iterations.numpy()), end_of_epoch=end_of_epoch, state=state)
+        elif end_of_epoch and self.manager is not None:
+            prefix = self.manager.save()
+            if state is not None:
+                save_training_state(prefix, state())
+                self._prune_training_states()
+
+    def _prune_training_states(self):
+        """Removes the state files of checkpoints the manager has already deleted.
+        """
+
+        kept = set(self.manager.checkpoints)
+        for path in tf.io.gfile.glob(os.path.join(self.checkpoint_path, '*.state')):
+            if path[:-len('.state')] not in kept:
+                tf.io.gfile.remove(path)
+
+    def _training_state(self, epoch, iteration, losses, buffer=None):
+        """Collects the Python-side training state after the given iteration for a checkpoint.
+        """
+
+        state = {
+            'epoch': epoch,
+            'iteration': iteration,
+            'losses': {ep: list(ep_losses) for ep, ep_losses in losses.items()},
+            'rng': capture_rng_state()
+        }
+        if buffer is not None:
+            state['buffer'] = buffer.get_state()
+        if getattr(self.generative_model, 'rng', None) is not None:
+            state['batch_rng'] = self.generative_model.rng.get_state()
+        if self.validation is not None:
+            state['validation'] = self.validation.get_state()
+        if self.stopping is not None:
+            state['stopping'] = self.stopping.get_state()
+        return state
+
+    def _latest_training_state(self):
+        """Returns the training state stored with the latest checkpoint without restoring anything, or ``None``.
+        """
+
+        if self.checkpoint_path is None:
+            return None
+        return load_training_state(tf.train.latest_checkpoint(self.checkpoint_path))
+
+    def _restore_training_state(self, restore_rng=True):
+        """Restores the latest checkpoint together with its training state and RNG streams.
+
+        Parameters
+        ----------
+        restore_rng : bool, default: True
+            Whether to restore the global RNG streams, e.g., ``False`` if a caller driving several trainers
+            restores them once
 
-        return loss.numpy()
+        Returns
+        -------
+        state : dict or None
+            The training state or ``None`` if there is no checkpoint with a stored training state
+        """
+
+        if self.checkpoint_path is None:
+            return None
+        latest = tf.train.latest_checkpoint(self.checkpoint_path)
+        state = load_training_state(latest)
+        if state is None:
+            print("No training state found. Training from the first epoch.")
+            return None
+        self.checkpoint.restore(latest)
+        if restore_rng:
+            restore_rng_state(state['rng'])
+        if 'batch_rng' in state and getattr(self.generative_model, 'rng', None) is not None:
+            self.generative_model.rng.set_state(state['batch_rng'])
+        if 'validation' in state and self.validation is not None:
+            self.validation.set_state(state['validation'])
+        if 'stopping' in state and self.stopping is not None:
+            self.stopping.set_state(state['stopping'])
+        self.metrics.step = int(self.optimizer.iterations.numpy())
+        print("Resuming from {} at epoch {}, iteration {}.".format(latest, state['epoch'], state['iteration']))
+        return state
+
+    @staticmethod
+    def _resume_position(state, iterations_per_epoch):
+        """Returns the epoch and iteration following the stored ones.
+        """
+
+        if state['iteration'] >= iterations_per_epoch:
+            return state['epoch'] + 1, 1
+        return state['epoch'], state['iteration'] + 1
+
+    def _flush_checkpoints(self):
+        """Waits until all checkpoints written in the background are published.
+        """
+
+        if self.writer is not None:
+            self.writer.flush()
+
+    def _train_step(self, *args):
+        """Computes loss and applies gradients.
+        """
+        if self._pending_checks:
+            self._check_loss(*args)
+
+        sync = self.profiler is not None and self.profiler.sync
+        if self._compiled_step is not None:
+            # Variables are created eagerly, before the first trace
+            if not self.network.built:
+                self.loss(self.network, *args)
+            with profile_section(self.profiler, 'compiled_step'):
+                loss, gradients = self._compiled_step(*args)
+                loss_value = loss.numpy()
+            self._grad_norm = tf.linalg.global_norm(gradients)
+        else:
+            with profile_section(self.profiler, 'forward'):
+                with tf.GradientTape() as tape:
+                    loss = self.loss(self.network, *args)
+                loss_value = loss.numpy()
+
+            # One step backprop
+            with profile_section(self.profiler, 'backward'):
+                gradients = tape.gradient(loss, self.network.trainable_variables)
+                self._grad_norm = tf.linalg.global_norm(gradients)
+                if sync:
+                    self._grad_norm.numpy()
+        with profile_section(self.profiler, 'apply'):
+            self._apply_gradients(gradients, self.network.trainable_variables)
+            if sync:
+                self.optimizer.iterations.numpy()
+
+        return loss_value
 
     def _apply_gradients(self, gradients, tensors):
         """Updates each tensor in the 'variables' list via backpropagation. Operation is performed in-place.
@@ -368,7 +835,7 @@ class BaseTrainer(ABC):
         self.optimizer.apply_gradients(zip(gradients, tensors))
 
     @abstractmethod
-    def _forward_inference(self, n_sim, n_obs, **kwargs):
+    def _forward_inference(self, n_sim, n_obs, summarize=True, **kwargs):
         """Simulate arguments for training (abstract method).
 
         In subclasses, this method is implemented as:
@@ -433,19 +900,25 @@ class BaseTrainer(ABC):
             except Exception as err:
                 raise SummaryStatsError(repr(err))
 
-        # Run loss function check
+        # Run loss function check on the same batch
+        self._check_loss(*args)
+
+    def _check_loss(self, *args):
+        """Tests whether the loss can be computed on a batch, e.g., lazily on the first training batch
+        """
+
         try:
-            args = self._forward_inference(n_sim=2, n_obs=50)
             _loss = self.loss(self.network, *args)
         except Exception as err:
             raise LossError(repr(err))
+        self._pending_checks = False
 
 
 class MetaTrainer(BaseTrainer):
 
     def __init__(self, network, generative_model=None, loss=None, summary_stats=None, optimizer=None,
                  learning_rate=0.0005, checkpoint_path=None, max_to_keep=5, clip_method='global_norm', 
-                 clip_value=None, skip_checks=False):
+                 clip_value=None, skip_checks=False, save_every=None, async_checkpoint=False, metrics_path=None):
         """ Creates a trainer instance for performing multi-model forward inference and training an
         amortized neural estimator for parameter estimation and model comparison (BayesFlow).
 
@@ -461,7 +934,8 @@ class MetaTrainer(BaseTrainer):
             _loss = loss
 
         super().__init__(network, generative_model, _loss, summary_stats, optimizer, learning_rate,
-                         checkpoint_path, max_to_keep, clip_method, clip_value, skip_checks)
+                         checkpoint_path, max_to_keep, clip_method, clip_value, skip_checks,
+                         save_every, async_checkpoint, metrics_path)
 
     def _forward_inference(self, n_sim, n_obs, summarize=True, **kwargs):
         """Performs one step of multi-model forward inference.
@@ -516,7 +990,7 @@ class ModelComparisonTrainer(BaseTrainer):
 
     def __init__(self, network, generative_model=None, loss=None, summary_stats=None, optimizer=None, 
                  n_models=None, learning_rate=0.0005, checkpoint_path=None, max_to_keep=5, clip_method='global_norm', 
-                 clip_value=None, skip_checks=False):
+                 clip_value=None, skip_checks=False, save_every=None, async_checkpoint=False, metrics_path=None):
         """Creates a trainer instance for performing multi-model forward inference and training an
         amortized neural estimator for model comparison.
 
@@ -533,7 +1007,8 @@ class ModelComparisonTrainer(BaseTrainer):
 
         self.n_models = n_models
         super().__init__(network, generative_model, _loss, summary_stats, optimizer, learning_rate,
-                         checkpoint_path, max_to_keep, clip_method, clip_value, skip_checks)
+                         checkpoint_path, max_to_keep, clip_method, clip_value, skip_checks,
+                         save_every, async_checkpoint, metrics_path)
 
     def train_offline(self, epochs, batch_size, *args, **kwargs):
         """Handles one-hot encoding if necessary and calls superclass method.
@@ -593,7 +1068,7 @@ class ModelComparisonTrainer(BaseTrainer):
         # call train_offline of superclass with one-hot encoded model_indices
         super().train_offline(epochs, batch_size, model_indices, sim_data)
 
-    def _forward_inference(self, n_sim, n_obs, **kwargs):
+    def _forward_inference(self, n_sim, n_obs, summarize=True, **kwargs):
         """Performs one step of multi-model forward inference.
 
         Parameters
@@ -630,7 +1105,7 @@ class ModelComparisonTrainer(BaseTrainer):
         model_indices_oh, _params, sim_data = self.generative_model(n_sim, n_obs, **kwargs)
 
         # Compute hand-crafted summary statistics, if given
-        if self.summary_stats is not None:
+        if summarize and self.summary_stats is not None:
             sim_data = self.summary_stats(sim_data)
 
         return model_indices_oh, sim_data
@@ -640,7 +1115,7 @@ class ParameterEstimationTrainer(BaseTrainer):
 
     def __init__(self, network, generative_model=None, loss=None, summary_stats=None, optimizer=None,
                  learning_rate=0.0005, checkpoint_path=None, max_to_keep=5, clip_method='global_norm', 
-                 clip_value=None, skip_checks=False):
+                 clip_value=None, skip_checks=False, save_every=None, async_checkpoint=False, metrics_path=None):
         """Creates a trainer instance for performing single-model forward inference and training an
         amortized neural estimator for parameter estimation (BayesFlow).
 
@@ -655,9 +1130,11 @@ class ParameterEstimationTrainer(BaseTrainer):
             _loss = loss
 
         super().__init__(network, generative_model, _loss, summary_stats, optimizer, learning_rate,
-                         checkpoint_path, max_to_keep, clip_method, clip_value, skip_checks)
+                         checkpoint_path, max_to_keep, clip_method, clip_value, skip_checks,
+                         save_every, async_checkpoint, metrics_path)
 
-    def train_experience_replay(self, epochs, batch_size, iterations_per_epoch, capacity, n_obs, **kwargs):
+    def train_experience_replay(self, epochs, batch_size, iterations_per_epoch, capacity, n_obs, resume=False,
+                                **kwargs):
         """Trains the inference network(s) via experience replay.
         
         Parameters
@@ -676,6 +1153,11 @@ class ParameterEstimationTrainer(BaseTrainer):
             -  if `int`, then treated as a fixed number of observations, \n
             -  if `callable`, then treated as a function for sampling N, i.e., :math:`N \sim p(N)`
 
+        resume : bool, default: False
+            If True, continues from the training state stored with the latest checkpoint (epoch, iteration,
+            loss history, RNG streams and buffer contents), e.g., after preemption. Starts from scratch if there is none
+        **kwargs : dict
+            Passed to the simulator
 
         Returns
         -------
@@ -684,41 +1166,55 @@ class ParameterEstimationTrainer(BaseTrainer):
         """
 
         # Initialize losses dictionary and memory replay buffer
-        losses = dict()
+        losses, start_ep, start_it = dict(), 1, 1
         mem = MemoryReplayBuffer(capacity)
-
-        for ep in range(1, epochs + 1):
-            losses[ep] = []
-            with tqdm(total=iterations_per_epoch, desc='Training epoch {}'.format(ep)) as p_bar:
-
-                for it in range(1, iterations_per_epoch + 1):
+        if resume:
+            state = self._restore_training_state()
+            if state is not None:
+                losses = state['losses']
+                mem.set_state(state['buffer'])
+                start_ep, start_it = self._resume_position(state, iterations_per_epoch)
+
+        self._start_training()
+        for ep in range(start_ep, epochs + 1):
+            losses.setdefault(ep, [])
+            self.metrics.start_epoch(losses[ep])
+            first_it, end_it = start_it if ep == start_ep else 1, iterations_per_epoch
+            with tqdm(total=iterations_per_epoch, initial=first_it - 1,
+                      desc='Training epoch {}'.format(ep)) as p_bar:
+
+                for it in range(first_it, iterations_per_epoch + 1):
 
                     # Determine n_obs and generate data on-the-fly
                     if type(n_obs) is int:
                         n_obs_it = n_obs
                     else:
                         n_obs_it = n_obs()
-                    # Simulate and add to buffer
+                    # Simulate and add to buffer, then sample from buffer
+                    tic = time.perf_counter()
                     params, sim_data = self._forward_inference(batch_size, n_obs_it, **kwargs)
                     mem.store(params, sim_data)
-
-                    # Sample from buffer
                     params, sim_data = mem.sample()
+                    sim_time = time.perf_counter() - tic
 
-                    # One step backprop
-                    loss = self._train_step(params, sim_data)
-
-                    # Store loss into dictionary
-                    losses[ep].append(loss)
+                    # One step backprop with metrics, stopping criteria and checkpoint
+                    loss, stop = self.train_step((params, sim_data), ep, it, losses, sim_time, batch_size,
+                                                 state=lambda: self._training_state(ep, it, losses, mem))
 
                     # Update progress bar
                     p_bar.set_postfix_str("Epoch {0},Iteration {1},Loss: {2:.3f},Running Loss: {3:.3f}"
-                                          .format(ep, it, loss, np.mean(losses[ep])))
+                                          .format(ep, it, loss, self.metrics.epoch_mean))
                     p_bar.update(1)
-
-            # Store after each epoch, if specified
-            if self.manager is not None:
-                self.manager.save()
+                    if stop:
+                        end_it = it
+                        break
+
+            # Report profile and store after each epoch or early stop, recording the last trained iteration
+            self._profile_step(end_of_epoch=True, epoch=ep)
+            self._save_checkpoint(end_of_epoch=True, state=lambda: self._training_state(ep, end_it, losses, mem))
+            if self.stop_reason is not None:
+                break
+        self._end_training()
         return losses
 
     def _forward_inference(self, n_sim, n_obs, summarize=True, **kwargs):
@@ -764,6 +1260,8 @@ class ParameterEstimationTrainer(BaseTrainer):
         # Compute hand-crafted summary stats, if given
         if summarize and self.summary_stats is not None:
             # Return shape in this case is (batch_size, n_sum)
-            sim_data = self.summary_stats(sim_data)
+            with profile_section(self.profiler, 'summary_stats'):
+                sim_data = self.summary_stats(sim_data)
 
-        return params.astype(np.float32), sim_data.astype(np.float32)
+        with profile_section(self.profiler, 'conversion'):
+            return as_float32(params, 'params'), as_float32(sim_data, 'sim_data')
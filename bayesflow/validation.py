@@ -0,0 +1,213 @@
+import hashlib
+import inspect
+import os
+import random
+
+import numpy as np
+import tensorflow as tf
+
+from bayesflow.checkpoints import capture_rng_state, restore_rng_state
+
+
+def _source_or_name(obj):
+    """ The source code of a callable, or its qualified name if the source is unavailable. """
+
+    if obj is None:
+        return 'None'
+    try:
+        return inspect.getsource(obj)
+    except (OSError, TypeError):
+        function = getattr(obj, '__func__', obj)
+        return '{}.{}'.format(getattr(function, '__module__', ''),
+                              getattr(function, '__qualname__', type(obj).__qualname__))
+
+
+def simulator_hash(generative_model, n_sim, n_obs, seed, **kwargs):
+    """ Hashes everything determining a fixed validation set: the code of the priors, simulators, encodings and
+    transforms of a generative model, the simulation settings and the seed.
+
+    Only code is hashed, not the state of callable objects. Pass an explicit ``key`` to
+    :meth:`BaseTrainer.set_validation` if a simulator is configured through attributes.
+
+    Parameters
+    ----------
+    generative_model : bayesflow.models.GenerativeModel
+        The generative model
+    n_sim            : int
+        Number of validation simulations
+    n_obs            : int
+        Number of observations per simulation
+    seed             : int
+        Seed of the validation simulations
+    **kwargs         : dict
+        Keyword arguments of the simulator
+
+    Returns
+    -------
+    digest : str
+        Hex digest, e.g., as part of a cache file name
+    """
+
+    h = hashlib.sha256()
+    h.update(repr((n_sim, n_obs, seed, sorted(kwargs.items()))).encode())
+    models = [generative_model] + list(getattr(generative_model, 'generative_models', []))
+    for model in models:
+        for name in ('model_prior', '_single_prior', 'prior', '_single_simulator', 'simulator', 'encoding',
+                     'param_transform', 'data_transform'):
+            if hasattr(model, name):
+                h.update(name.encode())
+                h.update(_source_or_name(getattr(model, name)).encode())
+    return h.hexdigest()
+
+
+class ValidationSet:
+    """ Fixed set of simulations on which the trainer evaluates the loss during training.
+
+    The set is simulated once with a fixed seed, so validation losses are comparable across epochs and runs, and is
+    cached in an ``.npz`` file keyed by :func:`simulator_hash`, so repeated runs of the same experiment skip the
+    simulation. The loss is evaluated in large batches with a compiled loss function, without gradients, and costs a
+    small fraction of a training epoch when evaluated every few hundred steps.
+
+    Attributes
+    ----------
+    args    : tuple of np.ndarray
+        The simulated inputs of the loss, e.g., ``(params, sim_data)``
+    every   : int
+        Number of optimizer steps between evaluations
+    history : dict
+        Lists ``'step'`` and ``'loss'`` of the evaluations so far
+    """
+
+    def __init__(self, args, every=1000, batch_size=512, compiled=True, path=None):
+        """ Creates a validation set from simulated loss inputs.
+
+        Parameters
+        ----------
+        args       : tuple of np.ndarray
+            The inputs of the loss, e.g., ``(params, sim_data)``, after hand-crafted summary statistics
+        every      : int, default: 1000
+            Number of optimizer steps between evaluations
+        batch_size : int, default: 512
+            Number of simulations per loss evaluation
+        compiled   : bool, default: True
+            Whether to evaluate the loss as a ``tf.function``
+        path       : str or None, default: None
+            The cache file the set was loaded from or stored to
+        """
+
+        self.args = tuple(np.asarray(a, dtype=np.float32) for a in args)
+        self.every = every
+        self.batch_size = batch_size
+        self.compiled = compiled
+        self.path = path
+        self.history = {'step': [], 'loss': []}
+        self._loss_fn = None
+
+    @property
+    def n_sim(self):
+        return self.args[-1].shape[0]
+
+    @classmethod
+    def simulate(cls, forward_inference, n_sim, n_obs, seed=0, cache_dir=None, key=None, **kwargs):
+        """ Simulates a validation set with a fixed seed or loads it from the cache.
+
+        Parameters
+        ----------
+        forward_inference : callable
+            Simulates raw loss inputs with signature ``forward_inference(n_sim, n_obs, **kwargs)``
+        n_sim             : int
+            Number of validation simulations
+        n_obs             : int
+            Number of observations per simulation
+        seed              : int, default: 0
+            Seed of the simulations
+        cache_dir         : str or None, default: None
+            Folder of the cache files, ``None`` disables caching
+        key               : str or None, default: None
+            Cache key, e.g., :func:`simulator_hash`
+        **kwargs          : dict
+            Passed to the simulator and to :class:`ValidationSet`
+
+        Returns
+        -------
+        validation : ValidationSet
+        """
+
+        settings = {name: kwargs.pop(name) for name in ('every', 'batch_size', 'compiled') if name in kwargs}
+        path = None
+        if cache_dir is not None and key is not None:
+            path = os.path.join(cache_dir, 'validation_{}.npz'.format(key))
+            if os.path.exists(path):
+                with np.load(path) as f:
+                    args = tuple(f['arg_{}'.format(i)] for i in range(len(f.files)))
+                return cls(args, path=path, **settings)
+
+        # Seed the batch generator and the global streams, without disturbing the training streams
+        rng_state = capture_rng_state()
+        try:
+            np.random.seed(seed)
+            random.seed(seed)
+            rng = np.random.Generator(np.random.Philox(seed))
+            args = forward_inference(n_sim, n_obs, rng=rng, **kwargs)
+        finally:
+            restore_rng_state(rng_state)
+
+        if path is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+            with open(path + '.tmp', 'wb') as f:
+                np.savez(f, **{'arg_{}'.format(i): np.asarray(a) for i, a in enumerate(args)})
+            os.replace(path + '.tmp', path)
+        return cls(args, path=path, **settings)
+
+    def due(self, step):
+        """ Whether the loss is evaluated after the given optimizer step. """
+
+        return self.every is not None and step > 0 and step % self.every == 0
+
+    def evaluate(self, loss, network, step=None):
+        """ Evaluates the mean loss over the validation set.
+
+        Parameters
+        ----------
+        loss    : callable
+            The loss with signature ``loss(network, *args)``, returning the batch mean
+        network : bayesflow.amortizers.Amortizer
+            The network
+        step    : int or None, default: None
+            The optimizer step, recorded in the history if given
+
+        Returns
+        -------
+        val_loss : float
+        """
+
+        if self._loss_fn is None:
+            self._loss_fn = tf.function(lambda *args: loss(network, *args)) if self.compiled \
+                else (lambda *args: loss(network, *args))
+
+        # Weight the batch means by the batch sizes, since the last batch may be smaller
+        total = 0.
+        for start in range(0, self.n_sim, self.batch_size):
+            batch = tuple(a[start:start + self.batch_size] for a in self.args)
+            total += float(self._loss_fn(*batch)) * batch[-1].shape[0]
+        val_loss = total / self.n_sim
+        if step is not None:
+            self.history['step'].append(step)
+            self.history['loss'].append(val_loss)
+        return val_loss
+
+    def reset_compiled(self):
+        """ Discards the compiled loss, so the next evaluation traces it again, e.g., after a compute dtype change. """
+
+        self._loss_fn = None
+
+    def get_state(self):
+        """ Returns the evaluation history, e.g., for resumable training. """
+
+        return {'step': list(self.history['step']), 'loss': list(self.history['loss'])}
+
+    def set_state(self, state):
+        """ Restores a history returned by :meth:`get_state`. """
+
+        self.history = {'step': list(state['step']), 'loss': list(state['loss'])}
+
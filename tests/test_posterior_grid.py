@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+pytest.importorskip('scipy')
+
+from bayesflow.posterior_grid import evaluate_grid, normalize_grid, posterior_marginals  # noqa: E402
+
+
+def scalar_density(x, y):
+    # Sums over all entries, so it returns the grid shape but wrong values when called with meshgrid arrays
+    observed = np.array([0.3])
+    residual = np.sum((observed - x * y) ** 2)
+    return np.exp(-0.5 * residual / 0.1 ** 2) * np.exp(-0.5 * (x ** 2 + y ** 2))
+
+
+def broadcast_density(x, y):
+    return np.exp(-0.5 * (x ** 2 + y ** 2))
+
+
+def test_evaluate_grid_pointwise_by_default():
+    x_grid, y_grid = np.linspace(-2, 2, 7), np.linspace(-1, 1, 5)
+    density = evaluate_grid(scalar_density, x_grid, y_grid)
+    expected = np.array([[scalar_density(x, y) for x in x_grid] for y in y_grid])
+    np.testing.assert_allclose(density, expected)
+    assert density.max() > 0
+
+
+def test_evaluate_grid_vectorized():
+    x_grid, y_grid = np.linspace(-2, 2, 7), np.linspace(-1, 1, 5)
+    np.testing.assert_allclose(evaluate_grid(broadcast_density, x_grid, y_grid, vectorized=True),
+                               evaluate_grid(broadcast_density, x_grid, y_grid))
+    with pytest.raises(ValueError):
+        evaluate_grid(lambda x, y: np.sum(x * y), x_grid, y_grid, vectorized=True)
+
+
+def test_normalize_grid_rejects_zero_total():
+    x_grid, y_grid = np.linspace(0, 1, 5), np.linspace(0, 1, 5)
+    with pytest.raises(ValueError):
+        normalize_grid(np.zeros((5, 5)), x_grid, y_grid)
+    with pytest.raises(ValueError):
+        posterior_marginals(lambda x, y: 0., x_grid, y_grid, [0, 1, 0, 1], n_grid=11)
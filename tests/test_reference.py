@@ -0,0 +1,21 @@
+import numpy as np
+import pytest
+
+pytest.importorskip('scipy')
+
+from bayesflow.reference import _ReferenceWorker  # noqa: E402
+
+
+def make_worker(n_steps=100, observed=None, model='CR3'):
+    return _ReferenceWorker(None, None, n_steps, 10, 1, 42, 'chains', model, observed)
+
+
+def test_chain_files_are_keyed_by_settings_and_data():
+    observed = np.arange(6.).reshape(2, 3)
+    chain_file = make_worker(observed=observed).chain_file(0, 42)
+    assert chain_file == make_worker(observed=observed.copy()).chain_file(0, 42)
+    assert chain_file != make_worker(observed=observed).chain_file(1, 42)
+    assert chain_file != make_worker(observed=observed[::-1]).chain_file(0, 42)
+    assert chain_file != make_worker(n_steps=200, observed=observed).chain_file(0, 42)
+    assert chain_file != make_worker(observed=observed, model='CR4').chain_file(0, 42)
+    assert chain_file != make_worker(observed=observed).chain_file(0, 43)
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from bayesflow.exceptions import ConfigurationError
+from bayesflow.rendering import PlotSpec, deferrable
+
+
+def density(x, y):
+    return np.exp(-0.5 * (x ** 2 + y ** 2))
+
+
+def _tabulate(arguments):
+    return {'posterior_xy': arguments['posterior_xy'](np.zeros(3), np.ones(3))}
+
+
+@deferrable(evaluate=_tabulate)
+def plot_density(posterior_xy, scale=1., show=True, filename=None):
+    return posterior_xy
+
+
+@deferrable
+def plot_raw(posterior_xy, show=True, filename=None):
+    return posterior_xy
+
+
+def test_deferred_call_evaluates_callables():
+    spec = plot_density(lambda x, y: x + y, defer=True)
+    np.testing.assert_allclose(spec.args[0], np.ones(3))
+    assert spec.kwargs == {'show': False, 'filename': None}
+    assert plot_density(lambda x, y: x + y, defer=True).content_hash() == spec.content_hash()
+
+
+def test_deferred_call_rejects_unpicklable_arguments():
+    with pytest.raises(ConfigurationError):
+        plot_raw(lambda x, y: x + y, defer=True)
+    assert isinstance(plot_raw(density, defer=True), PlotSpec)
+
+
+def test_content_hash_of_callables_is_stable():
+    assert PlotSpec(plot_raw, (density, )).content_hash() == PlotSpec(plot_raw, (density, )).content_hash()
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from bayesflow.store import ReferenceStore
+
+
+@pytest.fixture
+def stored(tmp_path):
+    values = np.arange(60, dtype=np.float64).reshape(10, 3, 2)
+    store = ReferenceStore(str(tmp_path), chunk_size=3, compress=False)
+    store.put('entry', {'values': values})
+    arrays, _ = store.get('entry')
+    return arrays['values'], values
+
+
+@pytest.mark.parametrize('index', [
+    4, -1, slice(2, 8), slice(None, None, -2), [0, 5, 9], np.array([9, 0, 0]),
+    np.arange(10) % 3 == 0, (Ellipsis, 0), (Ellipsis, None), (None, 1), (0, Ellipsis, 1), (Ellipsis, 1, 0),
+    (slice(1, 4), [0, 2]), ([1, 2], [0, 1]), (np.arange(10) > 6, Ellipsis, 1), (),
+])
+def test_chunked_array_indexing(stored, index):
+    chunked, values = stored
+    np.testing.assert_array_equal(chunked[index], np.asarray(chunked)[index])
+    np.testing.assert_array_equal(chunked[index], values[index])
+
+
+def test_chunked_array_out_of_bounds(stored):
+    chunked, _ = stored
+    with pytest.raises(IndexError):
+        chunked[10]
+    with pytest.raises(IndexError):
+        chunked[..., 0, 0, 0, 0]
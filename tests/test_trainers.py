@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+tf = pytest.importorskip('tensorflow')
+
+from bayesflow.amortizers import MultiModelAmortizer  # noqa: E402
+from bayesflow.models import MetaGenerativeModel  # noqa: E402
+from bayesflow.networks import EvidentialNetwork  # noqa: E402
+from bayesflow.trainers import ModelComparisonTrainer  # noqa: E402
+
+
+def model_prior(n_sim, n_models, rng=None):
+    rng = rng if rng is not None else np.random.default_rng()
+    return rng.integers(n_models, size=n_sim)
+
+
+def prior(n_sim, rng=None):
+    rng = rng if rng is not None else np.random.default_rng()
+    return rng.normal(size=(n_sim, 2)).astype(np.float32)
+
+
+def make_simulator(scale):
+    def simulator(params, n_obs, rng=None):
+        rng = rng if rng is not None else np.random.default_rng()
+        noise = rng.normal(size=(params.shape[0], n_obs, 2))
+        return (params[:, np.newaxis, :] + scale * noise).astype(np.float32)
+    return simulator
+
+
+def summary_stats(sim_data):
+    return np.concatenate([np.mean(sim_data, axis=1), np.std(sim_data, axis=1)], axis=1)
+
+
+@pytest.fixture
+def trainer():
+    generative_model = MetaGenerativeModel(model_prior, [prior, prior], [make_simulator(0.5), make_simulator(2.)],
+                                           skip_consistency_check=True)
+    meta = {'n_models': 2, 'n_dense': 1, 'dense_args': dict(units=8, activation='relu'),
+            'out_activation': 'softplus'}
+    network = MultiModelAmortizer(EvidentialNetwork(meta))
+    return ModelComparisonTrainer(network, generative_model, summary_stats=summary_stats, skip_checks=True)
+
+
+def test_forward_inference_summarize(trainer):
+    model_indices, sim_data = trainer._forward_inference(4, 10)
+    assert model_indices.shape == (4, 2)
+    assert sim_data.shape == (4, 4)
+
+    model_indices, sim_data = trainer._forward_inference(4, 10, summarize=False)
+    assert sim_data.shape == (4, 10, 2)
+
+
+def test_set_validation_model_comparison(trainer):
+    validation = trainer.set_validation(16, 10, every=None, batch_size=8, compiled=False)
+    model_indices, sim_data = validation.args
+    assert model_indices.shape == (16, 2)
+    assert sim_data.shape == (16, 4)
+    assert np.isfinite(trainer.validate())